@@ -0,0 +1,290 @@
+"""
+Model Compression Pipeline (training side)
+Distills bp.pt / weight.pt / wearables.pt into smaller students, optionally applies
+structured channel pruning, and gates every candidate on a held-out accuracy
+regression test plus a CPU latency measurement.
+
+Steps per model:
+  1. Teacher baseline:  held-out mAP + CPU latency of the current model
+  2. Distillation:      the teacher pseudo-labels the training images (and any extra
+                        unlabeled frames, e.g. datasets/bp_hard_frames) and its boxes are
+                        merged with the ground truth; small students (yolo11n at 480/416/320)
+                        train on that "teacher-densified" dataset
+  3. Pruning (optional): L2 structured channel pruning with torch-pruning
+                        (pip install torch-pruning), followed by a short fine-tune
+  4. Gate:              candidate mAP50 must be within --max-map-drop of the teacher
+                        (and mAP50-95 within 2x that); CPU latency is reported for all
+  5. Report:            table + report.json; passing candidates are copied to
+                        runs/compress/<model>/shippable/
+
+Usage (from backend/, GPU recommended for training - see docs/MODEL_COMPRESSION_GUIDE.md):
+    python ai_camera/compress_models.py --model bp --data /content/blood-pressure-ruwdq-3/data.yaml
+    python ai_camera/compress_models.py --model weight --data feet/data.yaml --students yolo11n.pt --imgsz 320 416 --prune 0.3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+TEACHERS = {
+    "bp": "bp.pt",
+    "weight": "weight.pt",
+    "wearables": "wearables.pt",
+}
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# ==================== DATASET HELPERS ====================
+
+def load_data_yaml(path):
+    import yaml
+    with open(path) as f:
+        data = yaml.safe_load(f)
+    root = data.get("path") or os.path.dirname(os.path.abspath(path))
+    if not os.path.isabs(root):
+        root = os.path.join(os.path.dirname(os.path.abspath(path)), root)
+    data["path"] = root
+    return data
+
+
+def split_dir(data, split):
+    value = data.get(split)
+    if value is None:
+        return None
+    value = value[0] if isinstance(value, list) else value
+    return value if os.path.isabs(value) else os.path.normpath(os.path.join(data["path"], value))
+
+
+def label_path_for(image_path):
+    """YOLO convention: .../images/x.jpg -> .../labels/x.txt"""
+    parts = image_path.replace("\\", "/").rsplit("/images/", 1)
+    stem = os.path.splitext(parts[-1])[0] + ".txt"
+    return parts[0] + "/labels/" + stem if len(parts) == 2 else os.path.splitext(image_path)[0] + ".txt"
+
+
+def list_images(folder):
+    out = []
+    for root, _, files in os.walk(folder):
+        out.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTS))
+    return sorted(out)
+
+
+def read_labels(path):
+    if not os.path.exists(path):
+        return np.zeros((0, 5))
+    rows = [line.split() for line in open(path) if line.strip()]
+    return np.array([[float(v) for v in r[:5]] for r in rows]) if rows else np.zeros((0, 5))
+
+
+def xywh_iou(a, b):
+    """IoU matrix between (N, 4) and (M, 4) normalized cx, cy, w, h boxes."""
+    def corners(x):
+        return np.stack([x[:, 0] - x[:, 2] / 2, x[:, 1] - x[:, 3] / 2, x[:, 0] + x[:, 2] / 2, x[:, 1] + x[:, 3] / 2], 1)
+    a, b = corners(a), corners(b)
+    iw = np.clip(np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    ih = np.clip(np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def build_distill_dataset(teacher, data, out_dir, extra_dirs=(), conf=0.5, imgsz=480):
+    """
+    Copy the training images and write merged labels: ground truth + teacher boxes that
+    don't overlap a ground-truth box. Extra (unlabeled) folders get teacher labels only.
+    Val/test splits are referenced unchanged so the gate stays on real labels.
+    """
+    img_out = os.path.join(out_dir, "images", "train")
+    lbl_out = os.path.join(out_dir, "labels", "train")
+    os.makedirs(img_out, exist_ok=True)
+    os.makedirs(lbl_out, exist_ok=True)
+
+    sources = [(p, True) for p in list_images(split_dir(data, "train"))]
+    for folder in extra_dirs:
+        sources += [(p, False) for p in list_images(folder)]
+
+    added = 0
+    for i, (image_path, has_gt) in enumerate(sources):
+        gt = read_labels(label_path_for(image_path)) if has_gt else np.zeros((0, 5))
+        res = teacher(image_path, conf=conf, imgsz=imgsz, verbose=False)[0]
+        pseudo = np.zeros((0, 5))
+        if len(res.boxes):
+            pseudo = np.column_stack([res.boxes.cls.cpu().numpy(), res.boxes.xywhn.cpu().numpy()])
+            if len(gt):
+                pseudo = pseudo[xywh_iou(pseudo[:, 1:], gt[:, 1:]).max(axis=1) < 0.5]
+        added += len(pseudo)
+
+        name = f"{i:06d}{os.path.splitext(image_path)[1]}"
+        shutil.copy2(image_path, os.path.join(img_out, name))
+        merged = np.vstack([gt, pseudo]) if len(pseudo) else gt
+        with open(os.path.join(lbl_out, os.path.splitext(name)[0] + ".txt"), "w") as f:
+            f.write("\n".join(f"{int(r[0])} {r[1]:.6f} {r[2]:.6f} {r[3]:.6f} {r[4]:.6f}" for r in merged))
+
+    distill = {
+        "path": out_dir,
+        "train": "images/train",
+        "val": split_dir(data, "val"),
+        "test": split_dir(data, "test") or split_dir(data, "val"),
+        "names": data["names"],
+    }
+    yaml_path = os.path.join(out_dir, "data.yaml")
+    import yaml
+    with open(yaml_path, "w") as f:
+        yaml.safe_dump(distill, f)
+    print(f"🧪 Distillation set: {len(sources)} images, {added} teacher boxes added -> {yaml_path}")
+    return yaml_path
+
+
+# ==================== PRUNING ====================
+
+def prune_channels(yolo, ratio, imgsz):
+    """L2 structured channel pruning of the backbone/neck; the Detect head is left intact."""
+    import torch
+    import torch_pruning as tp
+    from ultralytics.nn.modules import Detect
+
+    model = yolo.model
+    model.eval()
+    for p in model.parameters():
+        p.requires_grad_(True)
+    example = torch.randn(1, 3, imgsz, imgsz)
+    ignored = [m for m in model.modules() if isinstance(m, Detect)]
+
+    pruner = tp.pruner.MagnitudePruner(
+        model, example,
+        importance=tp.importance.MagnitudeImportance(p=2),
+        pruning_ratio=ratio,
+        ignored_layers=ignored,
+    )
+    base_macs, base_params = tp.utils.count_ops_and_params(model, example)
+    pruner.step()
+    macs, params = tp.utils.count_ops_and_params(model, example)
+    print(f"✂️  Pruned {ratio:.0%}: MACs {base_macs / 1e9:.2f}G -> {macs / 1e9:.2f}G, params {base_params / 1e6:.2f}M -> {params / 1e6:.2f}M")
+    return yolo
+
+
+def finetune_pruned(yolo, data_yaml, epochs, imgsz, project, name):
+    """Fine-tune a pruned model without letting the trainer rebuild it from its yaml."""
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    pruned = yolo.model
+
+    class PrunedTrainer(DetectionTrainer):
+        def get_model(self, cfg=None, weights=None, verbose=True):
+            return pruned
+
+    yolo.train(data=data_yaml, epochs=epochs, imgsz=imgsz, project=project, name=name,
+               trainer=PrunedTrainer, exist_ok=True, amp=False)
+    return os.path.join(project, name, "weights", "best.pt")
+
+
+# ==================== GATE + LATENCY ====================
+
+def evaluate(weights, data_yaml, imgsz, split="test"):
+    from ultralytics import YOLO
+    metrics = YOLO(weights).val(data=data_yaml, imgsz=imgsz, split=split, device="cpu", verbose=False, plots=False)
+    return {"map50": round(float(metrics.box.map50), 4), "map50_95": round(float(metrics.box.map), 4)}
+
+
+def cpu_latency(weights, imgsz, runs=50, warmup=5):
+    """Median / p90 CPU latency (ms) of one forward pass on a 480x480 camera-sized frame."""
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    frame = np.random.default_rng(0).integers(0, 255, (480, 480, 3), dtype=np.uint8)
+    for _ in range(warmup):
+        model(frame, imgsz=imgsz, device="cpu", verbose=False)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(frame, imgsz=imgsz, device="cpu", verbose=False)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"median_ms": round(float(np.median(samples)), 2), "p90_ms": round(float(np.percentile(samples, 90)), 2)}
+
+
+def gate(candidate, teacher, max_map_drop):
+    return (candidate["map50"] >= teacher["map50"] - max_map_drop
+            and candidate["map50_95"] >= teacher["map50_95"] - 2 * max_map_drop)
+
+
+# ==================== MAIN ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distill / prune the kiosk YOLO models")
+    parser.add_argument("--model", choices=sorted(TEACHERS), required=True)
+    parser.add_argument("--data", required=True, help="YOLO data.yaml with train/val/test (test = held-out gate)")
+    parser.add_argument("--teacher", help="Override teacher weights (default ai_camera/models/<model>.pt)")
+    parser.add_argument("--students", nargs="+", default=["yolo11n.pt"])
+    parser.add_argument("--imgsz", nargs="+", type=int, default=[480, 416, 320])
+    parser.add_argument("--teacher-imgsz", type=int, default=480)
+    parser.add_argument("--extra", nargs="*", default=[], help="Unlabeled frame folders to pseudo-label (e.g. datasets/bp_hard_frames)")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--prune", type=float, default=0.0, help="Channel pruning ratio for each student (0 = off)")
+    parser.add_argument("--finetune-epochs", type=int, default=30)
+    parser.add_argument("--max-map-drop", type=float, default=0.01)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--out", default=os.path.join("runs", "compress"))
+    args = parser.parse_args(argv)
+
+    from ultralytics import YOLO
+
+    teacher_path = args.teacher or os.path.join(MODELS_DIR, TEACHERS[args.model])
+    data = load_data_yaml(args.data)
+    project = os.path.abspath(os.path.join(args.out, args.model))
+    os.makedirs(project, exist_ok=True)
+
+    print(f"\n👨‍🏫 Teacher: {teacher_path}")
+    teacher_metrics = evaluate(teacher_path, args.data, args.teacher_imgsz)
+    teacher_metrics.update(cpu_latency(teacher_path, args.teacher_imgsz))
+    report = {"model": args.model, "teacher": dict(weights=teacher_path, imgsz=args.teacher_imgsz, **teacher_metrics), "candidates": []}
+
+    distill_yaml = build_distill_dataset(YOLO(teacher_path), data, os.path.join(project, "distill_data"),
+                                         args.extra, imgsz=args.teacher_imgsz)
+
+    for student in args.students:
+        for imgsz in args.imgsz:
+            name = f"{os.path.splitext(os.path.basename(student))[0]}_{imgsz}"
+            print(f"\n🎓 Student {name}")
+            YOLO(student).train(data=distill_yaml, epochs=args.epochs, imgsz=imgsz, project=project,
+                                name=name, exist_ok=True, device=args.device)
+            candidates = [(name, os.path.join(project, name, "weights", "best.pt"), imgsz)]
+
+            if args.prune > 0:
+                pruned_name = f"{name}_pruned{int(args.prune * 100)}"
+                try:
+                    pruned = prune_channels(YOLO(candidates[0][1]), args.prune, imgsz)
+                    candidates.append((pruned_name, finetune_pruned(pruned, distill_yaml, args.finetune_epochs,
+                                                                    imgsz, project, pruned_name), imgsz))
+                except ImportError:
+                    print("⚠️ torch-pruning not installed - skipping structured pruning")
+
+            for cand_name, weights, cand_imgsz in candidates:
+                metrics = evaluate(weights, args.data, cand_imgsz)
+                metrics.update(cpu_latency(weights, cand_imgsz))
+                metrics["passed"] = gate(metrics, teacher_metrics, args.max_map_drop)
+                metrics["speedup"] = round(teacher_metrics["median_ms"] / metrics["median_ms"], 2)
+                report["candidates"].append(dict(name=cand_name, weights=weights, imgsz=cand_imgsz, **metrics))
+
+    shippable_dir = os.path.join(project, "shippable")
+    os.makedirs(shippable_dir, exist_ok=True)
+    print(f"\n{'candidate':<28} {'mAP50':>7} {'mAP50-95':>9} {'CPU ms':>8} {'speedup':>8}  gate")
+    t = report["teacher"]
+    print(f"{'teacher':<28} {t['map50']:>7.3f} {t['map50_95']:>9.3f} {t['median_ms']:>8.1f} {'1.00x':>8}  -")
+    for c in report["candidates"]:
+        print(f"{c['name']:<28} {c['map50']:>7.3f} {c['map50_95']:>9.3f} {c['median_ms']:>8.1f} {c['speedup']:>7.2f}x  {'PASS' if c['passed'] else 'FAIL'}")
+        if c["passed"]:
+            shutil.copy2(c["weights"], os.path.join(shippable_dir, f"{args.model}_{c['name']}.pt"))
+
+    with open(os.path.join(project, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {os.path.join(project, 'report.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,69 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     SERIAL_PORT = os.environ.get('SERIAL_PORT') or 'COM3'
-    SERIAL_BAUDRATE = 115200
\ No newline at end of file
+    SERIAL_BAUDRATE = 115200
+    # Root folder for BP training captures (Maintenance page); one sub-folder per class
+    BP_DATASET_DIR = os.environ.get('BP_DATASET_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets', 'bp_captures')
+    # Write YOLO label files pre-filled from the current model's detections
+    BP_CAPTURE_LABELS = os.environ.get('BP_CAPTURE_LABELS', '0') == '1'
+    # Active learning (opt-in, writes to disk): low-confidence / flickering BP frames saved for retraining
+    HARD_FRAMES_ENABLED = os.environ.get('HARD_FRAMES_ENABLED', '0') == '1'
+    HARD_FRAMES_DIR = os.environ.get('HARD_FRAMES_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets', 'bp_hard_frames')
+    # MJPEG video feeds: concurrent viewers per stream and JPEG quality (encoded once per frame)
+    STREAM_MAX_VIEWERS = int(os.environ.get('STREAM_MAX_VIEWERS', '4'))
+    STREAM_JPEG_QUALITY = int(os.environ.get('STREAM_JPEG_QUALITY', '95'))
+    # YOLO in separate worker processes (0 = in-process); torch threads per worker
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', '0'))
+    INFERENCE_WORKER_THREADS = int(os.environ.get('INFERENCE_WORKER_THREADS', '2'))
+    # Cross-camera batching of in-process YOLO calls (0 = off); frames per forward pass
+    INFERENCE_BATCH_WINDOW_MS = float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', '0'))
+    INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', '4'))
+    # CPU governor: torch threads per model ("bp=2,weight=1", default = inference cores / 2),
+    # cores kept free for serial + HTTP, and optional pinning of inference to the rest
+    CPU_GOVERNOR = os.environ.get('CPU_GOVERNOR', '1') == '1'
+    INFERENCE_TORCH_THREADS = os.environ.get('INFERENCE_TORCH_THREADS', '')
+    CPU_RESERVED_CORES = int(os.environ.get('CPU_RESERVED_CORES', '1'))
+    CPU_PIN_INFERENCE = os.environ.get('CPU_PIN_INFERENCE', '0') == '1'
+    # Load shedding under CPU overload (see app/utils/load_shedder.py): trigger budgets,
+    # hysteresis, and what each degradation step falls back to
+    SHED_ENABLED = os.environ.get('SHED_ENABLED', '1') == '1'
+    SHED_INFERENCE_BUDGET_MS = float(os.environ.get('SHED_INFERENCE_BUDGET_MS', '150'))
+    SHED_MAX_BACKLOG = float(os.environ.get('SHED_MAX_BACKLOG', '4'))
+    SHED_ESCALATE_S = float(os.environ.get('SHED_ESCALATE_S', '2'))
+    SHED_RECOVER_S = float(os.environ.get('SHED_RECOVER_S', '5'))
+    SHED_PREVIEW_FPS = float(os.environ.get('SHED_PREVIEW_FPS', '10'))
+    SHED_INFERENCE_IMGSZ = int(os.environ.get('SHED_INFERENCE_IMGSZ', '320'))
+    SHED_CLEARANCE_FPS = float(os.environ.get('SHED_CLEARANCE_FPS', '5'))
+    # Camera discovery: indices probed in parallel and the overall probe deadline
+    CAMERA_PROBE_INDICES = int(os.environ.get('CAMERA_PROBE_INDICES', '5'))
+    CAMERA_PROBE_TIMEOUT_S = float(os.environ.get('CAMERA_PROBE_TIMEOUT_S', '5'))
+    # JPEG encoder for the streams: auto (fastest available) | opencv | turbojpeg | simplejpeg
+    JPEG_ENCODER = os.environ.get('JPEG_ENCODER', 'auto')
+    JPEG_SUBSAMPLING = os.environ.get('JPEG_SUBSAMPLING', '420')
+    JPEG_FAST_DCT = os.environ.get('JPEG_FAST_DCT', '1') == '1'
+    # Optional H.264 fragmented-MP4 streams for remote viewing (needs ffmpeg with libx264)
+    STREAM_MP4_ENABLED = os.environ.get('STREAM_MP4_ENABLED', '1') == '1'
+    FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
+    STREAM_MP4_FPS = int(os.environ.get('STREAM_MP4_FPS', '10'))
+    STREAM_MP4_WIDTH = int(os.environ.get('STREAM_MP4_WIDTH', '480'))
+    STREAM_MP4_BITRATE = os.environ.get('STREAM_MP4_BITRATE', '300k')
+    STREAM_MP4_IDLE_S = float(os.environ.get('STREAM_MP4_IDLE_S', '10'))
+    # Open the body camera in the background during the feet stage (instant stage switch)
+    CLEARANCE_PREWARM_BODY = os.environ.get('CLEARANCE_PREWARM_BODY', '1') == '1'
+    # Clearance mode: sequential (feet, then body) | dual (both cameras + models at once) |
+    # auto (dual when the CPU budget allows); dual needs this many inference cores
+    CLEARANCE_MODE = os.environ.get('CLEARANCE_MODE', 'sequential')
+    CLEARANCE_DUAL_MIN_CORES = int(os.environ.get('CLEARANCE_DUAL_MIN_CORES', '4'))
+    # Temporal compliance voting: a stage is stable once k of its last n frames agree;
+    # optionally stop that stage's inference once it is stably clear
+    CLEARANCE_VOTE_K = int(os.environ.get('CLEARANCE_VOTE_K', '4'))
+    CLEARANCE_VOTE_N = int(os.environ.get('CLEARANCE_VOTE_N', '6'))
+    CLEARANCE_STOP_ON_CLEAR = os.environ.get('CLEARANCE_STOP_ON_CLEAR', '1') == '1'
+    # Motion gate in front of the clearance detectors: run the model only while the scene
+    # changes (foreground share) or something was detected within the hold time
+    MOTION_GATE_ENABLED = os.environ.get('MOTION_GATE_ENABLED', '1') == '1'
+    MOTION_GATE_THRESHOLD = float(os.environ.get('MOTION_GATE_THRESHOLD', '0.01'))
+    MOTION_GATE_HOLD_S = float(os.environ.get('MOTION_GATE_HOLD_S', '2'))
+    MOTION_GATE_REFRESH_S = float(os.environ.get('MOTION_GATE_REFRESH_S', '3'))
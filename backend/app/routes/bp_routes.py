@@ -5,6 +5,8 @@ Dedicated endpoints for BP measurement using bp_sensor_controller.py
 
 from flask import Blueprint, jsonify, Response
 from ..sensors.bp_sensor_controller import bp_sensor
+from ..utils.stream_hub import viewer_options
+from ..utils.capture_pipeline import valid_class_name
 import logging
 
 logger = logging.getLogger(__name__)
@@ -119,21 +121,29 @@ def get_bp_status():
     status = bp_sensor.get_status()
     return jsonify(status)
 
+@bp_routes.route('/latency', methods=['GET'])
+def get_bp_latency():
+    """Per-stage frame latency histograms (capture, preprocess, inference, publish, visible)."""
+    return jsonify(bp_sensor.get_latency())
+
 @bp_routes.route('/video_feed', methods=['GET'])
 def bp_video_feed():
-    """Stream the BP camera feed as MJPEG."""
-    def generate():
-        while True:
-            frame_bytes = bp_sensor.get_frame()
-            if frame_bytes:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            else:
-                # No frame available, wait a bit
-                import time
-                time.sleep(0.1)
-    
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    """Stream the BP camera feed as MJPEG (each frame encoded once, shared by all viewers).
+    Optional ?width=&quality= for a smaller preview, or ?adaptive=1 to follow the client's speed."""
+    from flask import request
+    viewer = bp_sensor.stream.open_viewer(keep_alive=lambda: bp_sensor.is_running, **viewer_options(request.args))
+    if viewer is None:
+        return jsonify({"error": "Too many viewers"}), 503
+    return Response(viewer, mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@bp_routes.route('/video.mp4', methods=['GET'])
+def bp_video_mp4():
+    """Low-bandwidth H.264 (fragmented MP4) version of video_feed for remote viewing; one shared encoder."""
+    from app.utils.mp4_stream import open_mp4_viewer
+    viewer, error = open_mp4_viewer("bp", keep_alive=lambda: bp_sensor.is_running)
+    if viewer is None:
+        return jsonify({"error": error[0]}), error[1]
+    return Response(viewer, mimetype='video/mp4')
 
 @bp_routes.route('/set_settings', methods=['POST'])
 def set_bp_settings():
@@ -149,10 +159,23 @@ def capture_bp_image():
     from flask import request
     data = request.json
     class_name = data.get('class_name', 'unknown')
-    success, result = bp_sensor.capture_image(class_name)
+    if not valid_class_name(class_name):
+        return jsonify({"success": False, "message": "Invalid class name (letters, digits, '_' and '-' only)"}), 400
+    with_labels = data.get('labels', None)
+    success, result = bp_sensor.capture_image(class_name, with_labels=with_labels)
     if success:
-        return jsonify({"success": True, "filepath": result})
-    return jsonify({"success": False, "message": result}), 500
+        return jsonify({"success": True, "status": result["status"], "filepath": result["filepath"]})
+    return jsonify({"success": False, "message": result}), 503
+
+@bp_routes.route('/capture/stats', methods=['GET'])
+def capture_bp_stats():
+    """Training capture counters (queued, written, duplicates, dropped)."""
+    return jsonify(bp_sensor.get_capture_stats())
+
+@bp_routes.route('/hard_frames/stats', methods=['GET'])
+def hard_frame_stats():
+    """Active-learning harvest counters (borderline / disagreement frames)."""
+    return jsonify(bp_sensor.get_hard_frame_stats())
 
 @bp_routes.route('/check_illegal_press', methods=['GET'])
 def check_illegal_press():
@@ -1,13 +1,19 @@
 from flask import Blueprint, Response, jsonify, request
 from app.sensors.clearance_manager import clearance_manager
+from app.utils.stream_hub import viewer_options
 
 clearance_bp = Blueprint('clearance', __name__)
 
 @clearance_bp.route('/start', methods=['POST'])
 def start_clearance():
+    """Optional JSON body {"mode": "sequential" | "dual" | "auto"} (default: CLEARANCE_MODE)"""
+    mode = (request.get_json(silent=True) or {}).get('mode')
+    if mode is not None and mode not in clearance_manager.MODES:
+        return jsonify({"error": f"Unknown mode '{mode}'"}), 400
     try:
-        clearance_manager.start_clearance()
-        return jsonify({"message": "Clearance cameras started"}), 200
+        clearance_manager.start_clearance(mode)
+        return jsonify({"message": "Clearance cameras started", "mode": clearance_manager.mode,
+                        "dual_unavailable": clearance_manager.dual_unavailable}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -29,9 +35,29 @@ def switch_to_body():
 
 @clearance_bp.route('/stream')
 def stream_clearance():
-    return Response(clearance_manager.get_stitched_frame(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    viewer = clearance_manager.get_stitched_frame(**viewer_options(request.args))
+    if viewer is None:
+        return jsonify({"error": "Too many viewers"}), 503
+    return Response(viewer, mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@clearance_bp.route('/stream.mp4')
+def stream_clearance_mp4():
+    """Low-bandwidth H.264 (fragmented MP4) version of /stream for remote viewing"""
+    from app.utils.mp4_stream import open_mp4_viewer
+    viewer, error = open_mp4_viewer('clearance', keep_alive=lambda: clearance_manager.is_active)
+    if viewer is None:
+        return jsonify({"error": error[0]}), error[1]
+    return Response(viewer, mimetype='video/mp4')
 
 @clearance_bp.route('/status')
 def status_clearance():
-    return jsonify(clearance_manager.get_status())
\ No newline at end of file
+    return jsonify(clearance_manager.get_status())
+
+@clearance_bp.route('/events')
+def events_clearance():
+    """Stable "cleared"/"violation" decisions after ?since=<seq> (also pushed as 'clearance_event')"""
+    return jsonify({"events": clearance_manager.get_events(request.args.get('since', 0, type=int))})
+
+@clearance_bp.route('/latency')
+def latency_clearance():
+    return jsonify(clearance_manager.get_latency())
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from datetime import datetime
 from sqlalchemy import text
 import logging
@@ -198,6 +198,68 @@ def system_check():
     
     return jsonify(system_status), 200
 
+@main_bp.route('/models/ready', methods=['GET'])
+def models_ready():
+    """Readiness of the YOLO models warmed up at startup (per-model load/warm-up time)"""
+    from app.sensors.model_warmup import model_warmup
+    status = model_warmup.get_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@main_bp.route('/models/workers', methods=['GET'])
+def inference_workers_status():
+    """Out-of-process inference pool (INFERENCE_WORKERS): workers, in-flight, mean latency"""
+    from app.sensors.inference_workers import inference_pool
+    return jsonify(inference_pool.get_status())
+
+@main_bp.route('/system/cpu', methods=['GET'])
+def cpu_governor_status():
+    """CPU budget (torch threads, reserved/pinned cores) and per-subsystem CPU usage since last poll"""
+    from app.utils.resource_governor import resource_governor
+    return jsonify(resource_governor.get_status())
+
+@main_bp.route('/system/load', methods=['GET'])
+def load_shedding_status():
+    """Overload load-shedding level, per-loop pressure and transition counts"""
+    from app.utils.load_shedder import load_shedder
+    return jsonify(load_shedder.get_status())
+
+@main_bp.route('/models/batching', methods=['GET'])
+def inference_batching_status():
+    """Cross-camera batching (INFERENCE_BATCH_WINDOW_MS): batch sizes, queue wait, forward time"""
+    from app.sensors.inference_batcher import inference_batcher
+    return jsonify(inference_batcher.get_status())
+
+@main_bp.route('/cameras/discovery', methods=['GET'])
+def camera_discovery_status():
+    """Cached parallel camera probe (resolutions, measured FPS); ?refresh=1 re-probes"""
+    from app.sensors.camera_discovery import camera_discovery
+    return jsonify(camera_discovery.discover(force=request.args.get('refresh') == '1'))
+
+@main_bp.route('/cameras/registry', methods=['GET'])
+def camera_registry_status():
+    """Cached camera names/indices and camera_config.json (no device enumeration per call)"""
+    from app.utils.camera_config import camera_registry
+    camera_registry.list_devices()
+    return jsonify(camera_registry.get_status())
+
+@main_bp.route('/cameras/hub', methods=['GET'])
+def camera_hub_status():
+    """Shared camera hub: open devices, subscriber counts, frames captured"""
+    from app.sensors.camera_hub import camera_hub
+    return jsonify(camera_hub.get_status())
+
+@main_bp.route('/streams', methods=['GET'])
+def stream_hub_status():
+    """MJPEG streams: viewers, frames published/encoded/served, encode time"""
+    from app.utils.stream_hub import stream_hub
+    return jsonify(stream_hub.get_status())
+
+@main_bp.route('/streams/mp4', methods=['GET'])
+def mp4_stream_status():
+    """fMP4 streams: encoder bitrate/CPU vs. MJPEG bitrate at the same FPS"""
+    from app.utils.mp4_stream import mp4_hub
+    return jsonify(mp4_hub.get_status())
+
 @main_bp.route('/endpoints', methods=['GET'])
 def list_endpoints():
     """List all available API endpoints"""
@@ -208,6 +270,16 @@ def list_endpoints():
             "GET /api/health": "Health check",
             "GET /api/db-check": "Database health check",
             "GET /api/system-check": "Comprehensive system check",
+            "GET /api/models/ready": "AI model warm-up readiness",
+            "GET /api/models/workers": "Inference worker pool status",
+            "GET /api/models/batching": "Cross-camera inference batching stats",
+            "GET /api/system/cpu": "CPU governor budget and per-subsystem CPU usage",
+            "GET /api/system/load": "Overload load-shedding level and transitions",
+            "GET /api/cameras/hub": "Shared camera hub status",
+            "GET /api/cameras/registry": "Cached camera names and index mapping",
+            "GET /api/cameras/discovery": "Cached camera probe: resolutions and FPS per index",
+            "GET /api/streams": "MJPEG stream encode/fan-out metrics",
+            "GET /api/streams/mp4": "H.264 fMP4 stream bitrate and encoder CPU",
             "GET /api/endpoints": "List all endpoints"
         },
         "sensor": {
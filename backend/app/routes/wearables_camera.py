@@ -11,6 +11,8 @@ import os
 import logging
 from flask import Blueprint, Response, jsonify
 from app.utils.camera_config import CameraConfig
+from app.sensors.camera_hub import camera_hub
+from app.utils.stream_hub import stream_hub, viewer_options
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +30,13 @@ class WearablesCameraController:
             return
         self._initialized = True
         
-        self.cap = None
+        self.subscription = None
         self.is_running = False
         self.lock = threading.Lock()
         self.latest_frame = None
-        self.latest_frame = None
-        self.camera_index = CameraConfig.get_index('wearables') if CameraConfig.get_index('wearables') is not None else 1  # Confirmed: Wearables is Index 1
+        self.stream = stream_hub.stream('wearables')
+        wearables_index = CameraConfig.get_index('wearables')
+        self.camera_index = wearables_index if wearables_index is not None else 1  # Confirmed: Wearables is Index 1
         
         logger.info(f"👕 WearablesCameraController initialized with index: {self.camera_index}")
 
@@ -48,32 +51,16 @@ class WearablesCameraController:
             return True, "Wearables Camera already running"
         
         try:
-            # Try CAP_ANY first (auto-select), then specific backends as fallback
-            backends_to_try = [cv2.CAP_ANY, cv2.CAP_MSMF] if os.name == 'nt' else [cv2.CAP_ANY]
-            
-            for backend in backends_to_try:
-                backend_name = "ANY" if backend == cv2.CAP_ANY else "MSMF"
-                logger.info(f"[Wearables] Trying camera {self.camera_index} with {backend_name}...")
-                
-                try:
-                    self.cap = cv2.VideoCapture(self.camera_index, backend)
-                    if self.cap.isOpened():
-                        ret, frame = self.cap.read()
-                        if ret and frame is not None:
-                            logger.info(f"[Wearables] ✅ Camera {self.camera_index} opened with {backend_name}")
-                            break
-                        else:
-                            self.cap.release()
-                            self.cap = None
-                except Exception as e:
-                    logger.warning(f"[Wearables] Backend {backend_name} failed: {e}")
+            # Try CAP_ANY first (auto-select), then MSMF as fallback - device owned by the shared hub
+            backends = [cv2.CAP_ANY, cv2.CAP_MSMF] if os.name == 'nt' else [cv2.CAP_ANY]
+            self.subscription = camera_hub.subscribe(self.camera_index, backends=backends)
                     
-            if not self.cap or not self.cap.isOpened():
+            if self.subscription is None:
                 logger.error(f"[Wearables] ❌ Failed to open camera {self.camera_index}")
                 return False, "Failed to open wearables camera"
             
             self.is_running = True
-            threading.Thread(target=self._process_loop, daemon=True).start()
+            threading.Thread(target=self._process_loop, name="wearables-loop", daemon=True).start()
             logger.info(f"[Wearables] ✅ Camera {self.camera_index} started")
             return True, "Wearables Camera started"
             
@@ -83,29 +70,27 @@ class WearablesCameraController:
             
     def stop(self):
         self.is_running = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
         return True, "Wearables Camera stopped"
         
     def get_frame(self):
-        with self.lock:
-            if self.latest_frame is None:
-                return None
-            _, buffer = cv2.imencode('.jpg', self.latest_frame)
-            return buffer.tobytes()
+        return self.stream.latest_jpeg()
             
     def _process_loop(self):
-        while self.is_running and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
-                time.sleep(0.1)
+        subscription = self.subscription
+        while self.is_running and subscription and subscription.active:
+            item = subscription.read(timeout=1.0)
+            if item is None:
                 continue
+            _, frame, _ = item
             
             # Simple resize for performance if needed, keeping raw for now
             
             with self.lock:
                 self.latest_frame = frame
+            self.stream.publish(frame)
             
             time.sleep(0.04)  # ~25fps
 
@@ -130,12 +115,8 @@ def stop_wearables_camera():
 
 @wearables_routes.route('/video_feed', methods=['GET'])
 def wearables_video_feed():
-    def generate():
-        while True:
-            frame_bytes = wearables_camera.get_frame()
-            if frame_bytes:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            else:
-                time.sleep(0.1)
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    from flask import request
+    viewer = wearables_camera.stream.open_viewer(keep_alive=lambda: wearables_camera.is_running, **viewer_options(request.args))
+    if viewer is None:
+        return jsonify({"error": "Too many viewers"}), 503
+    return Response(viewer, mimetype='multipart/x-mixed-replace; boundary=frame')
@@ -14,13 +14,25 @@ Separate from weight_compliance_camera.py to avoid mode conflicts.
 """
 
 import cv2
+import numpy as np
 import threading
 import time
 import os
 import logging
 import serial
 import serial.tools.list_ports
+from app.config import Config
 from app.utils.camera_config import CameraConfig
+from app.utils.capture_pipeline import CapturePipeline
+from app.utils.active_learning import HardFrameHarvester
+from app.utils.digit_assembly import DigitAssembler
+from app.utils.bp_consensus import TemporalDigitVoter
+from app.utils.frame_trace import FrameTracer
+from app.utils.frame_transform import FrameTransform, BufferRing
+from app.sensors.camera_hub import camera_hub
+from app.sensors.inference_workers import load_yolo
+from app.utils.stream_hub import stream_hub
+from app.utils.load_shedder import load_shedder
 
 
 logger = logging.getLogger(__name__)
@@ -39,13 +51,23 @@ class BPSensorController:
             return
         self._initialized = True
         
-        self.cap = None
+        self.subscription = None # camera_hub subscription (replaces a private cv2.VideoCapture)
         self.is_running = False
         self.ai_enabled = True # Default to AI enabled
         self.lock = threading.Lock()
         self.latest_frame = None
         self.latest_clean_frame = None # Store clean frame for capture
-        self.camera_index = CameraConfig.get_index('bp') if CameraConfig.get_index('bp') is not None else 0
+        self.latest_trace = None # Latency stamps of latest_frame
+        self.latest_clean_detections = None # Model detections on latest_clean_frame (for YOLO labels)
+        self._frame_detections = None
+        self._frame_boxes = [] # (x1, y1, x2, y2, label) of kept digits, for _annotate
+        self.capture_pipeline = None # Created on first capture
+        self.hard_frames = HardFrameHarvester(Config.HARD_FRAMES_DIR) if Config.HARD_FRAMES_ENABLED else None
+        self.last_consensus = None
+        self.tracer = FrameTracer("bp")
+        self.stream = stream_hub.stream("bp") # Annotated frames, JPEG-encoded once for all viewers
+        bp_index = CameraConfig.get_index('bp')
+        self.camera_index = bp_index if bp_index is not None else 0
         
         logger.info(f"🩸 BPSensorController initialized with index: {self.camera_index}")
 
@@ -55,6 +77,8 @@ class BPSensorController:
         self.zoom_factor = 1.4  # Default 1.4x zoom per user preference
         self.square_crop = True
         self.rotation = 0 # Assume default orientation
+        self.transform = FrameTransform() # Rotation/crop/zoom as one resize into reused buffers
+        self.overlay_ring = BufferRing() # Annotated copies (clean frame stays untouched for capture)
         
         # Arduino Serial Connection
         self.arduino = None
@@ -63,6 +87,10 @@ class BPSensorController:
         
         # BP Detection State
         self.bp_yolo = None
+        self.model_lock = threading.Lock()
+        self.digit_assembler = DigitAssembler(iou_threshold=0.4)
+        self.result_voter = TemporalDigitVoter()
+        self.clock = time.time # Session clock for detection timing (swapped by the replay harness)
         self.bp_history = []
         self.last_smooth_bp = 0
         self.trend_state = "Stable ⏸️"
@@ -76,6 +104,7 @@ class BPSensorController:
             "trend": "Waiting",
             "error": False,
             "is_running": False,
+            "confidence": 0.0,
             "timestamp": 0
         }
         
@@ -94,7 +123,7 @@ class BPSensorController:
         self.last_illegal_press_time = 0 # Track timestamp of unauthorized presses
         
         # Start persistent Serial Listener for hardware policing
-        threading.Thread(target=self._serial_listener, daemon=True).start()
+        threading.Thread(target=self._serial_listener, name="serial-bp", daemon=True).start()
         
         logger.info("🩸 BPSensorController initialized")
     
@@ -219,9 +248,7 @@ class BPSensorController:
             self.ignore_start_until = 0    # NEW: Cooldown for manual interrupts
             
             # Reset Stability Trackers
-            self.last_res_sys = None
-            self.last_res_dia = None
-            self.res_stable_start = 0
+            self.result_voter.reset()
             
             # CRITICAL: Reset Status for New User
             self.bp_status = {
@@ -230,6 +257,7 @@ class BPSensorController:
                 "trend": "Waiting",
                 "error": False,
                 "is_running": False,
+                "confidence": 0.0,
                 "timestamp": 0
             }
             
@@ -240,38 +268,11 @@ class BPSensorController:
             self.zoom_factor = 1.4  # Default 1.4x zoom per user preference (Updated to 1.4x for better digit visibility)
             self.rotation = 0
             
-            # Robust Camera Opening
-            indices_to_try = [self.camera_index]
+            # Camera is owned by the shared hub (reuses a warm device if another page had it open)
+            backends = [cv2.CAP_MSMF, cv2.CAP_DSHOW, cv2.CAP_ANY] if os.name == 'nt' else [cv2.CAP_ANY]
+            self.subscription = camera_hub.subscribe(self.camera_index, backends=backends)
             
-            backends = []
-            if os.name == 'nt':
-                backends = [cv2.CAP_MSMF, cv2.CAP_DSHOW, cv2.CAP_ANY]
-            else:
-                backends = [cv2.CAP_ANY]
-            
-            for idx in indices_to_try:
-                for backend in backends:
-                    backend_name = "DSHOW" if backend == cv2.CAP_DSHOW else "MSMF" if backend == cv2.CAP_MSMF else "ANY"
-                    logger.info(f"[BP] Trying camera {idx} with {backend_name}...")
-                    
-                    try:
-                        temp_cap = cv2.VideoCapture(idx, backend)
-                        if temp_cap.isOpened():
-                            ret, frame = temp_cap.read()
-                            if ret and frame is not None and frame.size > 0:
-                                self.cap = temp_cap
-                                self.camera_index = idx
-                                logger.info(f"[BP] ✅ Camera {idx} opened with {backend_name}")
-                                break
-                            else:
-                                temp_cap.release()
-                    except Exception as e:
-                        logger.error(f"[BP] Camera open error: {e}")
-                        
-                if self.cap and self.cap.isOpened():
-                    break
-            
-            if not self.cap or not self.cap.isOpened():
+            if self.subscription is None:
                 logger.error("[BP] ❌ Failed to open any camera")
                 return False, "Failed to open camera"
             
@@ -283,7 +284,7 @@ class BPSensorController:
             self.error_frame_count = 0
             self.error_handled = False
             
-            threading.Thread(target=self._process_loop, daemon=True).start()
+            threading.Thread(target=self._process_loop, name="bp-loop", daemon=True).start()
             
             # Send LCD message to show "Blood Pressure Ready"
             self.send_command("LCD_BP_READY", auto_connect=True)
@@ -313,9 +314,9 @@ class BPSensorController:
         self.has_inflated = False # Reset inflation flag
         self.on_bp_page = False # Disallow physical button
         
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
         
         # Send LCD message to show "System Ready" (idle state)
         self.send_command("LCD_IDLE", auto_connect=True)
@@ -346,6 +347,7 @@ class BPSensorController:
         
         # Reset detection state
         self.bp_history = []
+        self.result_voter.reset()
         self.last_smooth_bp = 0
         self.stable_frames_count = 0
         self.trend_state = "Stable ⏸️"
@@ -374,6 +376,7 @@ class BPSensorController:
                 "trend": "Ready",
                 "error": False,
                 "is_running": self.is_running,
+                "confidence": 0.0,
                 "timestamp": time.time()
             }
         
@@ -440,6 +443,7 @@ class BPSensorController:
                             logger.info("👆 PHYSICAL BUTTON PRESSED - BP Phase Active (Allowed)")
                             with self.lock:
                                 self.start_command_sent = True
+                                self.result_voter.reset()  # New measurement
                                 self.trend_state = "Inflating ⬆️" # Anticipate inflation
                                 self.bp_status["trend"] = "Starting..."
                                 
@@ -461,65 +465,40 @@ class BPSensorController:
     def get_status(self):
         """Get the current BP status for frontend polling."""
         with self.lock:
+            self.tracer.visible(self.latest_trace, "status")
             return self.bp_status.copy()
     
     def get_frame(self):
-        """Get the latest annotated frame as JPEG bytes."""
-        with self.lock:
-            if self.latest_frame is None:
-                return None
-            _, buffer = cv2.imencode('.jpg', self.latest_frame)
-            return buffer.tobytes()
+        """Get the latest annotated frame as JPEG bytes (shares the stream's encode)."""
+        return self.stream.latest_jpeg()
+    
+    def get_latency(self):
+        """Per-stage frame latency histograms (capture -> visible)."""
+        return self.tracer.snapshot()
     
     def _apply_zoom(self, frame):
-        """Apply rotation, zoom, and square crop."""
-        
-        # 1. Rotation
-        if self.rotation != 0:
-            if self.rotation == 90:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-            elif self.rotation == 180:
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-            elif self.rotation == 270:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-
-        h, w = frame.shape[:2]
-        
-        # 2. Square crop
-        if self.square_crop:
-            size = min(h, w)
-            x1 = (w - size) // 2
-            y1 = (h - size) // 2
-            frame = frame[y1:y1+size, x1:x1+size]
-            h, w = frame.shape[:2]
-        
-        # 3. Zoom
-        if self.zoom_factor != 1.0 and self.zoom_factor > 1.0:
-            new_w = int(w / self.zoom_factor)
-            new_h = int(h / self.zoom_factor)
-            x1 = (w - new_w) // 2
-            y1 = (h - new_h) // 2
-            frame = frame[y1:y1+new_h, x1:x1+new_w]
-            frame = cv2.resize(frame, (w, h))
-        
-        return frame
+        """Apply rotation, square crop and zoom (in that order) as one ROI resize."""
+        t = self.transform
+        t.rotation = self.rotation
+        t.square_crop = self.square_crop
+        t.zoom = self.zoom_factor
+        return t.apply(frame)
     
-    def _process_loop(self):
-        """Main processing loop for BP detection."""
-        # Note: Serial Listener is now persistent and started in __init__
-        # We don't start it here anymore.
-
-
-        # Lazy load YOLO model
-        if not self.bp_yolo:
+    def load_model(self):
+        """Load bp.pt once. Safe to call from the warm-up thread and the process loop."""
+        if self.bp_yolo:
+            return self.bp_yolo
+        
+        with self.model_lock:
+            if self.bp_yolo:
+                return self.bp_yolo
             try:
-                from ultralytics import YOLO
                 # Use absolute path to ensure we find it
                 base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/
                 yolo_path = os.path.join(base_dir, 'ai_camera', 'models', 'bp.pt')
                 
                 if os.path.exists(yolo_path):
-                    self.bp_yolo = YOLO(yolo_path)
+                    self.bp_yolo = load_yolo(yolo_path)
                     logger.info(f"[BP] ✅ Loaded YOLO model from: {yolo_path}")
                 else:
                     logger.error(f"[BP] ❌ Model not found at: {yolo_path}")
@@ -527,51 +506,96 @@ class BPSensorController:
             except Exception as e:
                 logger.error(f"[BP] Failed to load YOLO: {e}")
                 self.bp_yolo = None
+        return self.bp_yolo
+    
+    def _process_loop(self):
+        """Main processing loop for BP detection."""
+        # Note: Serial Listener is now persistent and started in __init__
+        # We don't start it here anymore.
+
+
+        # Lazy load YOLO model (normally already done by the startup warm-up)
+        self.load_model()
         
-        while self.is_running and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
-                time.sleep(0.1)
+        subscription = self.subscription
+        while self.is_running and subscription and subscription.active:
+            read_start = time.perf_counter()
+            item = subscription.read(timeout=1.0)
+            if item is None:
                 continue
+            _, frame, captured = item
+            trace = self.tracer.begin(read_start, capture=captured)
             
             # Apply filters
             frame = self._apply_zoom(frame)
-            clean_view = frame.copy() # Clean copy for capture
-            annotated_frame = frame.copy()
-            h, w = frame.shape[:2]
-            
-            # Draw guide box
-            center_x, center_y = w // 2, h // 2
-            box_w, box_h = int(w * 0.6), int(h * 0.6)
-            cv2.rectangle(annotated_frame, 
-                          (center_x - box_w//2, center_y - box_h//2), 
-                          (center_x + box_w//2, center_y + box_h//2), 
-                          (255, 255, 255), 1)
+            trace.mark("preprocess")
+            clean_view = frame # Transform output is already a private buffer
             
             # Run detection
+            self._frame_detections = None
+            self._frame_boxes = []
             if self.ai_enabled and self.bp_yolo:
-                self._run_detection(frame, annotated_frame)
-                # Visual Indicator for AI
-                cv2.circle(annotated_frame, (30, 30), 10, (0, 255, 0), -1) 
-                cv2.putText(annotated_frame, "AI ACTIVE", (50, 35), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-            elif not self.ai_enabled:
-                cv2.putText(annotated_frame, "RAW VIDEO (AI OFF)", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                self._run_detection(frame)
+                trace.mark("inference")
+                load_shedder.report("bp", (trace.inference - trace.preprocess) * 1000.0,
+                                    (trace.received - trace.capture) * 1000.0)
+            
+            # Headless: nobody is watching the stream, so skip all drawing (status still updates).
+            # Under overload the preview is rate-limited / left unannotated; detection never is.
+            watched = self.stream.watched() and load_shedder.publish_preview("bp")
+            if watched and load_shedder.annotate():
+                annotated_frame = self._annotate(frame)
+                trace.mark("annotate")
             else:
-                cv2.putText(annotated_frame, "AI Model Missing", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                annotated_frame = clean_view
             
             with self.lock:
                 self.latest_frame = annotated_frame
                 self.latest_clean_frame = clean_view
+                self.latest_clean_detections = self._frame_detections
+                self.latest_trace = trace
                 self.bp_status["timestamp"] = time.time()
                 self.bp_status["is_running"] = True
+            self.tracer.publish(trace)
+            if watched:
+                self.stream.publish(annotated_frame, trace, self.tracer)
             
             time.sleep(0.05)  # ~20 FPS internal processing
     
-    def _run_detection(self, frame, annotated_frame):
-        """Run YOLO detection and parse BP values."""
+    def _annotate(self, frame):
+        """Draw guide box, kept digit boxes and AI state onto an overlay copy of `frame`."""
+        annotated_frame = self.overlay_ring.copy(frame)
+        h, w = frame.shape[:2]
+        
+        # Draw guide box
+        center_x, center_y = w // 2, h // 2
+        box_w, box_h = int(w * 0.6), int(h * 0.6)
+        cv2.rectangle(annotated_frame, 
+                      (center_x - box_w//2, center_y - box_h//2), 
+                      (center_x + box_w//2, center_y + box_h//2), 
+                      (255, 255, 255), 1)
+        
+        # Draw Final Digits
+        for x1, y1, x2, y2, label in self._frame_boxes:
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(annotated_frame, label, (x1, y1 - 5), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        
+        if self.ai_enabled and self.bp_yolo:
+            # Visual Indicator for AI
+            cv2.circle(annotated_frame, (30, 30), 10, (0, 255, 0), -1) 
+            cv2.putText(annotated_frame, "AI ACTIVE", (50, 35), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        elif not self.ai_enabled:
+            cv2.putText(annotated_frame, "RAW VIDEO (AI OFF)", (10, 30), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        else:
+            cv2.putText(annotated_frame, "AI Model Missing", (10, 30), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        return annotated_frame
+    
+    def _run_detection(self, frame):
+        """Run YOLO detection and parse BP values. Kept digit boxes go to self._frame_boxes."""
         # Stop processing if we already have a confirmed result
         if getattr(self, 'result_confirmed', False):
              return
@@ -580,87 +604,40 @@ class BPSensorController:
         # agnostic_nms=True helps prevent multiple classes (e.g. 1 and 7) on same spot
         results = self.bp_yolo(frame, conf=0.25, verbose=False, agnostic_nms=True)
         
-        raw_detections = []
         error_detected = False
+        assembly = None
+        harvest_detections = None
         
         if results and len(results[0].boxes) > 0:
-            for box in results[0].boxes:
-                cls_id = int(box.cls[0])
-                label = results[0].names[cls_id]
-                conf = float(box.conf[0])
-                
-                if label.lower() == 'error':
-                    # Ignore error if we recently restarted (screen lag)
-                    if time.time() < getattr(self, 'ignore_error_until', 0):
-                         continue
+            boxes = results[0].boxes
+            xyxy = boxes.xyxy.cpu().numpy()
+            confs = boxes.conf.cpu().numpy()
+            cls_ids = boxes.cls.cpu().numpy().astype(int)
+            digit_lut, error_ids = self._class_lookup(results[0].names)
+            
+            # Confident boxes become pre-filled labels if this frame gets captured
+            label_mask = confs >= 0.5
+            self._frame_detections = [(c, *box) for c, box in zip(cls_ids[label_mask].tolist(), xyxy[label_mask].tolist())]
+            
+            if np.isin(cls_ids, error_ids).any():
+                # Ignore error if we recently restarted (screen lag)
+                if time.time() >= getattr(self, 'ignore_error_until', 0):
                     error_detected = True
-                    continue
-                
-                if not label.isdigit():
-                    continue
-                
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                raw_detections.append({
-                    "label": label,
-                    "conf": conf,
-                    "box": [x1, y1, x2, y2],
-                    "area": (x2 - x1) * (y2 - y1)
-                })
-
-        # --- NON-MAXIMUM SUPPRESSION (FILTER OVERLAPS) ---
-        # Sort by confidence (highest first)
-        raw_detections.sort(key=lambda x: x['conf'], reverse=True)
-        
-        final_digits = []
-        
-        def calculate_iou(boxA, boxB):
-            # determine the (x, y)-coordinates of the intersection rectangle
-            xA = max(boxA[0], boxB[0])
-            yA = max(boxA[1], boxB[1])
-            xB = min(boxA[2], boxB[2])
-            yB = min(boxA[3], boxB[3])
-            
-            # compute the area of intersection rectangle
-            interArea = max(0, xB - xA) * max(0, yB - yA)
-            
-            # compute the area of both the prediction and ground-truth rectangles
-            boxAArea = (boxA[2] - boxA[0]) * (boxA[3] - boxA[1])
-            boxBArea = (boxB[2] - boxB[0]) * (boxB[3] - boxB[1])
-            
-            # compute the intersection over union by taking the intersection
-            # area and dividing it by the sum of prediction + ground-truth
-            # areas - the interesection area
-            iou = interArea / float(boxAArea + boxBArea - interArea)
-            return iou
-
-        for det in raw_detections:
-            is_overlap = False
-            for kept in final_digits:
-                # If IoU > 0.4, consider it the same digit
-                if calculate_iou(det['box'], kept['box']) > 0.4:
-                    is_overlap = True
-                    break
             
-            if not is_overlap:
-                final_digits.append(det)
-
-        # ------------------------------------------------
-        
-        detected_digits = []
-        
-        # Draw and Process Final Digits
-        for d in final_digits:
-             x1, y1, x2, y2 = d['box']
-             label = d['label']
-             center_x = (x1 + x2) / 2
-             center_y = (y1 + y2) / 2
-             
-             # Draw box
-             cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-             cv2.putText(annotated_frame, label, (x1, y1 - 5), 
-                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-             
-             detected_digits.append({"val": label, "cx": center_x, "cy": center_y})
+            # Keep digit classes only, then NMS + row assembly on arrays
+            digit_vals = digit_lut[cls_ids]
+            is_digit = digit_vals >= 0
+            digit_idx = np.flatnonzero(is_digit)
+            assembly = self.digit_assembler.assemble(xyxy[is_digit], confs[is_digit], digit_vals[is_digit])
+            
+            # Final digits, drawn later only if someone is watching
+            self._frame_boxes = [(*map(int, xyxy[i]), str(digit_vals[i])) for i in digit_idx[assembly["keep"]]]
+            
+            # Hard-frame labels need every box the model found, the low-confidence digits that
+            # made the frame hard included (conf >= 0.5 only would mark them as background)
+            if self.hard_frames is not None:
+                label_idx = np.concatenate([digit_idx[assembly["keep"]], np.flatnonzero(np.isin(cls_ids, error_ids))])
+                harvest_detections = [(int(cls_ids[i]), *xyxy[i].tolist(), float(confs[i])) for i in label_idx]
 
         # Parse digits
         # PRIORITY: If error detected, use debounced detection (5 frames)
@@ -708,35 +685,60 @@ class BPSensorController:
              if hasattr(self, 'error_frame_count'):
                   self.error_frame_count = 0
         
-        if len(detected_digits) > 0:
-            self._parse_digits(detected_digits, error_detected)
+        if assembly is not None and len(assembly["keep"]) > 0:
+            self.last_consensus = None
+            self._parse_digits(assembly, error_detected)
+            
+            # Active learning: keep borderline / disagreeing frames for the next model
+            if self.hard_frames is not None:
+                self.hard_frames.consider(frame, assembly, self.last_consensus, harvest_detections)
     
+    def _class_lookup(self, names):
+        """Map YOLO class ids to digit values (-1 = not a digit) and 'error' class ids. Cached per names dict."""
+        cached = getattr(self, '_class_lut', None)
+        if cached is not None and cached[0] is names:
+            return cached[1], cached[2]
+        
+        size = max(names.keys()) + 1 if names else 0
+        digit_lut = np.full(size, -1, dtype=np.intp)
+        error_ids = []
+        for cls_id, label in names.items():
+            if label.isdigit():
+                digit_lut[cls_id] = int(label)
+            elif label.lower() == 'error':
+                error_ids.append(cls_id)
+        
+        error_ids = np.asarray(error_ids, dtype=np.intp)
+        self._class_lut = (names, digit_lut, error_ids)
+        return digit_lut, error_ids
+
     def _is_startup_pattern(self, val_str):
         """Check if value is likely the '888' startup check."""
         return val_str and all(c == '8' for c in val_str) and len(val_str) >= 2
 
-    def _parse_digits(self, detected_digits, error_detected):
-        """Parse detected digits into systolic/diastolic values."""
-        min_y = min(d['cy'] for d in detected_digits)
-        max_y = max(d['cy'] for d in detected_digits)
-        vertical_spread = max_y - min_y
+    def _parse_digits(self, assembly, error_detected):
+        """Parse an assembled digit layout (see DigitAssembler) into systolic/diastolic values."""
         
         # Throttling counter for Serial updates
-        current_time = time.time()
+        current_time = self.clock()
         if not hasattr(self, 'last_serial_update'):
              self.last_serial_update = 0
              
         should_send = (current_time - self.last_serial_update) > 1.0 # 1 sec throttle
         
-        if vertical_spread < 50:
+        if not assembly["two_rows"]:
             # Single row - Pumping/Deflating
-            detected_digits.sort(key=lambda k: k['cx'])
-            sys_str = "".join([d['val'] for d in detected_digits])
+            sys_str = assembly["sys"]
             dia_str = ""
             
+            # A single-row frame on the result screen is usually a dropped/merged dia row:
+            # keep the consensus and let its time decay fade it. Only a new measurement
+            # (startup pattern, physical start button) starts it over.
+            
             # HANDLE STARTUP PATTERN (888)
             if self._is_startup_pattern(sys_str):
                 # detected '888' -> The monitor is initializing
+                self.result_voter.reset()
                 self.trend_state = "Starting..."
                 self._update_status("--", "--", "Starting ⏳", False)
                 return
@@ -825,19 +827,13 @@ class BPSensorController:
             self._log_reading(sys_str, dia_str, trend)
             
         else:
-            # Result
-            mid_y = (min_y + max_y) / 2
-            top_row = [d for d in detected_digits if d['cy'] < mid_y]
-            bottom_row = [d for d in detected_digits if d['cy'] >= mid_y]
-            
-            top_row.sort(key=lambda k: k['cx'])
-            bottom_row.sort(key=lambda k: k['cx'])
-            
-            sys_str = "".join([d['val'] for d in top_row])
-            dia_str = "".join([d['val'] for d in bottom_row])
+            # Result (rows already split and sorted left-to-right)
+            sys_str = assembly["sys"]
+            dia_str = assembly["dia"]
             
             # HANDLE STARTUP PATTERN (888/888)
             if self._is_startup_pattern(sys_str) or self._is_startup_pattern(dia_str):
+                 self.result_voter.reset()
                  self.trend_state = "Starting..."
                  self._update_status("--", "--", "Starting ⏳", False)
                  return
@@ -856,25 +852,24 @@ class BPSensorController:
             if not self.has_inflated and not self.start_command_sent:
                  return # Ignore stale
 
-            # --- STABILITY CHECK (2.0s) ---
-            # Initialize tracking vars if missing
-            if not hasattr(self, 'last_res_sys'): self.last_res_sys = None
-            if not hasattr(self, 'last_res_dia'): self.last_res_dia = None
-            if not hasattr(self, 'res_stable_start'): self.res_stable_start = 0
-            
-            # Check if values changed
-            if sys_str != self.last_res_sys or dia_str != self.last_res_dia:
-                self.last_res_sys = sys_str
-                self.last_res_dia = dia_str
-                self.res_stable_start = time.time()
-                return # Reset timer, wait for next frame
-            
-            # Check duration
-            if (time.time() - self.res_stable_start) < 2.0:
-                return # Wait for stability
+            # --- TEMPORAL CONSENSUS ---
+            # Per-digit-position voting weighted by detection confidence.
+            # A single flickering digit no longer restarts a fixed 2.0s stability clock.
+            self.result_voter.update(sys_str, dia_str, assembly["sys_conf"], assembly["dia_conf"], now=self.clock())
+            consensus = self.result_voter.result()
+            self.last_consensus = consensus
+            with self.lock:
+                self.bp_status["confidence"] = consensus["confidence"]
+            
+            if not consensus["confirmed"]:
+                return # Wait for more evidence
+            
+            sys_str, dia_str = consensus["sys"], consensus["dia"]
+            self._update_status(sys_str, dia_str, trend, error_detected)
+            self.result_voter.reset()
             # ------------------------------
 
-            logger.info(f"✅ BP Result Confirmed: {sys_str}/{dia_str}")
+            logger.info(f"✅ BP Result Confirmed: {sys_str}/{dia_str} (confidence {consensus['confidence']:.3f}, {consensus['frames']} frames)")
             print(f"✅ BP Result Confirmed: {sys_str}/{dia_str}")
             
             # Send result to LCD ONLY ONCE
@@ -949,27 +944,40 @@ class BPSensorController:
             except ValueError:
                 pass
 
-    def capture_image(self, class_name):
-        """Capture the current frame and save to disk."""
+    def capture_image(self, class_name, with_labels=None):
+        """Queue the current clean frame for the training dataset (written in the background)."""
         with self.lock:
             # Prefer clean frame if available
             frame_to_save = self.latest_clean_frame if self.latest_clean_frame is not None else self.latest_frame
+            detections = self.latest_clean_detections
 
-            if frame_to_save is None:
-                return False, "No frame available"
-            
-            save_dir = r"C:\Users\VitalSign\Pictures\Camera Roll"
-            class_dir = os.path.join(save_dir, class_name)
-            if not os.path.exists(class_dir):
-                os.makedirs(class_dir)
-            
-            timestamp = int(time.time() * 1000)
-            filename = f"{class_name}_{timestamp}.jpg"
-            filepath = os.path.join(class_dir, filename)
-            
-            cv2.imwrite(filepath, frame_to_save)
-            logger.info(f"[BP] Captured/Saved Image: {filepath}")
-            return True, filepath
+        if frame_to_save is None:
+            return False, "No frame available"
+        
+        if with_labels is None:
+            with_labels = Config.BP_CAPTURE_LABELS
+        if not with_labels:
+            detections = None
+        
+        if self.capture_pipeline is None:
+            self.capture_pipeline = CapturePipeline(Config.BP_DATASET_DIR)
+        
+        status, filepath = self.capture_pipeline.submit(frame_to_save, class_name, detections)
+        if status == "invalid":
+            return False, "Invalid class name (letters, digits, '_' and '-' only)"
+        if status == "dropped":
+            return False, "Capture queue full"
+        return True, {"status": status, "filepath": filepath}
+    
+    def get_hard_frame_stats(self):
+        if self.hard_frames is None:
+            return {"enabled": False}
+        return dict(self.hard_frames.get_stats(), enabled=True)
+    
+    def get_capture_stats(self):
+        if self.capture_pipeline is None:
+            return {"dataset_root": Config.BP_DATASET_DIR}
+        return self.capture_pipeline.get_stats()
 
 # Singleton instance
 bp_sensor = BPSensorController()
@@ -0,0 +1,229 @@
+"""
+Concurrent Camera Discovery
+Probes camera indices in parallel, each with its own deadline, and caches what it finds.
+
+The old startup discovery (run.py) opened indices 0-4 one after another and read a frame
+from each; one missing or slow device blocked startup for seconds, so it was disabled.
+
+- One probe thread per index; discover() waits at most CAMERA_PROBE_TIMEOUT_S overall.
+  OpenCV calls can't be interrupted, so a probe that overruns is reported as "timeout"
+  and cancelled: it stops after its current call and releases the device
+- A probe holds the hub's per-device open lock: devices the hub has open (or is opening)
+  are reported as "in_use" and never opened twice, and a hub open that arrives while a
+  probe runs cancels the probe and waits for it to release the device
+- Per device: backend, supported resolutions (set + read back the real frame size) and
+  FPS measured over a short burst of reads
+- Cameras the hub already has open are reported from the hub, not re-opened
+- Results are cached in memory and in camera_discovery.json, keyed by the camera
+  registry's device list: startup and the Clearance page reuse them until a camera
+  is plugged/unplugged or a refresh is forced
+
+Exposed at GET /api/cameras/discovery (?refresh=1 to re-probe).
+"""
+
+import os
+import json
+import threading
+import time
+import logging
+
+import cv2
+
+from app.config import Config
+from app.sensors.camera_hub import camera_hub, default_backends, BACKEND_NAMES
+from app.utils.camera_config import camera_registry
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'camera_discovery.json')
+CANDIDATE_RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+FPS_SAMPLE_FRAMES = 15
+
+
+class ProbeCancelled(Exception):
+    pass
+
+
+def probe_camera(index, backends=None, cancelled=None):
+    """
+    Open `index`, list working resolutions and measure FPS. Blocking; returns a dict.
+    cancelled(): checked between OpenCV calls; True stops the probe and releases the device.
+    """
+    start = time.perf_counter()
+
+    def check():
+        if cancelled is not None and cancelled():
+            raise ProbeCancelled()
+
+    for backend in backends or default_backends():
+        try:
+            check()
+        except ProbeCancelled:
+            break
+        cap = cv2.VideoCapture(index, backend)
+        try:
+            check()
+            if not cap.isOpened():
+                continue
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                continue
+
+            resolutions = []
+            for width, height in CANDIDATE_RESOLUTIONS:
+                check()
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                ret, frame = cap.read()
+                if ret and frame is not None and (frame.shape[1], frame.shape[0]) == (width, height):
+                    resolutions.append([width, height])
+
+            # FPS at the size the pipelines use
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            cap.read()
+            stamps = []
+            for _ in range(FPS_SAMPLE_FRAMES):
+                check()
+                if cap.read()[0]:
+                    stamps.append(time.perf_counter())
+            fps = (len(stamps) - 1) / (stamps[-1] - stamps[0]) if len(stamps) > 1 and stamps[-1] > stamps[0] else None
+
+            return {
+                "index": index,
+                "status": "ok",
+                "backend": BACKEND_NAMES.get(backend, str(backend)),
+                "resolutions": resolutions,
+                "fps": round(fps, 1) if fps else None,
+                "reported_fps": round(cap.get(cv2.CAP_PROP_FPS), 1) or None,
+                "probe_ms": round((time.perf_counter() - start) * 1000.0, 1),
+            }
+        except ProbeCancelled:
+            return {"index": index, "status": "cancelled", "probe_ms": round((time.perf_counter() - start) * 1000.0, 1)}
+        except Exception as e:
+            logger.error(f"📷 [Discovery] Camera {index} probe error: {e}")
+        finally:
+            cap.release()
+    status = "cancelled" if cancelled is not None and cancelled() else "not_found"
+    return {"index": index, "status": status, "probe_ms": round((time.perf_counter() - start) * 1000.0, 1)}
+
+
+class CameraDiscovery:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.lock = threading.Lock()
+        self.running = threading.Lock()  # Only one discovery at a time
+        self.result = None
+        self.thread = None
+
+    @staticmethod
+    def _signature():
+        return [[d["index"], d["name"]] for d in camera_registry.list_devices()]
+
+    def _load_cache(self, signature):
+        try:
+            with open(CACHE_FILE, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cached if cached.get("signature") == signature else None
+
+    def _save_cache(self, result):
+        try:
+            with open(CACHE_FILE, 'w') as f:
+                json.dump(result, f, indent=4)
+        except Exception as e:
+            logger.error(f"📷 [Discovery] Failed to save cache: {e}")
+
+    def discover(self, indices=None, timeout=None, force=False):
+        """Cached result, or probe all indices in parallel (at most `timeout` seconds)."""
+        indices = list(indices if indices is not None else range(Config.CAMERA_PROBE_INDICES))
+        timeout = timeout or Config.CAMERA_PROBE_TIMEOUT_S
+        signature = self._signature()
+
+        with self.running:
+            with self.lock:
+                if not force and self.result is not None and self.result["signature"] == signature:
+                    return self.result
+            if not force:
+                cached = self._load_cache(signature)
+                if cached is not None:
+                    with self.lock:
+                        self.result = cached
+                    logger.info(f"📷 [Discovery] Using cached result: {cached['available']}")
+                    return cached
+
+            result = self._probe_all(indices, timeout)
+            result["signature"] = signature
+            with self.lock:
+                self.result = result
+            self._save_cache(result)
+            return result
+
+    def _probe_all(self, indices, timeout):
+        start = time.perf_counter()
+        results = {}
+        timed_out = threading.Event()
+
+        def run(index):
+            device = camera_hub.device(index)
+            if device.is_open or device.openers or not device.open_lock.acquire(blocking=False):
+                results[index] = {"index": index, "status": "in_use", "open_ms": device.open_ms}
+                return
+            try:
+                if device.is_open:
+                    results[index] = {"index": index, "status": "in_use", "open_ms": device.open_ms}
+                    return
+                result = probe_camera(index, cancelled=lambda: timed_out.is_set() or device.openers > 0)
+                if result["status"] == "cancelled" and not timed_out.is_set():
+                    result = {"index": index, "status": "in_use", "open_ms": None}  # The hub took it over
+                results[index] = result
+            finally:
+                device.open_lock.release()
+
+        threads = {}
+        for index in indices:
+            threads[index] = threading.Thread(target=run, args=(index,), name=f"camera-probe-{index}", daemon=True)
+            threads[index].start()
+
+        deadline = time.monotonic() + timeout
+        for index, thread in threads.items():
+            thread.join(max(0.0, deadline - time.monotonic()))
+        timed_out.set()  # Overrunning probes stop after their current OpenCV call and release the device
+        for index, thread in threads.items():
+            if thread.is_alive():
+                results[index] = {"index": index, "status": "timeout", "probe_ms": round(timeout * 1000.0, 1)}
+                logger.warning(f"📷 [Discovery] Camera {index} did not answer within {timeout:.1f}s")
+
+        devices = [dict(results[i]) for i in indices]
+        available = [d["index"] for d in devices if d["status"] in ("ok", "in_use")]
+        elapsed_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        logger.info(f"📷 [Discovery] Cameras {available} found in {elapsed_ms:.0f} ms")
+        return {"time": time.time(), "elapsed_ms": elapsed_ms, "available": available, "devices": devices}
+
+    def start(self):
+        """Discover in the background (startup); no-op if already started."""
+        with self.lock:
+            if self.thread is not None:
+                return False
+            self.thread = threading.Thread(target=self.discover, name="camera-discovery", daemon=True)
+            self.thread.start()
+        return True
+
+    def get_status(self):
+        with self.lock:
+            return {"running": self.running.locked(), "result": self.result}
+
+
+camera_discovery = CameraDiscovery()
@@ -0,0 +1,320 @@
+"""
+Camera Hub
+One capture thread per physical camera, shared by any number of subscribers.
+
+Before this, BPSensorController, ClearanceManager and WearablesCameraController each
+opened cv2.VideoCapture themselves (with their own backend-trial loop and reader
+thread), and handing a camera to another owner meant release + reopen (1-3 s).
+
+- CameraHub.subscribe(index) opens the device on first use and returns a Subscription
+- Every frame gets a per-device sequence number and a capture timestamp
+- Delivery modes:
+    'latest' - read() returns the newest frame not yet seen (skips stale frames)
+    'all'    - read() returns every frame in order from a bounded per-subscriber queue
+- Devices stay open after the last subscriber leaves and are released after
+  idle_timeout seconds, so switching stages/pages reuses a warm camera
+
+Frames are shared between subscribers: treat them as read-only (copy before drawing).
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import deque
+
+import cv2
+
+from app.utils.camera_config import camera_registry
+
+logger = logging.getLogger(__name__)
+
+BACKEND_NAMES = {cv2.CAP_ANY: "ANY", cv2.CAP_DSHOW: "DSHOW", cv2.CAP_MSMF: "MSMF"}
+
+
+def default_backends():
+    return [cv2.CAP_MSMF, cv2.CAP_DSHOW, cv2.CAP_ANY] if os.name == 'nt' else [cv2.CAP_ANY]
+
+
+def open_capture(index, backends=None, width=None, height=None, fps=None):
+    """Try each backend until one opens AND returns a frame. Returns cv2.VideoCapture or None."""
+    for backend in backends or default_backends():
+        name = BACKEND_NAMES.get(backend, str(backend))
+        logger.info(f"📷 [Hub] Trying camera {index} with {name}...")
+        try:
+            cap = cv2.VideoCapture(index, backend)
+            if not cap.isOpened():
+                cap.release()
+                continue
+            if width:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            if height:
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps:
+                cap.set(cv2.CAP_PROP_FPS, fps)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            ret, frame = cap.read()
+            if ret and frame is not None and frame.size > 0:
+                logger.info(f"📷 [Hub] ✅ Camera {index} opened with {name}")
+                return cap
+            cap.release()
+        except Exception as e:
+            logger.error(f"📷 [Hub] Camera {index} open error ({name}): {e}")
+    return None
+
+
+class Subscription:
+    def __init__(self, device, mode='latest', max_queue=30):
+        self.device = device
+        self.mode = mode
+        self.queue = deque(maxlen=max_queue) if mode == 'all' else None
+        self.last_seq = 0
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, item):
+        """Called by the capture thread with the device condition held."""
+        if self.queue is not None:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(item)
+
+    def read(self, timeout=1.0):
+        """
+        Block until a frame is available. Returns (seq, frame, capture_time) or None
+        on timeout / when the subscription or device is closed.
+        """
+        cond = self.device.cond
+        deadline = time.monotonic() + timeout
+        with cond:
+            while not self.closed and self.device.is_open:
+                if self.queue is not None:
+                    if self.queue:
+                        item = self.queue.popleft()
+                        self.last_seq = item[0]
+                        return item
+                elif self.device.latest is not None and self.device.latest[0] > self.last_seq:
+                    item = self.device.latest
+                    self.last_seq = item[0]
+                    return item
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                cond.wait(remaining)
+        return None
+
+    @property
+    def active(self):
+        return not self.closed and self.device.is_open
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.device.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CameraDevice:
+    def __init__(self, index, idle_timeout):
+        self.index = index
+        self.idle_timeout = idle_timeout
+        self.cap = None
+        self.thread = None
+        self.cond = threading.Condition()
+        self.open_lock = threading.Lock()   # One open_capture() at a time per index (discovery probes too)
+        self.openers = 0            # Callers inside open(): a running discovery probe backs off
+        self.settings = None        # (width, height, fps) requested by the opener
+        self.subscribers = []
+        self.latest = None          # (seq, frame, capture_time)
+        self.seq = 0
+        self.is_open = False
+        self.idle_since = None
+        self.opened_at = None
+        self.open_ms = None
+        self.read_failures = 0
+        self.generation = 0         # Bumped on every open so a stale capture thread can't close a new session
+
+    def _check_settings(self, width, height, fps):
+        """Warn when a caller asks an already-open device for another size / frame rate."""
+        wanted = (width, height, fps)
+        if self.settings is not None and any(w is not None and w != o for w, o in zip(wanted, self.settings)):
+            logger.warning(f"📷 [Hub] Camera {self.index} already open at {self.settings} (w, h, fps); "
+                           f"ignoring requested {wanted}")
+
+    def open(self, backends=None, width=None, height=None, fps=None):
+        """Open the device if needed. Returns True when the capture thread is running."""
+        with self.cond:
+            self.openers += 1
+        try:
+            with self.open_lock:  # Concurrent openers wait for the first one instead of racing the device
+                with self.cond:
+                    if self.is_open:
+                        self._check_settings(width, height, fps)
+                        return True
+                start = time.perf_counter()
+                cap = open_capture(self.index, backends, width, height, fps)
+                if cap is None:
+                    camera_registry.invalidate_devices()  # Unplugged/renumbered? Re-enumerate on next lookup
+                    return False
+                self._start(cap, start, (width, height, fps))
+            return True
+        finally:
+            with self.cond:
+                self.openers -= 1
+
+    def _start(self, cap, start, settings):
+        with self.cond:
+            self.cap = cap
+            self.settings = settings
+            self.is_open = True
+            self.opened_at = time.time()
+            self.open_ms = round((time.perf_counter() - start) * 1000.0, 1)
+            self.idle_since = time.monotonic()
+            self.generation += 1
+            self.thread = threading.Thread(target=self._capture_loop, args=(cap, self.generation),
+                                           name=f"camera-{self.index}", daemon=True)
+            self.thread.start()
+
+    def subscribe(self, mode='latest', max_queue=30):
+        sub = Subscription(self, mode, max_queue)
+        with self.cond:
+            if not self.is_open:
+                return None
+            # New subscribers start from the current frame, not from history
+            sub.last_seq = self.latest[0] - 1 if self.latest is not None else 0
+            self.subscribers.append(sub)
+            self.idle_since = None
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.cond:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+            if not self.subscribers:
+                self.idle_since = time.monotonic()
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.is_open = False
+            self.cond.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+
+    def _capture_loop(self, cap, generation):
+        try:
+            while True:
+                with self.cond:
+                    if not self.is_open or self.generation != generation:
+                        break
+                    if self.idle_since is not None and time.monotonic() - self.idle_since > self.idle_timeout:
+                        logger.info(f"📷 [Hub] Camera {self.index} idle for {self.idle_timeout:.0f}s - releasing")
+                        self.is_open = False
+                        self.cond.notify_all()
+                        break
+
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    self.read_failures += 1
+                    time.sleep(0.03)
+                    continue
+
+                with self.cond:
+                    self.seq += 1
+                    self.latest = (self.seq, frame, time.perf_counter())
+                    for sub in self.subscribers:
+                        sub._push(self.latest)
+                    self.cond.notify_all()
+        except Exception as e:
+            logger.error(f"📷 [Hub] Camera {self.index} capture error: {e}")
+        finally:
+            with self.cond:
+                if self.generation == generation:
+                    self.is_open = False
+                    self.latest = None
+                    self.cap = None
+                self.cond.notify_all()
+            try:
+                cap.release()
+            except Exception:
+                pass
+            logger.info(f"📷 [Hub] Camera {self.index} released")
+
+    def get_status(self):
+        with self.cond:
+            return {
+                "index": self.index,
+                "open": self.is_open,
+                "subscribers": len(self.subscribers),
+                "frames": self.seq,
+                "read_failures": self.read_failures,
+                "open_ms": self.open_ms,
+                "settings": list(self.settings) if self.settings else None,
+                "idle_s": round(time.monotonic() - self.idle_since, 1) if self.idle_since is not None and self.is_open else None,
+            }
+
+
+class CameraHub:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, idle_timeout=30.0):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.devices = {}
+        self.idle_timeout = idle_timeout
+
+    def device(self, index):
+        """CameraDevice for `index` (created closed on first use)."""
+        return self._device(index)
+
+    def _device(self, index):
+        with self.lock:
+            device = self.devices.get(index)
+            if device is None:
+                device = CameraDevice(index, self.idle_timeout)
+                self.devices[index] = device
+            return device
+
+    def subscribe(self, index, mode='latest', max_queue=30, backends=None, width=None, height=None, fps=None):
+        """Open (or reuse) camera `index` and subscribe to it. Returns a Subscription or None."""
+        device = self._device(index)
+        for _ in range(2):  # Retry once if the device hit its idle timeout in between
+            if not device.open(backends, width, height, fps):
+                break
+            sub = device.subscribe(mode, max_queue)
+            if sub is not None:
+                return sub
+        logger.error(f"📷 [Hub] ❌ Failed to open camera {index}")
+        return None
+
+    def prewarm(self, index, backends=None, width=None, height=None, fps=None):
+        """Open a camera with no subscribers; it stays warm until the idle timeout."""
+        return self._device(index).open(backends, width, height, fps)
+
+    def release(self, index):
+        """Force-release a camera (e.g. before handing the index to another process)."""
+        with self.lock:
+            device = self.devices.get(index)
+        if device:
+            device.close()
+
+    def get_status(self):
+        with self.lock:
+            devices = list(self.devices.values())
+        return {"idle_timeout_s": self.idle_timeout, "devices": [d.get_status() for d in devices]}
+
+
+camera_hub = CameraHub()
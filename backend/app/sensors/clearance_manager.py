@@ -4,6 +4,17 @@ import threading
 import time
 import logging
 import gc
+from collections import deque
+from app.config import Config
+from app.utils.frame_trace import FrameTracer, LatencyHistogram
+from app.utils.frame_transform import FrameTransform, BufferRing
+from app.utils.compliance_vote import ComplianceVote
+from app.utils.motion_gate import MotionGate
+from app.sensors.camera_hub import camera_hub
+from app.sensors.inference_workers import load_yolo
+from app.utils.stream_hub import stream_hub
+from app.utils.load_shedder import load_shedder, LEVELS
+from app.utils.resource_governor import resource_governor
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +22,7 @@ class ClearanceManager:
     """
     ClearanceManager - Simplified design.
     - Models loaded once, reused forever
-    - Single active thread at a time
+    - Single active thread at a time (feet + body together in dual mode)
     - No complex run_id tracking
     """
     def __init__(self):
@@ -22,46 +33,104 @@ class ClearanceManager:
         # Frames
         self.feet_frame = None
         self.body_frame = None
+        self.feet_trace = None
+        self.body_trace = None
         
-        # Cameras
-        self.cap_feet = None
-        self.cap_body = None
+        # Latency tracing (capture -> visible)
+        self.tracers = {'feet': FrameTracer('feet'), 'body': FrameTracer('body')}
         
-        # Thread - only track for join
+        # Rotate 180 -> zoom 1.4x (feet only) -> square crop -> 480x480, folded into one ROI resize
+        self.transforms = {
+            'feet': FrameTransform(rotation=180, zoom=1.4, zoom_first=True, output_size=480),
+            'body': FrameTransform(rotation=180, zoom_first=True, output_size=480),
+        }
+        
+        # Active stage's annotated frames, JPEG-encoded once for all viewers
+        self.stream = stream_hub.stream('clearance')
+        
+        # Camera hub subscriptions (the hub owns the devices)
+        self.sub_feet = None
+        self.sub_body = None
+        
+        # Body camera opened in the background during the feet stage, handed over on switch.
+        # Until then its frames teach the body gate the empty scene (see MotionGate.occupied)
+        self.body_warm = None
+        self.warm_lock = threading.Lock()
+        self.prewarm_thread = None
+        self.switch_started = None
+        self.switch_hist = LatencyHistogram()
+        self.switch_stats = {"warm": 0, "cold": 0, "last_ms": None}
+        
+        # Dual mode: both cameras and models at once, stitched side by side in one preview
+        self.mode = 'sequential'
+        self.dual_unavailable = None
+        self.stitch_buffers = BufferRing()
+        self.half_buffers = {stage: BufferRing(count=1) for stage in ('feet', 'body')}
+        
+        # Total clearance time (start -> feet and body both clear), per mode
+        self.session_started = None
+        self.cleared_ms = None
+        self.clearance_hist = {mode: LatencyHistogram() for mode in ('sequential', 'dual')}
+        
+        # Thread - only track for join (body_thread: dual mode only)
         self.active_thread = None
+        self.body_thread = None
         
         # Models - loaded ONCE
         self.feet_model = None
         self.body_model = None
         self._models_loaded = False
+        self.model_lock = threading.Lock()
 
         # Status
         self.feet_status = {"message": "Initializing...", "is_compliant": False, "violations": []}
         self.body_status = {"message": "Waiting...", "is_compliant": False, "violations": []}
         
+        # k-of-n voting per stage; stable decisions become "cleared"/"violation" events
+        self.votes = {stage: ComplianceVote(Config.CLEARANCE_VOTE_K, Config.CLEARANCE_VOTE_N)
+                      for stage in ('feet', 'body')}
+        self.events = deque(maxlen=50)
+        self.event_seq = 0
+        
+        # Skip the model while a stage's scene is static and empty
+        self.gates = {stage: MotionGate(stage) for stage in ('feet', 'body')}
+        
+        # Frames seen vs. run through the model (the rest skipped: stage stably clear / gate closed)
+        self.inference_stats = {stage: {"frames": 0, "inferred": 0, "stopped": 0, "gated": 0}
+                                for stage in ('feet', 'body')}
+        
         # Debug counter
         self.start_count = 0
 
+    MODEL_FILES = {'feet': 'weight.pt', 'body': 'wearables.pt'}
+
+    def load_model(self, stage):
+        """Load one stage model ('feet' or 'body') once. Thread-safe."""
+        attr = f"{stage}_model"
+        if getattr(self, attr) is not None:
+            return getattr(self, attr)
+
+        with self.model_lock:
+            if getattr(self, attr) is not None:
+                return getattr(self, attr)
+            import os
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            path = os.path.join(base_dir, 'ai_camera', 'models', self.MODEL_FILES[stage])
+            if os.path.exists(path):
+                setattr(self, attr, load_yolo(path))
+                logger.info(f"✅ Loaded {stage.capitalize()} Model")
+            else:
+                logger.error(f"❌ Model not found at: {path}")
+            return getattr(self, attr)
+
     def _ensure_models_loaded(self):
-        """Load models once on first use."""
+        """Load models once on first use (normally already done by the startup warm-up)."""
         if self._models_loaded:
             return
             
         try:
-            from ultralytics import YOLO
-            import os
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            
-            feet_path = os.path.join(base_dir, 'ai_camera', 'models', 'weight.pt')
-            if os.path.exists(feet_path):
-                self.feet_model = YOLO(feet_path)
-                logger.info(f"✅ Loaded Feet Model")
-            
-            body_path = os.path.join(base_dir, 'ai_camera', 'models', 'wearables.pt')
-            if os.path.exists(body_path):
-                self.body_model = YOLO(body_path)
-                logger.info(f"✅ Loaded Body Model")
-            
+            self.load_model('feet')
+            self.load_model('body')
             self._models_loaded = True
         except Exception as e:
             logger.error(f"❌ Model Load Error: {e}")
@@ -70,34 +139,43 @@ class ClearanceManager:
         """Force stop everything - release cameras first to unblock threads."""
         logger.info("🧹 Force stopping...")
         self.is_active = False
+        self._drop_body_warm()
         
-        # Release cameras to unblock cap.read()
-        if self.cap_feet:
-            try:
-                self.cap_feet.release()
-            except:
-                pass
-            self.cap_feet = None
+        # Close subscriptions to unblock read() (the hub keeps the devices warm)
+        if self.sub_feet:
+            self.sub_feet.close()
+            self.sub_feet = None
             
-        if self.cap_body:
-            try:
-                self.cap_body.release()
-            except:
-                pass
-            self.cap_body = None
+        if self.sub_body:
+            self.sub_body.close()
+            self.sub_body = None
         
-        # Wait for thread
-        if self.active_thread and self.active_thread.is_alive():
-            self.active_thread.join(timeout=2.0)
-            if self.active_thread.is_alive():
-                logger.warning("⚠️ Thread did not exit in time")
+        # Wait for threads
+        for thread in (self.active_thread, self.body_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=2.0)
+                if thread.is_alive():
+                    logger.warning(f"⚠️ Thread {thread.name} did not exit in time")
         
         self.active_thread = None
+        self.body_thread = None
+        self._join_prewarm()
         gc.collect()
         time.sleep(0.2)
 
-    def start_clearance(self):
-        """Starts Stage 1: Feet Scanning."""
+    MODES = ('sequential', 'dual', 'auto')
+
+    def _dual_allowed(self):
+        """(allowed, reason): two models at once need enough inference cores and no load shedding."""
+        cores = len(resource_governor.inference_cores)
+        if cores < Config.CLEARANCE_DUAL_MIN_CORES:
+            return False, f"{cores} inference cores (needs {Config.CLEARANCE_DUAL_MIN_CORES})"
+        if load_shedder.level > 0:
+            return False, f"load shedding active ({LEVELS[load_shedder.level]})"
+        return True, None
+
+    def start_clearance(self, mode=None):
+        """Starts Stage 1: Feet Scanning, or both stages at once in dual mode ('dual' / 'auto')."""
         self.start_count += 1
         logger.info(f"")
         logger.info(f"{'='*50}")
@@ -106,7 +184,7 @@ class ClearanceManager:
         logger.info(f"   is_active: {self.is_active}")
         logger.info(f"   current_stage: {self.current_stage}")
         logger.info(f"   active_thread alive: {self.active_thread.is_alive() if self.active_thread else 'None'}")
-        logger.info(f"   cap_feet: {self.cap_feet is not None}")
+        logger.info(f"   sub_feet: {self.sub_feet is not None}")
         
         # Stop any existing
         self._force_stop()
@@ -114,29 +192,119 @@ class ClearanceManager:
         # Ensure models loaded
         self._ensure_models_loaded()
         
+        # Dual only when the CPU budget allows; otherwise fall back to feet -> body
+        mode = mode or Config.CLEARANCE_MODE
+        dual, self.dual_unavailable = self._dual_allowed() if mode in ('dual', 'auto') else (False, None)
+        if mode == 'dual' and not dual:
+            logger.warning(f"⚠️ Dual clearance unavailable ({self.dual_unavailable}), running sequentially")
+        self.mode = 'dual' if dual else 'sequential'
+        logger.info(f"   mode: {self.mode}")
+        
         # Reset state
         self.is_active = True
-        self.current_stage = 'feet'
+        self.current_stage = 'dual' if dual else 'feet'
         self.feet_status = {"message": "Initializing...", "is_compliant": False, "violations": []}
         self.body_status = {"message": "Waiting...", "is_compliant": False, "violations": []}
         self.feet_frame = None
         self.body_frame = None
+        self.feet_trace = None
+        self.body_trace = None
+        self.session_started = time.perf_counter()
+        self.cleared_ms = None
+        for vote in self.votes.values():
+            vote.reset()
+        for gate in self.gates.values():
+            gate.reset()
+        self._publish_placeholder()
         
         # Start thread
-        self.active_thread = threading.Thread(target=self._run_feet_camera, daemon=True)
+        self.active_thread = threading.Thread(target=self._run_feet_camera, name="clearance-feet", daemon=True)
         self.active_thread.start()
+        
+        if dual:
+            self.body_thread = threading.Thread(target=self._run_body_camera, name="clearance-body", daemon=True)
+            self.body_thread.start()
+        elif Config.CLEARANCE_PREWARM_BODY:
+            # Open the body camera while the user is on the feet stage
+            self.prewarm_thread = threading.Thread(target=self._prewarm_body, name="clearance-prewarm", daemon=True)
+            self.prewarm_thread.start()
+
+    EMPTY_LEARN_INTERVAL_S = 0.1
+
+    def _prewarm_body(self):
+        """Subscribe to the body camera in the background, then feed its frames to the body
+        gate's empty-scene background until the body stage takes the subscription."""
+        start = time.perf_counter()
+        sub = self._subscribe(self.CAMERA_INDICES['body'])
+        with self.warm_lock:
+            if sub is not None and self.is_active and self.current_stage == 'feet' and self.body_warm is None:
+                self.body_warm, warm = sub, sub
+                sub = None
+                logger.info(f"👕 Body camera pre-warmed in {(time.perf_counter() - start) * 1000.0:.0f} ms")
+        if sub is not None:  # Stage moved on (or stopped) while opening
+            sub.close()
+            return
+
+        # The user is on the feet stage: the body camera shows the empty scene
+        gate = self.gates['body']
+        while self.current_stage == 'feet' and self.body_warm is warm and warm.active:
+            item = warm.read(timeout=0.5)
+            if item is not None:
+                gate.learn_empty(self._prepare_frame(item[1], 'body'))
+                time.sleep(self.EMPTY_LEARN_INTERVAL_S)
+
+    def _join_prewarm(self):
+        """Stop the empty-scene learner before the body loop uses the gate and transform."""
+        thread, self.prewarm_thread = self.prewarm_thread, None
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
+            if thread.is_alive():
+                logger.warning(f"⚠️ Thread {thread.name} did not exit in time")
+
+    def _take_body_warm(self):
+        with self.warm_lock:
+            sub, self.body_warm = self.body_warm, None
+        return sub if sub is not None and sub.active else None
+
+    def _drop_body_warm(self):
+        with self.warm_lock:
+            sub, self.body_warm = self.body_warm, None
+        if sub is not None:
+            sub.close()  # The hub keeps the device warm for its idle timeout
 
     def start_body_scan(self):
-        """Switches to Stage 2: Body Scanning."""
+        """Switches to Stage 2: Body Scanning. Uses the pre-warmed body camera when available."""
+        if self.is_active and self.current_stage == 'dual':
+            logger.info("👕 Body scan already running (dual mode)")
+            return
         logger.info("🚀 Switching to Body Scan")
+        self.mode = 'sequential'
+        self.switch_started = time.perf_counter()
         
-        self._force_stop()
+        warm = self._take_body_warm() if self.is_active and self.current_stage == 'feet' else None
+        if warm is not None:
+            # Pointer swap: the feet thread sees the stage change and exits. Wait for it, or a
+            # feet frame still in flight could be published after the body placeholder
+            self.current_stage = 'body'
+            if self.sub_feet:
+                self.sub_feet.close()
+            feet_thread = self.active_thread
+            if feet_thread and feet_thread.is_alive():
+                feet_thread.join(timeout=2.0)
+                if feet_thread.is_alive():
+                    logger.warning(f"⚠️ Thread {feet_thread.name} did not exit in time")
+        else:
+            self._force_stop()
+        self._join_prewarm()
         
         self.is_active = True
         self.current_stage = 'body'
         self.body_frame = None
+        self.votes['body'].reset()
+        self.gates['body'].reset()
+        self._publish_placeholder()
         
-        self.active_thread = threading.Thread(target=self._run_body_camera, daemon=True)
+        self.active_thread = threading.Thread(target=self._run_body_camera, args=(warm,), name="clearance-body", daemon=True)
         self.active_thread.start()
 
     def stop_clearance(self):
@@ -145,13 +313,13 @@ class ClearanceManager:
         self._force_stop()
         self.current_stage = 'idle'
 
-    def _run_detection(self, model, frame, label_prefix):
+    def _detect(self, model, frame, label_prefix, **model_kwargs):
+        """Compliance status only - returns (yolo_result or None, is_compliant, message, violations)."""
         if model is None:
-            return frame, False, "AI Not Loaded", []
+            return None, False, "AI Not Loaded", []
             
         try:
-            results = model(frame, verbose=False, conf=0.4)
-            annotated_frame = results[0].plot()
+            results = model(frame, verbose=False, conf=0.4, **model_kwargs)
             names = results[0].names
             boxes = results[0].boxes
             
@@ -193,186 +361,313 @@ class ClearanceManager:
                     unique_v = list(set(violations))
                     status_msg = f"❌ DETECTED: {', '.join(unique_v).upper()}"
 
-            return annotated_frame, is_compliant, status_msg, violations
+            return results[0], is_compliant, status_msg, violations
             
         except Exception as e:
             logger.error(f"Detection Error: {e}")
-            return frame, False, "AI Error", []
-
-    def _apply_zoom(self, frame, zoom_factor):
-        if zoom_factor <= 1.0: return frame
-        h, w = frame.shape[:2]
-        new_w = int(w / zoom_factor)
-        new_h = int(h / zoom_factor)
-        x1 = (w - new_w) // 2
-        y1 = (h - new_h) // 2
-        cropped = frame[y1:y1+new_h, x1:x1+new_w]
-        return cv2.resize(cropped, (w, h))
-
-    def _apply_square_crop(self, frame):
-        h, w = frame.shape[:2]
-        size = min(h, w)
-        x1 = (w - size) // 2
-        y1 = (h - size) // 2
-        return frame[y1:y1+size, x1:x1+size]
+            return None, False, "AI Error", []
+
+    def _annotate(self, result, frame, title, color):
+        """Detection boxes + stage title for the stream."""
+        frame = result.plot() if result is not None else frame
+        cv2.putText(frame, title, (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        return frame
+
+    def _prepare_frame(self, frame, stage):
+        """Per-stage geometry: rotate 180, zoom (feet only), square crop, 480x480 - one resize."""
+        return self.transforms[stage].apply(frame)
+
+    CAMERA_BACKENDS = [cv2.CAP_DSHOW, cv2.CAP_ANY]
+    CAMERA_INDICES = {'feet': 2, 'body': 1}
+
+    def _subscribe(self, idx):
+        return camera_hub.subscribe(idx, backends=self.CAMERA_BACKENDS, width=640, height=480, fps=30)
 
     def _run_feet_camera(self):
         """Feet Camera Thread"""
-        idx = 2 
+        idx = self.CAMERA_INDICES['feet']
         logger.info(f"🦶 Feet Camera Starting (Index {idx})")
         
-        cap = None
+        sub = None
         try:
-            cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                cap = cv2.VideoCapture(idx, cv2.CAP_ANY)
-            
-            if not cap.isOpened():
+            sub = self._subscribe(idx)
+            if sub is None:
                 logger.error(f"❌ Feet Camera failed to open")
                 self.feet_status = {"message": "CAMERA ERROR", "is_compliant": False, "violations": []}
                 return
-
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.cap_feet = cap
+            self.sub_feet = sub
             
             logger.info(f"🦶 Feet Camera opened successfully")
             
             frame_count = 0
             fail_count = 0
             
-            while self.is_active and self.current_stage == 'feet':
-                ret, frame = cap.read()
-                if not ret:
+            tracer = self.tracers['feet']
+            while self.is_active and self.current_stage in ('feet', 'dual') and sub.active:
+                read_start = time.perf_counter()
+                item = sub.read(timeout=1.0)
+                if item is None:
                     fail_count += 1
-                    if fail_count % 30 == 0:  # Log every 30 failures
-                        logger.warning(f"🦶 Frame read failed {fail_count} times")
-                    time.sleep(0.03)
+                    logger.warning(f"🦶 No frame for {fail_count}s")
                     continue
+                _, frame, captured = item
                 
                 fail_count = 0  # Reset on success
                 frame_count += 1
                 
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-                frame = self._apply_zoom(frame, 1.4)
-                frame = self._apply_square_crop(frame)
-                frame = cv2.resize(frame, (480, 480))
+                trace = tracer.begin(read_start, capture=captured)
+                frame = self._prepare_frame(frame, 'feet')
+                trace.mark("preprocess")
                 
-                # Run detection
-                frame, is_compliant, msg, violations = self._run_detection(self.feet_model, frame, "FEET")
+                # Run detection (skipped once the stage is stably clear or while nothing moves)
+                result, status = None, None
+                if not self._skip_inference('feet', frame):
+                    result, is_compliant, msg, violations = self._detect(self.feet_model, frame, "FEET",
+                                                                        **load_shedder.inference_kwargs('feet'))
+                    detected = result is not None and len(result.boxes) > 0
+                    self.gates['feet'].present(detected)
+                    status = self._vote('feet', is_compliant, msg, violations, present=detected)
+                trace.mark("inference")
+                if status is not None:
+                    load_shedder.report('feet', (trace.inference - trace.preprocess) * 1000.0,
+                                        (trace.received - trace.capture) * 1000.0)
                 
-                cv2.putText(frame, "STEP 1: FEET SCAN", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+                # Headless: nobody is watching the stream, so skip all drawing (status still updates).
+                # Under overload the preview is rate-limited / left unannotated.
+                watched = self.stream.watched() and load_shedder.publish_preview('feet')
+                if watched and load_shedder.annotate():
+                    title = "FEET SCAN" if self.mode == 'dual' else "STEP 1: FEET SCAN"
+                    frame = self._annotate(result, frame, title, (255, 255, 0))
+                    trace.mark("annotate")
                 
                 # Update status and frame
-                self.feet_status = {"message": msg, "is_compliant": is_compliant, "violations": violations}
-                self.feet_frame = frame
+                with self.lock:
+                    if status is not None:
+                        self.feet_status = status
+                    self.feet_frame = self._keep_half('feet', frame)
+                    self.feet_trace = trace
+                self._check_cleared()
+                tracer.publish(trace)
+                if watched and self.current_stage in ('feet', 'dual'):
+                    self._publish(frame, trace, tracer)
                 
                 # Log first successful update
                 if frame_count == 1:
-                    logger.info(f"🦶 First status update: {msg}")
+                    logger.info(f"🦶 First status update: {self.feet_status['message']}")
                 
-                time.sleep(0.03)
+                time.sleep(load_shedder.loop_delay('feet', 0.03))
         
         except Exception as e:
             logger.error(f"🦶 Feet thread error: {e}")
             self.feet_status = {"message": f"ERROR: {e}", "is_compliant": False, "violations": []}
         finally:
-            if cap:
-                try:
-                    cap.release()
-                except:
-                    pass
-            self.cap_feet = None
+            if sub:
+                sub.close()
+            self.sub_feet = None
             logger.info(f"🦶 Feet Camera Stopped")
 
-    def _run_body_camera(self):
-        """Body Camera Thread"""
-        idx = 1
-        logger.info(f"👕 Body Camera Starting (Index {idx})")
+    def _run_body_camera(self, warm=None):
+        """Body Camera Thread (warm = subscription pre-opened during the feet stage)"""
+        idx = self.CAMERA_INDICES['body']
+        logger.info(f"👕 Body Camera Starting (Index {idx}, {'pre-warmed' if warm else 'cold'})")
         
-        cap = None
+        sub = None
         try:
-            cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                cap = cv2.VideoCapture(idx, cv2.CAP_ANY)
-                 
-            if not cap.isOpened():
+            sub = warm or self._subscribe(idx)
+            if sub is None:
                 logger.error(f"❌ Body Camera failed to open")
                 self.body_status = {"message": "CAMERA ERROR", "is_compliant": False, "violations": []}
                 return
-
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.cap_body = cap
+            self.sub_body = sub
             
             logger.info(f"👕 Body Camera opened successfully")
             
-            while self.is_active and self.current_stage == 'body':
-                ret, frame = cap.read()
-                if not ret: 
-                    time.sleep(0.03)
+            tracer = self.tracers['body']
+            while self.is_active and self.current_stage in ('body', 'dual') and sub.active:
+                read_start = time.perf_counter()
+                item = sub.read(timeout=1.0)
+                if item is None:
                     continue
+                _, frame, captured = item
                 
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-                frame = self._apply_square_crop(frame)
-                frame = cv2.resize(frame, (480, 480))
+                trace = tracer.begin(read_start, capture=captured)
+                frame = self._prepare_frame(frame, 'body')
+                trace.mark("preprocess")
                 
-                frame, is_compliant, msg, violations = self._run_detection(self.body_model, frame, "BODY")
+                result, status = None, None
+                if not self._skip_inference('body', frame):
+                    result, is_compliant, msg, violations = self._detect(self.body_model, frame, "BODY",
+                                                                        **load_shedder.inference_kwargs('body'))
+                    detected = result is not None and len(result.boxes) > 0
+                    self.gates['body'].present(detected)
+                    # No boxes = compliant, but also what an empty scene looks like: only a clear
+                    # vote while the motion gate sees someone in front of the camera
+                    status = self._vote('body', is_compliant, msg, violations,
+                                        present=detected or self.gates['body'].occupied())
+                trace.mark("inference")
+                if status is not None:
+                    load_shedder.report('body', (trace.inference - trace.preprocess) * 1000.0,
+                                        (trace.received - trace.capture) * 1000.0)
                 
-                cv2.putText(frame, "STEP 2: BODY SCAN", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                watched = self.stream.watched() and load_shedder.publish_preview('body')
+                if watched and load_shedder.annotate():
+                    title = "BODY SCAN" if self.mode == 'dual' else "STEP 2: BODY SCAN"
+                    frame = self._annotate(result, frame, title, (0, 255, 255))
+                    trace.mark("annotate")
                 
-                self.body_status = {"message": msg, "is_compliant": is_compliant, "violations": violations}
-                self.body_frame = frame
+                with self.lock:
+                    if status is not None:
+                        self.body_status = status
+                    self.body_frame = self._keep_half('body', frame)
+                    self.body_trace = trace
+                if self.switch_started is not None:
+                    self._record_switch(warm is not None)
+                self._check_cleared()
+                tracer.publish(trace)
+                if watched:
+                    self._publish(frame, trace, tracer)
                 
-                time.sleep(0.03)
+                time.sleep(load_shedder.loop_delay('body', 0.03))
                 
         except Exception as e:
             logger.error(f"👕 Body thread error: {e}")
             self.body_status = {"message": f"ERROR: {e}", "is_compliant": False, "violations": []}
         finally:
-            if cap:
-                try:
-                    cap.release()
-                except:
-                    pass
-            self.cap_body = None
+            if sub:
+                sub.close()
+            self.sub_body = None
             logger.info(f"👕 Body Camera Stopped")
 
-    def get_stitched_frame(self):
+    def _record_switch(self, warm):
+        """start_body_scan() -> first body status published."""
+        switch_ms = (time.perf_counter() - self.switch_started) * 1000.0
+        self.switch_started = None
+        self.switch_hist.add(switch_ms)
+        self.switch_stats["warm" if warm else "cold"] += 1
+        self.switch_stats["last_ms"] = round(switch_ms, 1)
+        logger.info(f"👕 Feet -> body switch: {switch_ms:.0f} ms ({'pre-warmed' if warm else 'cold'} camera)")
+
+    def _skip_inference(self, stage, frame):
+        """Count the frame; True when the model can be skipped: the stage is stably clear
+        (CLEARANCE_STOP_ON_CLEAR) or the motion gate is closed (static scene, nothing detected)."""
+        stats = self.inference_stats[stage]
+        stats["frames"] += 1
+        if Config.CLEARANCE_STOP_ON_CLEAR and self.votes[stage].state == 'cleared':
+            stats["stopped"] += 1
+            return True
+        if not self.gates[stage].check(frame):
+            stats["gated"] += 1
+            return True
+        stats["inferred"] += 1
+        return False
+
+    def _vote(self, stage, is_compliant, msg, violations, present=True):
+        """Add one frame to the stage's k-of-n vote (empty frames never vote clear); returns the new status dict."""
+        vote = self.votes[stage]
+        if vote.add(is_compliant, violations, present) and vote.state is not None:
+            self._emit_event(stage, vote.state, msg, violations)
+        return {"message": msg, "is_compliant": is_compliant, "violations": violations,
+                "stable": vote.state, "votes": vote.summary()}
+
+    def _emit_event(self, stage, event, msg, violations=()):
+        """Record a stable decision and push it to WebSocket clients."""
+        elapsed = (time.perf_counter() - self.session_started) * 1000.0 if self.session_started else None
+        with self.lock:
+            self.event_seq += 1
+            entry = {"seq": self.event_seq, "stage": stage, "event": event, "message": msg,
+                     "violations": list(violations), "time": time.time(),
+                     "elapsed_ms": round(elapsed, 1) if elapsed is not None else None}
+            self.events.append(entry)
+        logger.info(f"🗳️ {stage.capitalize()} {event}: {msg}")
+        try:
+            from app.websocket_events import broadcast_clearance_event
+            broadcast_clearance_event(entry)
+        except Exception as e:
+            logger.debug(f"Clearance event broadcast skipped: {e}")
+
+    def get_events(self, since=0):
+        """Stable decisions with seq > since (polling alternative to the 'clearance_event' push)."""
+        return [e for e in list(self.events) if e["seq"] > since]
+
+    def _check_cleared(self):
+        """Record the total clearance time the first time feet and body are both stably clear."""
+        if self.cleared_ms is not None or self.session_started is None:
+            return
+        if not (self.votes['feet'].state == 'cleared' and self.votes['body'].state == 'cleared'):
+            return
+        self.cleared_ms = round((time.perf_counter() - self.session_started) * 1000.0, 1)
+        self.clearance_hist[self.mode].add(self.cleared_ms)
+        logger.info(f"✅ Clearance complete in {self.cleared_ms / 1000.0:.1f}s ({self.mode} mode)")
+        self._emit_event('all', 'cleared', "✅ ALL CLEAR")
+
+    def _keep_half(self, stage, frame):
+        """Latest stage frame for the dual preview (lock held). `frame` lives in the stage's
+        transform ring, which its thread rewrites without the lock, so dual mode keeps a copy."""
+        if self.mode != 'dual':
+            return frame
+        return self.half_buffers[stage].copy(frame)
+
+    def _publish(self, frame, trace, tracer):
+        """Stream the stage frame; in dual mode the latest feet | body frames side by side (960x480).
+        Both halves are the copies made by _keep_half, only written and read under the lock."""
+        if self.mode != 'dual':
+            self.stream.publish(frame, trace, tracer)
+            return
+        with self.lock:
+            stitched = self.stitch_buffers.get((480, 960, 3))
+            for i, half_frame in enumerate((self.feet_frame, self.body_frame)):
+                half = stitched[:, i * 480:(i + 1) * 480]
+                if half_frame is None:
+                    half[:] = 0
+                    cv2.putText(half, "LOADING...", (100, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                else:
+                    np.copyto(half, half_frame)
+        self.stream.publish(stitched, trace, tracer)
+
+    def _publish_placeholder(self):
         placeholder = np.zeros((480, 480, 3), dtype=np.uint8)
         cv2.putText(placeholder, "LOADING...", (100, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        
-        inactive_frames = 0
-        
-        while True:
-            frame = placeholder
-            
-            if self.is_active:
-                inactive_frames = 0
-                if self.current_stage == 'feet' and self.feet_frame is not None:
-                    frame = self.feet_frame
-                elif self.current_stage == 'body' and self.body_frame is not None:
-                    frame = self.body_frame
-            else:
-                # If inactive for > 1 second (20 frames * 0.05s), close the stream to free socket
-                inactive_frames += 1
-                if inactive_frames > 20: 
-                    break
-            
-            ret, jpeg = cv2.imencode('.jpg', frame)
-            if ret:
-                yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n')
-            time.sleep(0.05)
+        self.stream.publish(placeholder)
+
+    def get_stitched_frame(self, width=None, quality=None, adaptive=False):
+        """MJPEG viewer of the active stage; ends ~1s after clearance stops. None when viewers are full."""
+        return self.stream.open_viewer(keep_alive=lambda: self.is_active, width=width, quality=quality, adaptive=adaptive)
 
     def get_status(self):
-        return {
-            "stage": self.current_stage,
-            "feet": self.feet_status,
-            "body": self.body_status
-        }
+        with self.lock:
+            self.tracers['feet'].visible(self.feet_trace, "status")
+            self.tracers['body'].visible(self.body_trace, "status")
+            cleared = self.votes['feet'].state == 'cleared' and self.votes['body'].state == 'cleared'
+            return {
+                "stage": self.current_stage,
+                "mode": self.mode,
+                "feet": self.feet_status,
+                "body": self.body_status,
+                "combined": {
+                    "is_compliant": cleared,
+                    "message": "✅ ALL CLEAR" if cleared else
+                               f"FEET: {self.feet_status['message']} | BODY: {self.body_status['message']}",
+                    "violations": self.feet_status["violations"] + self.body_status["violations"],
+                    "cleared_ms": self.cleared_ms,
+                },
+                "dual_unavailable": self.dual_unavailable,
+                "last_event": self.events[-1] if self.events else None,
+            }
+
+    def get_latency(self):
+        """Per-stage frame latency histograms for each camera, feet -> body switch time and
+        total clearance time per mode (with the median reduction of dual over sequential) and
+        the share of frames that went through each model."""
+        latency = {stage: tracer.snapshot() for stage, tracer in self.tracers.items()}
+        latency["switch"] = dict(self.switch_stats, switch_ms=self.switch_hist.snapshot())
+        totals = {mode: hist.snapshot() for mode, hist in self.clearance_hist.items()}
+        sequential, dual = totals['sequential']['p50_ms'], totals['dual']['p50_ms']
+        latency["clearance"] = dict(totals, mode=self.mode, last_ms=self.cleared_ms,
+                                    dual_reduction_pct=round((1.0 - dual / sequential) * 100.0, 1)
+                                    if sequential and dual else None)
+        latency["inference"] = {stage: dict(stats, duty_cycle=round(stats["inferred"] / stats["frames"], 3)
+                                            if stats["frames"] else None, gate=self.gates[stage].get_status())
+                                for stage, stats in self.inference_stats.items()}
+        return latency
 
 clearance_manager = ClearanceManager()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Cross-Camera Inference Batcher
+When several camera loops call the same model at once, each call is a separate
+single-image forward pass. The batcher collects those frames for a short window and
+runs one batched forward pass per model, then hands each caller its own result.
+
+- Only pays off for a model that is actually shared: in the default setup BP, feet and
+  body each use their own model, so every call takes the direct path (no queue, no window)
+- A call goes through the scheduler only while another thread has used the same model
+  in the last second; callers idle for longer or already exited (the warm-up thread)
+  are forgotten
+- Calls with different keyword arguments (conf, agnostic_nms, ...) are batched separately
+- A batch closes as soon as every active caller has sent a frame, or when it is full
+- Direct calls, batch-size histogram, queue wait and forward-pass time via get_status()
+
+Enabled with INFERENCE_BATCH_WINDOW_MS > 0 (see app/config.py). Only applies to in-process
+models; with INFERENCE_WORKERS > 0 each request already runs in its own worker.
+"""
+
+import os
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+from app.config import Config
+from app.utils.frame_trace import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_CALLER_S = 1.0
+
+
+class _Request:
+    __slots__ = ("key", "frame", "kwargs", "future", "arrived")
+
+    def __init__(self, key, frame, kwargs):
+        self.key = key
+        self.frame = frame
+        self.kwargs = kwargs
+        self.future = Future()
+        self.arrived = time.perf_counter()
+
+
+class BatchedModel:
+    """Callable like a YOLO model; frames from concurrent callers share forward passes."""
+
+    def __init__(self, model, name, window_ms=15.0, max_batch=4, timeout=10.0):
+        self.model = model
+        self.name = name
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self.cond = threading.Condition()
+        self.pending = []
+        self.callers = {}  # thread -> last call (perf_counter)
+        self.direct_calls = 0
+        self.batch_sizes = [0] * (max_batch + 1)
+        self.wait_hist = LatencyHistogram()
+        self.forward_hist = LatencyHistogram()
+        self.errors = 0
+        self.thread = None  # Scheduler, started on the first shared call
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def __call__(self, frame, **kwargs):
+        request = _Request(tuple(sorted(kwargs.items())), frame, kwargs)
+        with self.cond:
+            self.callers[threading.current_thread()] = request.arrived
+            self._prune(request.arrived)
+            shared = len(self.callers) > 1 or bool(self.pending)
+            if shared:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._loop, name=f"batcher-{self.name}", daemon=True)
+                    self.thread.start()
+                self.pending.append(request)
+                self.cond.notify_all()
+            else:
+                self.direct_calls += 1
+        if not shared:
+            return self.model(frame, **kwargs)
+        try:
+            return request.future.result(timeout=self.timeout)
+        except Exception as e:
+            logger.error(f"📦 [Batcher:{self.name}] Inference failed: {e}")
+            return []
+
+    def _prune(self, now):
+        """Forget callers that exited or have not used the model in the last ACTIVE_CALLER_S (lock held)."""
+        for thread in [th for th, t in self.callers.items() if now - t >= ACTIVE_CALLER_S or not th.is_alive()]:
+            del self.callers[thread]
+
+    def _expected(self, now):
+        """How many callers are likely to send a frame soon (active in the last second)."""
+        self._prune(now)
+        return max(1, min(len(self.callers), self.max_batch))
+
+    def _take_batch(self):
+        with self.cond:
+            while not self.pending:
+                self.cond.wait()
+            first = self.pending[0]
+            # Window counts from when the scheduler is free: a frame that queued behind the
+            # previous forward pass still gives the other callers a chance to join it
+            deadline = max(first.arrived, time.perf_counter()) + self.window
+            while True:
+                now = time.perf_counter()
+                same = [r for r in self.pending if r.key == first.key]
+                if len(same) >= self._expected(now) or now >= deadline:
+                    break
+                self.cond.wait(deadline - now)
+            batch = same[:self.max_batch]
+            for request in batch:
+                self.pending.remove(request)
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            start = time.perf_counter()
+            try:
+                results = self.model([r.frame for r in batch], **batch[0].kwargs)
+                forward_ms = (time.perf_counter() - start) * 1000.0
+                for request, result in zip(batch, results):
+                    request.future.set_result([result])
+            except Exception as e:
+                forward_ms = (time.perf_counter() - start) * 1000.0
+                self.errors += 1
+                for request in batch:
+                    request.future.set_exception(e)
+
+            with self.cond:
+                self.batch_sizes[len(batch)] += 1
+                self.forward_hist.add(forward_ms)
+                for request in batch:
+                    self.wait_hist.add((start - request.arrived) * 1000.0)
+
+    def get_status(self):
+        with self.cond:
+            batches = sum(self.batch_sizes)
+            frames = sum(size * n for size, n in enumerate(self.batch_sizes))
+            return {
+                "window_ms": round(self.window * 1000.0, 1),
+                "max_batch": self.max_batch,
+                "active_callers": len(self.callers),
+                "direct_calls": self.direct_calls,
+                "batches": batches,
+                "frames": frames,
+                "mean_batch": round(frames / batches, 2) if batches else None,
+                "batch_sizes": {str(size): n for size, n in enumerate(self.batch_sizes) if size},
+                "errors": self.errors,
+                "queue_wait_ms": self.wait_hist.snapshot(),
+                "forward_ms": self.forward_hist.snapshot(),
+            }
+
+
+class InferenceBatcher:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.models = {}
+
+    def model(self, path, loader):
+        """Shared BatchedModel for `path` (loaded once with loader(path))."""
+        with self.lock:
+            batched = self.models.get(path)
+            if batched is None:
+                batched = BatchedModel(loader(path), os.path.basename(path),
+                                       window_ms=Config.INFERENCE_BATCH_WINDOW_MS,
+                                       max_batch=Config.INFERENCE_MAX_BATCH)
+                self.models[path] = batched
+                logger.info(f"📦 [Batcher] {batched.name}: window {Config.INFERENCE_BATCH_WINDOW_MS} ms, "
+                            f"max batch {Config.INFERENCE_MAX_BATCH}")
+            return batched
+
+    def get_status(self):
+        with self.lock:
+            models = dict(self.models)
+        return {
+            "enabled": Config.INFERENCE_BATCH_WINDOW_MS > 0 and Config.INFERENCE_WORKERS == 0,
+            "models": {m.name: m.get_status() for m in models.values()},
+        }
+
+
+inference_batcher = InferenceBatcher()
@@ -0,0 +1,347 @@
+"""
+Inference Worker Pool
+Runs YOLO in separate processes so BP, clearance, the serial listeners and Flask stop
+fighting over one GIL and one torch thread pool.
+
+- Frames travel through multiprocessing.shared_memory ring slots (one memcpy, no pickling).
+  A frame larger than a slot (e.g. an uncropped 1280x720 BP camera) is downscaled to fit,
+  aspect kept, and its boxes scaled back; YOLO resizes to imgsz (640) anyway
+- Requests/results are small tuples on multiprocessing queues; results carry only the
+  N x 6 box array (x1, y1, x2, y2, conf, cls) plus class names
+- The parent rebuilds an ultralytics Results object, so callers keep using
+  results[0].boxes / .names / .plot() exactly as with an in-process model
+- Each worker loads a model on first use (by path) and caches it
+- Dead workers are respawned; their in-flight requests fail fast instead of hanging
+
+Enabled with INFERENCE_WORKERS > 0 (see app/config.py); load_yolo() returns either an
+in-process YOLO or a RemoteModel with the same call signature.
+"""
+
+import os
+import sys
+import atexit
+import queue
+import threading
+import time
+import logging
+import itertools
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.utils.resource_governor import resource_governor
+
+logger = logging.getLogger(__name__)
+
+# Largest frame a slot holds as is (the clearance loops send 480x480 BGR); bigger frames
+# are downscaled to fit, see InferencePool._fit_slot
+DEFAULT_SLOT_SHAPE = (640, 640, 3)
+
+
+# ==================== WORKER PROCESS ====================
+
+def _load_model(path):
+    from ultralytics import YOLO
+    return YOLO(path)
+
+
+def _worker_main(worker_id, shm_name, slot_bytes, requests, results, torch_threads):
+    """Entry point of each worker process."""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    resource_governor.worker_setup()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    models = {}
+    try:
+        while True:
+            item = requests.get()
+            if item is None:
+                break
+            req_id, path, slot, shape, kwargs = item
+            frame = None
+            try:
+                model = models.get(path)
+                if model is None:
+                    model = models[path] = _load_model(path)
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                start = time.perf_counter()
+                out = model(frame, **kwargs)
+                infer_ms = (time.perf_counter() - start) * 1000.0
+                data = out[0].boxes.data.cpu().numpy().astype(np.float32) if out else np.zeros((0, 6), np.float32)
+                names = out[0].names if out else {}
+                results.put((req_id, True, (data, names), infer_ms, worker_id))
+            except Exception as e:
+                results.put((req_id, False, str(e), 0.0, worker_id))
+            finally:
+                del frame
+    finally:
+        shm.close()
+
+
+# ==================== PARENT SIDE ====================
+
+def _build_results(frame, payload):
+    """Rebuild a one-element ultralytics Results list from (boxes_data, names)."""
+    import torch
+    from ultralytics.engine.results import Results
+    data, names = payload
+    return [Results(orig_img=frame, path="", names=names, boxes=torch.from_numpy(data))]
+
+
+class RemoteModel:
+    """Callable like a YOLO model; runs in the worker pool. Returns [] on failure/timeout."""
+
+    def __init__(self, pool, path, timeout=5.0):
+        self.pool = pool
+        self.path = path
+        self.timeout = timeout
+
+    def __call__(self, frame, **kwargs):
+        return self.pool.predict(self.path, frame, timeout=self.timeout, **kwargs)
+
+
+class InferencePool:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.lock = threading.Lock()
+        self.started = False
+        self.workers = []
+        self.shm = None
+        self.slot_bytes = 0
+        self.free_slots = queue.Queue()
+        self.pending = {}  # req_id -> (future, slot, submitted_at)
+        self.ids = itertools.count(1)
+        self.ctx = None
+        self.requests = None
+        self.results = None
+        self.torch_threads = 1
+        self.stats = {"submitted": 0, "completed": 0, "errors": 0, "timeouts": 0, "no_slot": 0,
+                      "resized": 0, "respawns": 0, "infer_ms_total": 0.0, "roundtrip_ms_total": 0.0}
+
+    def start(self, workers=None, torch_threads=None, slots=None, slot_shape=DEFAULT_SLOT_SHAPE, start_method='spawn'):
+        """Start the worker processes (no-op if already running)."""
+        with self.lock:
+            if self.started:
+                return True
+            workers = workers or Config.INFERENCE_WORKERS
+            self.torch_threads = torch_threads or Config.INFERENCE_WORKER_THREADS
+            slots = slots or workers * 2 + 2
+
+            self.ctx = mp.get_context(start_method)
+            self.slot_bytes = int(np.prod(slot_shape))
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+            for slot in range(slots):
+                self.free_slots.put(slot)
+            self.requests = self.ctx.Queue()
+            self.results = self.ctx.Queue()
+
+            self.workers = [self._spawn(i) for i in range(workers)]
+            threading.Thread(target=self._dispatch_loop, name="inference-results", daemon=True).start()
+            atexit.register(self.stop)
+            self.started = True
+        logger.info(f"🧠 [Inference] {workers} worker process(es) started "
+                    f"({self.torch_threads} torch thread(s) each, {slots} shared-memory slots)")
+        return True
+
+    def _spawn(self, worker_id):
+        proc = self.ctx.Process(
+            target=_worker_main, name=f"inference-{worker_id}", daemon=True,
+            args=(worker_id, self.shm.name, self.slot_bytes, self.requests, self.results, self.torch_threads))
+        # Spawned children re-run the parent's __main__ (run.py builds the Flask app and
+        # opens the Arduino port at import). Hide it so workers only import this module.
+        main = sys.modules.get('__main__')
+        main_file = getattr(main, '__file__', None)
+        if main_file is not None and self.ctx.get_start_method() == 'spawn':
+            del main.__file__
+        try:
+            proc.start()
+        finally:
+            if main_file is not None and not hasattr(main, '__file__'):
+                main.__file__ = main_file
+        return proc
+
+    def _fit_slot(self, frame):
+        """Downscale a frame too large for a slot (aspect kept). Returns (frame, (sx, sy) or None)."""
+        if frame.nbytes <= self.slot_bytes:
+            return frame, None
+        h, w = frame.shape[:2]
+        factor = (self.slot_bytes / float(frame.nbytes)) ** 0.5
+        new_w, new_h = max(1, int(w * factor)), max(1, int(h * factor))
+        with self.lock:
+            self.stats["resized"] += 1
+            first = self.stats["resized"] == 1
+        if first:
+            logger.warning(f"🧠 [Inference] Frame {frame.shape} larger than slot: sent as {new_w}x{new_h}")
+        return cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA), (w / new_w, h / new_h)
+
+    @staticmethod
+    def _scale_boxes(payload, scale):
+        """Boxes of a downscaled frame -> original frame coordinates."""
+        if scale is None:
+            return payload
+        data, names = payload
+        data = data.copy()
+        data[:, [0, 2]] *= scale[0]
+        data[:, [1, 3]] *= scale[1]
+        return data, names
+
+    def predict(self, path, frame, timeout=5.0, **kwargs):
+        """Run model `path` on `frame` in a worker. Returns [Results] or [] on failure."""
+        sent, scale = self._fit_slot(np.ascontiguousarray(frame, dtype=np.uint8))
+        future, slot = self.submit(path, sent, **kwargs)
+        if future is None:
+            return []
+        try:
+            payload = future.result(timeout=timeout)
+        except FutureTimeout:
+            with self.lock:
+                self.stats["timeouts"] += 1
+            logger.warning(f"🧠 [Inference] Timed out after {timeout:.1f}s ({os.path.basename(path)})")
+            return []
+        except Exception as e:
+            logger.error(f"🧠 [Inference] {os.path.basename(path)} failed: {e}")
+            return []
+        return _build_results(frame, self._scale_boxes(payload, scale))
+
+    def submit(self, path, frame, **kwargs):
+        """Copy `frame` into a free slot and queue it. Returns (Future, slot) or (None, None)."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            logger.error(f"🧠 [Inference] Frame {frame.shape} larger than slot")
+            return None, None
+        try:
+            slot = self.free_slots.get(timeout=1.0)
+        except queue.Empty:
+            with self.lock:
+                self.stats["no_slot"] += 1
+            return None, None
+
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+        del view
+
+        future = Future()
+        req_id = next(self.ids)
+        with self.lock:
+            self.pending[req_id] = (future, slot, time.perf_counter())
+            self.stats["submitted"] += 1
+        self.requests.put((req_id, path, slot, frame.shape, kwargs))
+        return future, slot
+
+    def _dispatch_loop(self):
+        last_check = time.monotonic()
+        while True:
+            if time.monotonic() - last_check > 1.0:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                req_id, ok, payload, infer_ms, worker_id = self.results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            with self.lock:
+                entry = self.pending.pop(req_id, None)
+                if entry is None:  # Already failed by a worker-death sweep
+                    continue
+                future, slot, submitted = entry
+                self.stats["completed" if ok else "errors"] += 1
+                self.stats["infer_ms_total"] += infer_ms
+                self.stats["roundtrip_ms_total"] += (time.perf_counter() - submitted) * 1000.0
+            self.free_slots.put(slot)
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        dead = [i for i, proc in enumerate(self.workers) if not proc.is_alive()]
+        if not dead:
+            return
+        # We can't tell which requests the dead worker held: fail everything in flight
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.stats["respawns"] += len(dead)
+        for future, slot, _ in pending.values():
+            self.free_slots.put(slot)
+            future.set_exception(RuntimeError("inference worker died"))
+        for i in dead:
+            logger.error(f"🧠 [Inference] Worker {i} died (exit {self.workers[i].exitcode}) - respawning")
+            self.workers[i] = self._spawn(i)
+
+    def get_status(self):
+        with self.lock:
+            stats = dict(self.stats)
+            in_flight = len(self.pending)
+        done = stats["completed"] or 1
+        return {
+            "enabled": self.started,
+            "workers": [{"pid": p.pid, "alive": p.is_alive()} for p in self.workers],
+            "torch_threads": self.torch_threads,
+            "in_flight": in_flight,
+            "free_slots": self.free_slots.qsize(),
+            "submitted": stats["submitted"],
+            "completed": stats["completed"],
+            "errors": stats["errors"],
+            "timeouts": stats["timeouts"],
+            "no_slot": stats["no_slot"],
+            "resized": stats["resized"],
+            "respawns": stats["respawns"],
+            "mean_infer_ms": round(stats["infer_ms_total"] / done, 2),
+            "mean_roundtrip_ms": round(stats["roundtrip_ms_total"] / done, 2),
+        }
+
+    def stop(self):
+        with self.lock:
+            if not self.started:
+                return
+            self.started = False
+        for _ in self.workers:
+            self.requests.put(None)
+        for proc in self.workers:
+            proc.join(timeout=2.0)
+        self.shm.close()
+        self.shm.unlink()
+
+
+inference_pool = InferencePool()
+
+
+def _load_governed(path):
+    return resource_governor.govern(_load_model(path), path)
+
+
+def load_yolo(path):
+    """
+    In-process YOLO, a RemoteModel backed by the worker pool (INFERENCE_WORKERS > 0), or a
+    shared cross-camera BatchedModel (INFERENCE_BATCH_WINDOW_MS > 0; only batches while two
+    loops actually use the same model file). In-process models run under the CPU governor's
+    thread budget.
+    """
+    if Config.INFERENCE_WORKERS > 0:
+        inference_pool.start()
+        return RemoteModel(inference_pool, path)
+    if Config.INFERENCE_BATCH_WINDOW_MS > 0:
+        from app.sensors.inference_batcher import inference_batcher
+        return inference_batcher.model(path, _load_governed)
+    return _load_governed(path)
@@ -144,7 +144,7 @@ class SerialInterface:
 
     def _start_data_listener(self):
         self._stop_listener = False
-        self._listener_thread = threading.Thread(target=self._listen_serial)
+        self._listener_thread = threading.Thread(target=self._listen_serial, name="serial-listener")
         self._listener_thread.daemon = True
         self._listener_thread.start()
 
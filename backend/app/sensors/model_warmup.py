@@ -0,0 +1,113 @@
+"""
+Model Warm-up Service
+Loads bp.pt, weight.pt and wearables.pt in a background thread after startup and runs
+a dummy inference on each, so the first BP/clearance session doesn't pay for YOLO
+loading, layer fusing and lazy kernel setup.
+
+Readiness (per model load/warm-up time) is reported by get_status() and exposed at
+GET /api/models/ready.
+"""
+
+import threading
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same input size the live loops feed the models
+WARMUP_SHAPE = (480, 480, 3)
+
+
+class ModelWarmupService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.lock = threading.Lock()
+        self.thread = None
+        self.started_at = None
+        self.finished_at = None
+        self.models = {
+            name: {"state": "pending", "load_ms": None, "first_inference_ms": None,
+                   "warm_inference_ms": None, "error": None}
+            for name in ("bp", "feet", "body")
+        }
+
+    def start(self):
+        """Start warming up in the background (no-op if already started)."""
+        with self.lock:
+            if self.thread is not None:
+                return False
+            self.started_at = time.time()
+            self.thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self.thread.start()
+        logger.info("🔥 Model warm-up started in background")
+        return True
+
+    def _loaders(self):
+        from app.sensors.bp_sensor_controller import bp_sensor
+        from app.sensors.clearance_manager import clearance_manager
+        return {
+            "bp": bp_sensor.load_model,
+            "feet": lambda: clearance_manager.load_model('feet'),
+            "body": lambda: clearance_manager.load_model('body'),
+        }
+
+    def _set(self, name, **fields):
+        with self.lock:
+            self.models[name].update(fields)
+
+    def _run(self):
+        dummy = np.zeros(WARMUP_SHAPE, dtype=np.uint8)
+        for name, loader in self._loaders().items():
+            try:
+                self._set(name, state="loading")
+                start = time.perf_counter()
+                model = loader()
+                load_ms = (time.perf_counter() - start) * 1000.0
+                if model is None:
+                    self._set(name, state="missing", load_ms=round(load_ms, 1))
+                    continue
+
+                # First call triggers fuse/autobackend setup; second shows steady-state cost
+                self._set(name, state="warming", load_ms=round(load_ms, 1))
+                start = time.perf_counter()
+                model(dummy, verbose=False)
+                first_ms = (time.perf_counter() - start) * 1000.0
+                start = time.perf_counter()
+                model(dummy, verbose=False)
+                warm_ms = (time.perf_counter() - start) * 1000.0
+
+                self._set(name, state="ready", first_inference_ms=round(first_ms, 1),
+                          warm_inference_ms=round(warm_ms, 1))
+                logger.info(f"🔥 {name} model ready (load {load_ms:.0f} ms, first {first_ms:.0f} ms, warm {warm_ms:.0f} ms)")
+            except Exception as e:
+                logger.error(f"🔥 {name} model warm-up failed: {e}")
+                self._set(name, state="error", error=str(e))
+
+        self.finished_at = time.time()
+        logger.info(f"🔥 Model warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def get_status(self):
+        with self.lock:
+            models = {name: info.copy() for name, info in self.models.items()}
+        return {
+            "ready": all(m["state"] == "ready" for m in models.values()),
+            "started": self.started_at is not None,
+            "finished": self.finished_at is not None,
+            "total_s": round(self.finished_at - self.started_at, 2) if self.finished_at else None,
+            "models": models,
+        }
+
+
+model_warmup = ModelWarmupService()
@@ -0,0 +1,125 @@
+"""
+Hard-Frame Harvester (Active Learning)
+Samples BP frames the current model struggles with, so the next bp.pt trains on the
+cases that actually slow result confirmation.
+
+A frame is harvested when:
+- borderline:   any kept digit has confidence in [low, high) (default 0.25-0.5), or
+- disagreement: the temporal consensus is confident but this single frame reads
+                something else (a flickering digit)
+
+Writes go through CapturePipeline (background thread, dHash de-duplication, YOLO
+labels pre-filled from the model, .json metadata sidecar). The labels hold every digit
+box kept after NMS, low-confidence ones included, with their confidences in the sidecar
+so review starts from the uncertain boxes. A token bucket limits the rate and a file
+budget bounds the on-disk queue.
+
+Layout: <root>/<reason>/<reason>_<ms>_<seq>.jpg + .txt + .json
+"""
+
+import os
+import threading
+import time
+import logging
+
+from app.utils.capture_pipeline import CapturePipeline
+
+logger = logging.getLogger(__name__)
+
+
+class HardFrameHarvester:
+    def __init__(self, root, borderline=(0.25, 0.5), disagreement_confidence=0.8,
+                 rate_per_minute=12, burst=3, max_files=2000):
+        self.root = root
+        self.borderline = borderline
+        self.disagreement_confidence = disagreement_confidence
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_files = max_files
+
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.pipeline = None
+        self.stored = None  # Files already in the on-disk queue (counted lazily)
+        self.stats = {"borderline": 0, "disagreement": 0, "rate_limited": 0, "budget_full": 0}
+
+    def _count_existing(self):
+        if not os.path.isdir(self.root):
+            return 0
+        return sum(1 for _, _, files in os.walk(self.root) for f in files if f.endswith(".jpg"))
+
+    def _take_token(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_second)
+        self.last_refill = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def classify(self, assembly, consensus=None):
+        """Return the harvest reason for this frame, or None."""
+        confs = list(assembly["sys_conf"]) + list(assembly["dia_conf"])
+        low, high = self.borderline
+        if confs and low <= min(confs) < high:
+            return "borderline"
+
+        if consensus and consensus["confidence"] >= self.disagreement_confidence:
+            if (assembly["sys"], assembly["dia"]) != (consensus["sys"], consensus["dia"]):
+                return "disagreement"
+        return None
+
+    def consider(self, frame, assembly, consensus=None, detections=None):
+        """
+        Harvest the frame if it is hard and the rate/budget allows. Never blocks.
+        detections: (cls_id, x1, y1, x2, y2, conf) of every box to pre-label.
+        """
+        reason = self.classify(assembly, consensus)
+        if reason is None:
+            return None
+
+        with self.lock:
+            if self.stored is None:
+                self.stored = self._count_existing()
+            if self.stored >= self.max_files:
+                self.stats["budget_full"] += 1
+                return None
+            if not self._take_token():
+                self.stats["rate_limited"] += 1
+                return None
+            if self.pipeline is None:
+                self.pipeline = CapturePipeline(self.root, max_queue=16)
+
+        metadata = {
+            "reason": reason,
+            "time": time.time(),
+            "frame_reading": {"sys": assembly["sys"], "dia": assembly["dia"]},
+            "digit_confidences": {
+                "sys": [round(float(c), 4) for c in assembly["sys_conf"]],
+                "dia": [round(float(c), 4) for c in assembly["dia_conf"]],
+            },
+            "consensus": consensus,
+            "label_confidences": [round(d[5], 4) for d in detections] if detections is not None else None,
+            "model": "bp.pt",
+        }
+        labels = [d[:5] for d in detections] if detections is not None else None
+        status, filepath = self.pipeline.submit(frame, reason, labels, metadata)
+        if status != "queued":
+            return None
+
+        with self.lock:
+            self.stored += 1
+            self.stats[reason] += 1
+        logger.info(f"🎯 [Active Learning] Harvested {reason} frame: {assembly['sys']}/{assembly['dia']}")
+        return filepath
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["stored"] = self.stored
+        stats["max_files"] = self.max_files
+        stats["root"] = self.root
+        if self.pipeline is not None:
+            stats["writer"] = self.pipeline.get_stats()
+        return stats
@@ -0,0 +1,129 @@
+"""
+BP Temporal Consensus
+Confidence-weighted, per-digit-position voting across frames for the BP result screen.
+
+The old rule confirmed a result only after the exact sys/dia strings stayed unchanged
+for 2.0 s, so one flickering digit restarted the clock. Here every frame adds evidence
+for the digit it saw at each position, weighted by the detection confidence:
+
+    evidence(d) += weight * log(9 * c / (1 - c))
+
+which is the log-likelihood ratio of "the true digit is d" under a simple noisy-reader
+model (correct with probability c, otherwise any of the other 9 digits). Per-position
+posteriors are a softmax over the 10 digits. Evidence decays over time so stale frames
+fade out, and a result is confirmed once the joint posterior is high enough.
+
+Positions only line up when the layout (number of sys/dia digits) is the same, so
+evidence is kept per layout and the layout itself is voted on too.
+"""
+
+import math
+import time
+
+
+class TemporalDigitVoter:
+    def __init__(self, confirm_posterior=0.95, min_frames=4, min_duration=0.8,
+                 decay_tau=2.0, evidence_weight=0.5):
+        """
+        confirm_posterior: joint posterior of the winning reading required to confirm
+        min_frames / min_duration: minimum evidence before any confirmation
+        decay_tau: seconds for evidence to decay to 1/e (old frames fade out)
+        evidence_weight: < 1 because consecutive frames are strongly correlated
+        """
+        self.confirm_posterior = confirm_posterior
+        self.min_frames = min_frames
+        self.min_duration = min_duration
+        self.decay_tau = decay_tau
+        self.evidence_weight = evidence_weight
+        self.reset()
+
+    def reset(self):
+        self.layouts = {}       # (len_sys, len_dia) -> {"score": float, "positions": [{digit: evidence}]}
+        self.frames = 0
+        self.first_seen = None
+        self.last_update = None
+
+    def _evidence(self, conf):
+        # YOLO confidences are not calibrated; clamp so one frame can't be decisive
+        c = min(max(float(conf), 0.15), 0.95)
+        return self.evidence_weight * math.log(9.0 * c / (1.0 - c))
+
+    def _decay(self, now):
+        if self.last_update is None:
+            return
+        factor = math.exp(-max(now - self.last_update, 0.0) / self.decay_tau)
+        if factor >= 1.0:
+            return
+        for layout in self.layouts.values():
+            layout["score"] *= factor
+            for votes in layout["positions"]:
+                for digit in votes:
+                    votes[digit] *= factor
+
+    def update(self, sys_str, dia_str, sys_conf, dia_conf, now=None):
+        """Add one frame of evidence. Confidences are per position, left to right."""
+        now = time.time() if now is None else now
+        self._decay(now)
+        self.last_update = now
+        if self.first_seen is None:
+            self.first_seen = now
+        self.frames += 1
+
+        key = (len(sys_str), len(dia_str))
+        layout = self.layouts.get(key)
+        if layout is None:
+            layout = {"score": 0.0, "positions": [{} for _ in range(key[0] + key[1])]}
+            self.layouts[key] = layout
+
+        digits = sys_str + dia_str
+        confs = list(sys_conf) + list(dia_conf)
+        if confs:
+            layout["score"] += self._evidence(sum(confs) / len(confs))
+        for pos, (digit, conf) in enumerate(zip(digits, confs)):
+            votes = layout["positions"][pos]
+            votes[digit] = votes.get(digit, 0.0) + self._evidence(conf)
+
+    @staticmethod
+    def _softmax_top(scores, n_classes):
+        """Posterior of the best class; classes never observed have score 0."""
+        best = max(scores.values())
+        unseen = n_classes - len(scores)
+        denom = sum(math.exp(s - best) for s in scores.values()) + unseen * math.exp(-best)
+        return 1.0 / denom
+
+    def result(self):
+        """
+        Current consensus reading.
+        Returns dict: sys, dia, confidence (joint posterior 0-1), frames, confirmed.
+        """
+        empty = {"sys": "", "dia": "", "confidence": 0.0, "frames": self.frames, "confirmed": False}
+        if not self.layouts:
+            return empty
+
+        key, layout = max(self.layouts.items(), key=lambda kv: kv[1]["score"])
+        layout_scores = {k: l["score"] for k, l in self.layouts.items()}
+        # Only layouts seen so far compete (plus one "other" slot)
+        confidence = self._softmax_top(layout_scores, len(layout_scores) + 1)
+
+        digits = []
+        for votes in layout["positions"]:
+            if not votes:
+                return empty
+            best = max(votes, key=votes.get)
+            confidence *= self._softmax_top(votes, 10)
+            digits.append(best)
+
+        reading = "".join(digits)
+        elapsed = self.last_update - self.first_seen
+        confirmed = (
+            confidence >= self.confirm_posterior
+            and self.frames >= self.min_frames
+            and elapsed >= self.min_duration
+        )
+        return {
+            "sys": reading[:key[0]],
+            "dia": reading[key[0]:],
+            "confidence": round(confidence, 4),
+            "frames": self.frames,
+            "confirmed": confirmed,
+        }
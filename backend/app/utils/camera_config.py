@@ -1,7 +1,10 @@
 
 import json
 import os
+import sys
+import time
 import logging
+import threading
 import subprocess
 
 logger = logging.getLogger(__name__)
@@ -37,31 +40,209 @@ TARGET_MAPPING = {
     "Wearables": "wearables"
 }
 
-class CameraConfig:
-    @staticmethod
-    def load():
-        # 1. Try to load from file
+# sysfs directory listing V4L2 devices (Linux); /dev/videoN is OpenCV index N
+V4L2_SYSFS = "/sys/class/video4linux"
+# Windows has no cheap hotplug signal: re-enumerate in the background when older than this
+DEVICE_LIST_TTL_S = 30.0
+
+POWERSHELL_LIST_CMD = "Get-PnpDevice -Class Camera -Status OK | Select-Object -ExpandProperty FriendlyName"
+
+
+def _list_devices_windows():
+    """Camera FriendlyNames in PnP order (matches DSHOW index order on the kiosk)."""
+    result = subprocess.run(["powershell", "-Command", POWERSHELL_LIST_CMD], capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error("PowerShell failed to list cameras")
+        return None
+    names = [line.strip() for line in result.stdout.split('\n') if line.strip()]
+    return [{"index": idx, "name": name} for idx, name in enumerate(names)]
+
+
+def _read_sysfs(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _list_devices_linux():
+    """V4L2 capture nodes from sysfs. UVC cameras also expose a metadata node (index 1): skipped."""
+    devices = []
+    for entry in _v4l2_signature() or ():
+        if not entry.startswith("video") or not entry[5:].isdigit():
+            continue
+        node = os.path.join(V4L2_SYSFS, entry)
+        if _read_sysfs(os.path.join(node, "index")) not in (None, "0"):
+            continue
+        devices.append({"index": int(entry[5:]), "name": _read_sysfs(os.path.join(node, "name")) or entry})
+    return sorted(devices, key=lambda d: d["index"])
+
+
+def _v4l2_signature():
+    try:
+        return tuple(sorted(os.listdir(V4L2_SYSFS)))
+    except OSError:
+        return None
+
+
+class CameraRegistry:
+    """
+    In-memory camera list + camera_config.json cache.
+    - camera_config.json is re-read only when its mtime changes
+    - Linux: device names from sysfs, re-read when /sys/class/video4linux changes (hotplug)
+    - Windows: PowerShell once; refreshed in the background after DEVICE_LIST_TTL_S
+    - Name -> index is a dict lookup (substring matches are memoized)
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.config = None
+        self.config_mtime = None
+        self.devices = None
+        self.by_name = {}
+        self.resolved = {}
+        self.signature = None
+        self.listed_at = 0.0
+        self.refreshing = False
+        self.enumerations = 0
+
+    # ---- camera_config.json ----
+
+    def load_config(self):
+        """DEFAULT_CONFIG + camera_config.json, cached by file mtime. Returns a copy."""
+        try:
+            mtime = os.path.getmtime(CONFIG_FILE)
+        except OSError:
+            mtime = None
+        with self.lock:
+            if self.config is not None and mtime == self.config_mtime:
+                return dict(self.config)
+
         config = DEFAULT_CONFIG.copy()
-        if os.path.exists(CONFIG_FILE):
+        if mtime is not None:
             try:
                 with open(CONFIG_FILE, 'r') as f:
-                    file_config = json.load(f)
-                    config.update(file_config)
-                    logger.info("Configuration loaded from file.")
+                    config.update(json.load(f))
+                logger.info("Configuration loaded from file.")
             except Exception as e:
                 logger.error(f"Failed to load config file: {e}")
         else:
-             logger.info("Config file not found, using defaults.")
-             # Auto-detect on first load if missing
-             CameraConfig.autodetect_indices()
-             # Reload after autodetection
-             if os.path.exists(CONFIG_FILE):
-                try:
-                    with open(CONFIG_FILE, 'r') as f:
-                        config.update(json.load(f))
-                except:
-                    pass
+            logger.info("Config file not found, using defaults.")
+        with self.lock:
+            self.config = config
+            self.config_mtime = mtime
+        return dict(config)
+
+    def invalidate_config(self):
+        with self.lock:
+            self.config = None
+
+    # ---- device list ----
+
+    def _set_devices(self, devices, signature=None):
+        with self.lock:
+            self.devices = devices
+            self.by_name = {d["name"].lower(): d["index"] for d in devices}
+            self.resolved = {}
+            self.signature = signature
+            self.listed_at = time.monotonic()
+            self.enumerations += 1
+        logger.info("----------- CAMERA DISCOVERY -----------")
+        for d in devices:
+            logger.info(f"Index {d['index']}: {d['name']}")
+        logger.info("----------------------------------------")
+
+    def _refresh_windows(self):
+        try:
+            devices = _list_devices_windows()
+            if devices is not None:
+                self._set_devices(devices)
+        except Exception as e:
+            logger.error(f"Error listing cameras: {e}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def list_devices(self):
+        """[{'index': 0, 'name': ...}, ...] from the cache (enumerates on first use / change)."""
+        if sys.platform.startswith("linux"):
+            signature = _v4l2_signature()
+            with self.lock:
+                fresh = self.devices is not None and signature == self.signature
+            if not fresh:
+                self._set_devices(_list_devices_linux() if signature else [], signature)
+        elif sys.platform == "win32":
+            with self.lock:
+                first = self.devices is None
+                stale = not first and time.monotonic() - self.listed_at > DEVICE_LIST_TTL_S
+                start_refresh = (first or stale) and not self.refreshing
+                if start_refresh:
+                    self.refreshing = True
+            if first and start_refresh:
+                self._refresh_windows()
+            elif start_refresh:
+                threading.Thread(target=self._refresh_windows, name="camera-registry", daemon=True).start()
+        else:
+            with self.lock:
+                if self.devices is None:
+                    self.devices = []
+        with self.lock:
+            return list(self.devices or [])
 
+    def invalidate_devices(self):
+        """Force re-enumeration on next use (e.g. after a camera failed to open)."""
+        with self.lock:
+            self.signature = None
+            self.listed_at = 0.0
+            if not sys.platform.startswith("linux"):
+                self.devices = None
+
+    def index_by_name(self, target_name):
+        """Exact (case-insensitive) name, else first device whose name contains it."""
+        self.list_devices()
+        key = target_name.lower()
+        with self.lock:
+            if key in self.by_name:
+                return self.by_name[key]
+            if key in self.resolved:
+                return self.resolved[key]
+            idx = next((d["index"] for d in self.devices or [] if key in d["name"].lower()), None)
+            self.resolved[key] = idx
+            return idx
+
+    def get_status(self):
+        with self.lock:
+            return {
+                "platform": sys.platform,
+                "devices": list(self.devices or []),
+                "enumerations": self.enumerations,
+                "listed_age_s": round(time.monotonic() - self.listed_at, 1) if self.listed_at else None,
+                "config": dict(self.config) if self.config is not None else None,
+            }
+
+
+camera_registry = CameraRegistry()
+
+
+class CameraConfig:
+    @staticmethod
+    def load():
+        config = camera_registry.load_config()
+        if camera_registry.config_mtime is None:
+            # Auto-detect on first load if missing (saves the file when something matched)
+            CameraConfig.autodetect_indices()
+            config = camera_registry.load_config()
         return config
 
     @staticmethod
@@ -69,6 +250,7 @@ class CameraConfig:
         try:
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(config, f, indent=4)
+            camera_registry.invalidate_config()
             logger.info(f"Configuration saved to {CONFIG_FILE}")
             return True
         except Exception as e:
@@ -95,33 +277,21 @@ class CameraConfig:
     @staticmethod
     def autodetect_indices():
         """
-        Uses PowerShell to list cameras by FriendlyName and map them to indices.
-        Assumes OpenCV DSHOW enumeration order matches PNP enumeration order.
+        Map cameras to roles by name (TARGET_MAPPING) using the cached device list.
+        Assumes OpenCV enumeration order matches the listed order (DSHOW / PnP on Windows,
+        /dev/videoN on Linux).
         """
         try:
-            # PowerShell command to list camera FriendlyNames in order
-            cmd = "Get-PnpDevice -Class Camera -Status OK | Select-Object -ExpandProperty FriendlyName"
-            result = subprocess.run(["powershell", "-Command", cmd], capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error("PowerShell failed to list cameras")
-                return
-
-            # Clean output: split by lines, strip whitespace, remove empty
-            found_cameras = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            
+            found_cameras = camera_registry.list_devices()
             if not found_cameras:
                 return
 
             detection_map = {}
-            logger.info("----------- CAMERA DISCOVERY -----------")
-            for idx, name in enumerate(found_cameras):
-                logger.info(f"Index {idx}: {name}")
-                
+            for device in found_cameras:
                 # Check against targets
                 for target_name, role in TARGET_MAPPING.items():
-                    if target_name.lower() in name.lower():
-                        detection_map[f"{role}_index"] = idx
+                    if target_name.lower() in device["name"].lower():
+                        detection_map[f"{role}_index"] = device["index"]
                         # Keep checking other targets? No, specific overrides generic
                         break
             
@@ -145,8 +315,6 @@ class CameraConfig:
                 
                 if updated:
                     CameraConfig.save(current_config)
-            
-            logger.info("----------------------------------------")
 
         except Exception as e:
             logger.error(f"Autodetection error: {e}")
@@ -158,31 +326,10 @@ class CameraConfig:
         Returns index (int) or None if not found.
         """
         try:
-            # List cameras in order (PowerShell)
-            # This order matches the order OpenCV sees (Index 0, 1, 2...)
-            cmd = "Get-PnpDevice -Class Camera -Status OK | Select-Object -ExpandProperty FriendlyName"
-            result = subprocess.run(["powershell", "-Command", cmd], capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error("PowerShell failed to list cameras")
-                return None
-
-            found_cameras = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            
-            # Use Raw Order from PowerShell (PnP enumeration order usually matches DSHOW on this machine)
-            # Do NOT sort alphabetically.
-            # found_cameras.sort() 
-            
-            logger.info(f"Looking for camera '{target_name}' in Raw List: {found_cameras}")
-            
-            for idx, name in enumerate(found_cameras):
-                # Loose matching to handle "Compliance" vs "Compliance Camera" etc.
-                if target_name.lower() in name.lower():
-                    logger.info(f"✅ Found '{target_name}' at Index {idx} (Raw Name: {name})")
-                    return idx
-            
-            logger.warning(f"❌ Camera '{target_name}' not found in device list.")
-            return None
+            idx = camera_registry.index_by_name(target_name)
+            if idx is None:
+                logger.warning(f"❌ Camera '{target_name}' not found in device list.")
+            return idx
 
         except Exception as e:
             logger.error(f"Error resolving camera index by name: {e}")
@@ -191,24 +338,11 @@ class CameraConfig:
     @staticmethod
     def get_available_cameras():
         """
-        Returns a list of detected cameras with their names and indices using PowerShell.
+        Returns a list of detected cameras with their names and indices (cached).
         Format: [{'index': 0, 'name': 'Camera Name'}, ...]
         """
         try:
-            cmd = "Get-PnpDevice -Class Camera -Status OK | Select-Object -ExpandProperty FriendlyName"
-            result = subprocess.run(["powershell", "-Command", cmd], capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error("PowerShell failed to list cameras")
-                return []
-
-            found_cameras = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            
-            camera_list = []
-            for idx, name in enumerate(found_cameras):
-                camera_list.append({"index": idx, "name": name})
-                
-            return camera_list
+            return camera_registry.list_devices()
 
         except Exception as e:
             logger.error(f"Error getting available cameras: {e}")
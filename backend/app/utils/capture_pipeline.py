@@ -0,0 +1,152 @@
+"""
+Training-Image Capture Pipeline
+Queues frames for the training dataset and writes them from a background thread,
+so capturing thousands of frames costs the live camera loop nothing.
+
+- Bounded queue: when the writer falls behind, new captures are dropped (never block)
+- Near-duplicate skip: 64-bit difference hash (dHash) per frame, compared against the
+  recent hashes of the same class by Hamming distance
+- Optional YOLO labels: '<cls> <cx> <cy> <w> <h>' (normalized) written next to the
+  image, pre-filled from the current model's detections, ready for Roboflow review
+- Optional metadata: written as a .json sidecar (used by the hard-frame harvester)
+- class_name becomes a directory and file name, so it must match [A-Za-z0-9_-]+
+  (anything else, e.g. '../x' from a request, is rejected as 'invalid')
+
+Layout: <dataset_root>/<class_name>/<class_name>_<ms>_<seq>.jpg (+ .txt / .json)
+"""
+
+import os
+import re
+import json
+import queue
+import threading
+import time
+import logging
+from collections import deque
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLASS_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def valid_class_name(class_name):
+    """True when class_name is safe to use as a dataset directory / file name prefix."""
+    return isinstance(class_name, str) and CLASS_NAME_PATTERN.fullmatch(class_name) is not None
+
+
+def dhash(frame, hash_size=8):
+    """64-bit difference hash of a BGR/gray frame."""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def yolo_label_lines(detections, frame_shape):
+    """detections: iterable of (cls_id, x1, y1, x2, y2) in pixels -> YOLO label lines."""
+    h, w = frame_shape[:2]
+    lines = []
+    for cls_id, x1, y1, x2, y2 in detections:
+        cx = (x1 + x2) / 2.0 / w
+        cy = (y1 + y2) / 2.0 / h
+        bw = (x2 - x1) / float(w)
+        bh = (y2 - y1) / float(h)
+        lines.append(f"{int(cls_id)} {cx:.6f} {cy:.6f} {bw:.6f} {bh:.6f}")
+    return lines
+
+
+class CapturePipeline:
+    def __init__(self, dataset_root, max_queue=64, duplicate_distance=4, hash_history=256, jpeg_quality=95):
+        self.dataset_root = dataset_root
+        self.duplicate_distance = duplicate_distance
+        self.hash_history = hash_history
+        self.jpeg_quality = jpeg_quality
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.recent_hashes = {}  # class_name -> deque of hashes
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "duplicates": 0, "dropped": 0, "errors": 0, "labels": 0,
+                      "invalid": 0}
+
+        self.thread = threading.Thread(target=self._writer_loop, name="capture-writer", daemon=True)
+        self.thread.start()
+
+    def _bump(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def submit(self, frame, class_name, detections=None, metadata=None):
+        """
+        Queue a frame for writing. Returns (status, filepath):
+        status is 'queued', 'duplicate', 'dropped' (queue full) or 'invalid' (class_name
+        is not [A-Za-z0-9_-]+). Never blocks.
+        """
+        if not valid_class_name(class_name):
+            self._bump("invalid")
+            logger.warning(f"[Capture] Rejected class name {class_name!r}")
+            return "invalid", None
+
+        frame_hash = dhash(frame)
+        with self.lock:
+            history = self.recent_hashes.setdefault(class_name, deque(maxlen=self.hash_history))
+            if any(hamming(frame_hash, h) <= self.duplicate_distance for h in history):
+                self.stats["duplicates"] += 1
+                return "duplicate", None
+            history.append(frame_hash)
+            self.sequence += 1
+            seq = self.sequence
+
+        # Callers may pass reused camera buffers: keep a private copy until it is written
+        frame = frame.copy()
+        filename = f"{class_name}_{int(time.time() * 1000)}_{seq:05d}.jpg"
+        filepath = os.path.join(self.dataset_root, class_name, filename)
+        try:
+            self.queue.put_nowait((frame, filepath, detections, metadata))
+        except queue.Full:
+            with self.lock:
+                self.stats["dropped"] += 1
+                history.remove(frame_hash)
+            return "dropped", None
+
+        self._bump("queued")
+        return "queued", filepath
+
+    def _writer_loop(self):
+        while True:
+            frame, filepath, detections, metadata = self.queue.get()
+            try:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                if not cv2.imwrite(filepath, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+                    raise IOError(f"imwrite failed for {filepath}")
+                self._bump("written")
+
+                if detections is not None:
+                    label_path = os.path.splitext(filepath)[0] + ".txt"
+                    with open(label_path, "w") as f:
+                        f.write("\n".join(yolo_label_lines(detections, frame.shape)))
+                    self._bump("labels")
+
+                if metadata is not None:
+                    with open(os.path.splitext(filepath)[0] + ".json", "w") as f:
+                        json.dump(metadata, f, indent=2)
+                logger.info(f"[Capture] Saved Image: {filepath}")
+            except Exception as e:
+                logger.error(f"[Capture] Write error: {e}")
+                self._bump("errors")
+            finally:
+                self.queue.task_done()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.queue.qsize()
+        stats["dataset_root"] = self.dataset_root
+        return stats
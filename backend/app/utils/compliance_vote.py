@@ -0,0 +1,52 @@
+"""
+Temporal Compliance Voting
+Debounces the per-frame clearance result of one stage: a stage is stably "cleared" or in
+"violation" once k of its last n frames agree.
+
+- Each frame votes cleared (compliant with someone in view), violation (a forbidden item
+  was detected) or nothing (empty scene / AI error). An empty body frame has no
+  violations but must not count as clear, or an empty camera would clear the stage
+- The stable state only changes when the other outcome reaches k votes, so single-frame
+  flicker neither clears nor fails a stage; a window with no votes at all resets it
+- add() returns True when the stable state changed (the manager turns that into an event)
+"""
+
+from collections import deque
+
+OUTCOMES = ("cleared", "violation")
+
+
+class ComplianceVote:
+    def __init__(self, k=4, n=6):
+        self.n = max(1, n)
+        self.k = max(1, min(k, self.n))
+        self.window = deque(maxlen=self.n)
+        self.state = None
+
+    def reset(self):
+        self.window.clear()
+        self.state = None
+
+    def add(self, is_compliant, violations=(), present=True):
+        """Record one frame's result (`present`: someone is in view). Returns True when the stable state changed."""
+        if violations:
+            vote = "violation"
+        elif is_compliant and present:
+            vote = "cleared"
+        else:
+            vote = None
+        self.window.append(vote)
+        state = self.state
+        for outcome in OUTCOMES:
+            if outcome != state and self.window.count(outcome) >= self.k:
+                state = outcome
+                break
+        else:
+            if len(self.window) == self.n and not any(self.window):
+                state = None
+        changed, self.state = state != self.state, state
+        return changed
+
+    def summary(self):
+        return {"state": self.state, "k": self.k, "n": self.n,
+                **{outcome: self.window.count(outcome) for outcome in OUTCOMES}}
@@ -0,0 +1,153 @@
+"""
+Digit Assembly Engine
+Turns raw YOLO digit detections from the BP monitor into systolic/diastolic strings.
+
+Everything works on NumPy arrays (one row per detection) instead of lists of dicts:
+- nms():          vectorized greedy non-maximum suppression (agnostic to class)
+- cluster_rows(): splits detections into display rows, robust to tilt and zoom
+- DigitAssembler: NMS + row clustering + string assembly in one call
+
+Row splitting no longer uses a fixed 50 px vertical spread. Thresholds are relative
+to the median digit height, and the centers are de-tilted with a least-squares slope
+fitted within rows, so a camera that is zoomed in/out or slightly rotated gives the
+same rows.
+"""
+
+import numpy as np
+
+
+def pairwise_iou(boxes):
+    """(N, N) IoU matrix for an (N, 4) array of xyxy boxes, computed in one broadcast."""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    area = (x2 - x1) * (y2 - y1)
+
+    iw = np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :])
+    ih = np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :])
+    inter = np.maximum(iw, 0) * np.maximum(ih, 0)
+    union = area[:, None] + area[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=0.4):
+    """
+    Greedy NMS. Returns indices of kept boxes, highest score first.
+    The IoU matrix is computed once; the greedy pass only ORs precomputed rows.
+    """
+    n = len(boxes)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    order = np.argsort(-scores, kind='stable')
+    if n == 1:
+        return order
+
+    overlaps = pairwise_iou(boxes) > iou_threshold
+    suppressed = np.zeros(n, dtype=bool)
+    keep = []
+    for i in order.tolist():
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= overlaps[i]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def _split_rows(values, min_gap):
+    """Row id per value: a new row starts at every gap of at least min_gap (sorted order)."""
+    order = np.argsort(values, kind='stable')
+    rows = np.zeros(len(values), dtype=np.intp)
+    rows[order[1:]] = np.cumsum(np.diff(values[order]) >= min_gap)
+    return rows
+
+
+def _within_row_slope(cx, cy, rows):
+    """Pooled least-squares slope of cy over cx, each row centered on its own mean."""
+    dx = cx.astype(np.float64)
+    dy = cy.astype(np.float64)
+    counts = np.bincount(rows)
+    dx = dx - (np.bincount(rows, dx) / counts)[rows]
+    dy = dy - (np.bincount(rows, dy) / counts)[rows]
+    var_x = float(dx @ dx)
+    return float(dx @ dy) / var_x if var_x > 1e-6 else 0.0
+
+
+def cluster_rows(centers, heights, split_ratio=0.6):
+    """
+    Assign each digit center to a display row.
+
+    centers: (N, 2) array of (cx, cy)
+    heights: (N,) array of box heights
+    Returns an (N,) int array of row ids, 0 for the top row, counting down the display
+    (a third row is the pulse on monitors that show it). All zeros means a single row
+    (pumping/deflating display).
+    """
+    n = len(centers)
+    if n < 2:
+        return np.zeros(n, dtype=np.intp)
+
+    cx = centers[:, 0]
+    cy = centers[:, 1]
+    digit_h = float(np.sort(heights)[n // 2])
+    min_gap = max(digit_h * split_ratio, 1.0)
+
+    # Remove display tilt: fit the slope within the rows of a first split on raw cy, then
+    # split the residuals. A fit across rows would read a shorter, right-aligned bottom row
+    # as tilt and pull the rows together.
+    rows = _split_rows(cy, min_gap)
+    slope = _within_row_slope(cx, cy, rows)
+    # Ignore implausible slopes (e.g. two digits stacked vertically)
+    if abs(slope) > 0.5:
+        slope = 0.0
+    return _split_rows(cy - slope * cx, min_gap)
+
+
+class DigitAssembler:
+    """NMS + row clustering + string assembly for BP monitor digits."""
+
+    def __init__(self, iou_threshold=0.4, split_ratio=0.6):
+        self.iou_threshold = iou_threshold
+        self.split_ratio = split_ratio
+
+    def assemble(self, boxes, scores, digits):
+        """
+        boxes:  (N, 4) xyxy float array
+        scores: (N,) confidences
+        digits: (N,) int array of digit values 0-9
+
+        Returns a dict:
+            keep:      indices (into the input) of the detections that survived NMS
+            rows:      row id per kept detection (0 = top, 1 = second, 2 = pulse if shown)
+            two_rows:  True when a systolic/diastolic result is on screen
+            sys / dia: assembled strings of the first two rows ('' when empty); a pulse row is ignored
+            sys_conf / dia_conf: per-position confidences, left to right
+            sys_idx / dia_idx:   per-position indices into the input arrays
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        digits = np.asarray(digits, dtype=np.intp).reshape(-1)
+
+        keep = nms(boxes, scores, self.iou_threshold)
+        kb = boxes[keep]
+        centers = np.stack(((kb[:, 0] + kb[:, 2]) / 2, (kb[:, 1] + kb[:, 3]) / 2), axis=1) if len(kb) else np.empty((0, 2))
+        heights = kb[:, 3] - kb[:, 1]
+        rows = cluster_rows(centers, heights, self.split_ratio)
+
+        # Reading order: top row first, then left to right within each row
+        order = np.lexsort((centers[:, 0], rows)) if len(keep) else keep
+        ordered = keep[order]
+        n_top = int(np.count_nonzero(rows == 0))
+        n_first_two = n_top + int(np.count_nonzero(rows == 1))
+        labels = "".join(map(str, digits[ordered].tolist()))
+        confs = scores[ordered]
+
+        return {
+            "keep": keep,
+            "rows": rows,
+            "two_rows": n_top < len(keep),
+            "sys": labels[:n_top],
+            "dia": labels[n_top:n_first_two],
+            "sys_conf": confs[:n_top],
+            "dia_conf": confs[n_top:n_first_two],
+            "sys_idx": ordered[:n_top],
+            "dia_idx": ordered[n_top:n_first_two],
+        }
@@ -0,0 +1,166 @@
+"""
+Frame Latency Tracing
+Stamps every camera frame as it moves through a controller and keeps per-stage histograms.
+
+Stages (all in milliseconds):
+    read            frame age when the loop gets it: from the earlier of capture and the
+                    start of read() to read() returning (driver wait + camera hub buffering)
+    preprocess      read() returned -> rotate/crop/zoom done
+    inference       preprocess -> YOLO + parsing done
+    annotate        inference -> boxes/text drawn (only frames someone is watching)
+    publish         annotate (or inference) -> frame/status stored for readers (lock wait)
+    idle            publish -> next cap.read() starts  (loop sleep)
+    status_visible  publish -> first get_status() that returns this frame's status
+    stream_visible  publish -> first stream/get_frame() that serves this frame
+    end_to_end      capture -> first time the frame is visible anywhere
+
+status_visible is where the frontend poll interval shows up. Frames published without
+annotation (headless: no stream viewer) are counted separately from annotated ones.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Bucket upper edges in ms; the last bucket is open-ended
+BUCKET_EDGES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram plus a window of recent samples for percentiles."""
+
+    def __init__(self, window=1000):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.recent = deque(maxlen=window)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        for i, edge in enumerate(BUCKET_EDGES_MS):
+            if ms <= edge:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.recent.append(ms)
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self):
+        ordered = sorted(self.recent)
+
+        def pct(p):
+            if not ordered:
+                return None
+            return round(ordered[min(int(p / 100.0 * len(ordered)), len(ordered) - 1)], 2)
+
+        labels = [f"<={e}" for e in BUCKET_EDGES_MS] + [f">{BUCKET_EDGES_MS[-1]}"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else None,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class FrameTrace:
+    """Timestamps (time.perf_counter) for one frame."""
+    __slots__ = ("seq", "read_start", "capture", "received", "preprocess", "inference", "annotate", "publish", "seen")
+
+    def __init__(self, seq, read_start, capture, received=None):
+        self.seq = seq
+        self.read_start = read_start
+        self.capture = capture
+        self.received = capture if received is None else received
+        self.preprocess = None
+        self.inference = None
+        self.annotate = None
+        self.publish = None
+        self.seen = set()
+
+    def mark(self, stage):
+        setattr(self, stage, time.perf_counter())
+
+
+class FrameTracer:
+    STAGES = ("read", "preprocess", "inference", "annotate", "publish", "idle",
+              "status_visible", "stream_visible", "end_to_end")
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.seq = 0
+        self.last_publish = None
+        self.annotated = 0
+        self.headless = 0
+
+    def _add(self, stage, start, end):
+        if start is not None and end is not None:
+            self.histograms[stage].add((end - start) * 1000.0)
+
+    def begin(self, read_start, capture=None):
+        """
+        Call right after read() returns a frame. capture: the frame's capture time
+        (camera hub timestamp, time.perf_counter clock); defaults to now.
+        """
+        received = time.perf_counter()
+        capture = received if capture is None else capture
+        with self.lock:
+            self.seq += 1
+            trace = FrameTrace(self.seq, read_start, capture, received)
+            self._add("read", min(read_start, capture), received)
+            self._add("idle", self.last_publish, read_start)
+        return trace
+
+    def publish(self, trace):
+        """Call once the frame and its status are visible to readers."""
+        if trace is None:
+            return
+        trace.mark("publish")
+        if trace.inference is None:
+            trace.inference = trace.preprocess
+        with self.lock:
+            self._add("preprocess", trace.received, trace.preprocess)
+            self._add("inference", trace.preprocess, trace.inference)
+            if trace.annotate is not None:
+                self.annotated += 1
+                self._add("annotate", trace.inference, trace.annotate)
+                self._add("publish", trace.annotate, trace.publish)
+            else:
+                self.headless += 1
+                self._add("publish", trace.inference, trace.publish)
+            self.last_publish = trace.publish
+
+    def visible(self, trace, channel):
+        """Call from get_status ('status') or the stream ('stream'); records once per frame and channel."""
+        if trace is None or trace.publish is None or channel in trace.seen:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            first = not trace.seen
+            trace.seen.add(channel)
+            self._add(f"{channel}_visible", trace.publish, now)
+            if first:
+                self._add("end_to_end", trace.capture, now)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "frames": self.seq,
+                "annotated_frames": self.annotated,
+                "headless_frames": self.headless,
+                "stages": {stage: h.snapshot() for stage, h in self.histograms.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+            self.last_publish = None
+            self.annotated = 0
+            self.headless = 0
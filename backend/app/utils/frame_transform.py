@@ -0,0 +1,163 @@
+"""
+Single-Pass Frame Transform
+Folds rotation, square crop, zoom crop and the final resize into one precomputed
+source ROI + a single resize, written into preallocated buffers.
+
+Before this, each BP frame went rotate -> square crop -> zoom crop -> resize and then two
+frame.copy() calls, and each clearance frame went rotate -> zoom -> square crop -> resize:
+several full-frame allocations per frame at 20-30 FPS.
+
+- Every step is axis-aligned, so the whole chain collapses to "resize this source
+  rectangle to that size"; rotation (90/180/270) is applied last on the small output
+  with cv2.rotate(dst=...) (a flip/transpose)
+- The ROI is rebuilt only when the input shape or a setting changes
+- Output buffers come from a small ring: a frame stays valid for `buffers - 1` further
+  calls. Anything that keeps a frame longer (capture queue, harvester) must copy it.
+
+A general cv2.warpAffine does the same in one call but measured 3-4x slower than
+resize on one core, so it is not used.
+"""
+
+import numpy as np
+import cv2
+
+
+class BufferRing:
+    """Round-robin pool of preallocated arrays of one shape/dtype."""
+
+    def __init__(self, count=4):
+        self.count = count
+        self.buffers = []
+        self.index = 0
+
+    def get(self, shape, dtype=np.uint8):
+        if not self.buffers or self.buffers[0].shape != shape or self.buffers[0].dtype != dtype:
+            self.buffers = [np.empty(shape, dtype=dtype) for _ in range(self.count)]
+            self.index = 0
+        buf = self.buffers[self.index]
+        self.index = (self.index + 1) % self.count
+        return buf
+
+    def copy(self, frame):
+        """np.copyto into the next buffer (a frame.copy() without the allocation)."""
+        buf = self.get(frame.shape, frame.dtype)
+        np.copyto(buf, frame)
+        return buf
+
+
+ROTATE_CODES = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}
+
+
+def _unrotate_rect(angle, x, y, w, h, src_w, src_h):
+    """Rectangle in the rotated frame -> the same pixels' rectangle in the source frame."""
+    if angle == 90:
+        return y, src_h - x - w, h, w
+    if angle == 180:
+        return src_w - x - w, src_h - y - h, w, h
+    if angle == 270:
+        return src_w - y - h, x, h, w
+    return x, y, w, h
+
+
+def _crop(x, y):
+    return np.array([[1, 0, x], [0, 1, y], [0, 0, 1]], dtype=np.float64)
+
+
+def _scale(src_size, dst_size):
+    """dst->src matrix of cv2.resize (half-pixel centers)."""
+    sx = src_size[0] / float(dst_size[0])
+    sy = src_size[1] / float(dst_size[1])
+    return np.array([[sx, 0, 0.5 * sx - 0.5], [0, sy, 0.5 * sy - 0.5], [0, 0, 1]], dtype=np.float64)
+
+
+class FrameTransform:
+    """
+    rotation:    0 / 90 / 180 / 270 (clockwise)
+    zoom:        center zoom factor (> 1.0 crops and scales back up)
+    square_crop: center square crop
+    zoom_first:  zoom before the square crop (clearance) instead of after (BP)
+    output_size: final square size in pixels (None = keep the cropped size)
+    """
+
+    def __init__(self, rotation=0, zoom=1.0, square_crop=True, zoom_first=False, output_size=None, buffers=4):
+        self.rotation = rotation
+        self.zoom = zoom
+        self.square_crop = square_crop
+        self.zoom_first = zoom_first
+        self.output_size = output_size
+        self.ring = BufferRing(buffers)
+        self.scratch = BufferRing(1)  # Pre-rotation resize target
+        self._key = None
+        self._roi = None
+        self._size = None
+        self._pre_size = None
+        self._rotate = None
+
+    def _build(self, h, w):
+        cw, ch = (h, w) if self.rotation in (90, 270) else (w, h)
+        rot_w, rot_h = cw, ch
+        m = np.eye(3)  # output -> rotated-frame coordinates
+
+        def zoom_step(m, cw, ch):
+            if self.zoom > 1.0:
+                zw, zh = int(cw / self.zoom), int(ch / self.zoom)
+                m = m @ _crop((cw - zw) // 2, (ch - zh) // 2) @ _scale((zw, zh), (cw, ch))
+            return m
+
+        def square_step(m, cw, ch):
+            if self.square_crop:
+                size = min(cw, ch)
+                m = m @ _crop((cw - size) // 2, (ch - size) // 2)
+                cw = ch = size
+            return m, cw, ch
+
+        if self.zoom_first:
+            m = zoom_step(m, cw, ch)
+            m, cw, ch = square_step(m, cw, ch)
+        else:
+            m, cw, ch = square_step(m, cw, ch)
+            m = zoom_step(m, cw, ch)
+
+        if self.output_size and (cw, ch) != (self.output_size, self.output_size):
+            m = m @ _scale((cw, ch), (self.output_size, self.output_size))
+            cw = ch = self.output_size
+
+        # m is diagonal scale + offset: invert cv2.resize's half-pixel mapping to get the ROI
+        rx = int(round(m[0, 2] - 0.5 * m[0, 0] + 0.5))
+        ry = int(round(m[1, 2] - 0.5 * m[1, 1] + 0.5))
+        rw = min(int(round(m[0, 0] * cw)), rot_w - rx)
+        rh = min(int(round(m[1, 1] * ch)), rot_h - ry)
+        x, y, rw, rh = _unrotate_rect(self.rotation, rx, ry, rw, rh, w, h)
+
+        self._roi = (slice(y, y + rh), slice(x, x + rw))
+        self._size = (cw, ch)
+        # Size before the final rotation (90/270 swap axes)
+        self._pre_size = (ch, cw) if self.rotation in (90, 270) else (cw, ch)
+        self._rotate = ROTATE_CODES.get(self.rotation)
+
+    def apply(self, frame):
+        """Transform `frame` into the next ring buffer and return it."""
+        h, w = frame.shape[:2]
+        key = (h, w, self.rotation, self.zoom, self.square_crop, self.zoom_first, self.output_size)
+        if key != self._key:
+            self._build(h, w)
+            self._key = key
+
+        cw, ch = self._size
+        out = self.ring.get((ch, cw) + frame.shape[2:], frame.dtype)
+        roi = frame[self._roi]
+        pw, ph = self._pre_size
+        resize = roi.shape[1] != pw or roi.shape[0] != ph
+
+        if self._rotate is None:
+            if resize:
+                cv2.resize(roi, (pw, ph), dst=out)
+            else:
+                np.copyto(out, roi)
+        elif resize:
+            scratch = self.scratch.get((ph, pw) + frame.shape[2:], frame.dtype)
+            cv2.resize(roi, (pw, ph), dst=scratch)
+            cv2.rotate(scratch, self._rotate, dst=out)
+        else:
+            cv2.rotate(roi, self._rotate, dst=out)
+        return out
@@ -0,0 +1,181 @@
+"""
+Pluggable JPEG Encoder
+Every streamed frame goes through one JPEG encode (stream_hub). This module puts a small
+backend layer in front of it so the fastest encoder available on the host is used.
+
+Backends (each optional except OpenCV):
+    opencv      cv2.imencode (libjpeg / libjpeg-turbo, depending on the OpenCV build)
+    turbojpeg   PyTurboJPEG on the system libjpeg-turbo (supports fast DCT)
+    simplejpeg  simplejpeg wheel with bundled libjpeg-turbo (supports fast DCT)
+
+Options (app/config.py):
+    JPEG_ENCODER      auto (default) | opencv | turbojpeg | simplejpeg
+    JPEG_SUBSAMPLING  420 (default) | 422 | 444  chroma subsampling
+    JPEG_FAST_DCT     1 (default): integer fast DCT where the backend supports it
+
+With "auto", each available backend encodes a calibration frame on first use and the
+fastest one is kept. benchmarks/bench_jpeg_encoders.py compares them in detail.
+"""
+
+import threading
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_SHAPE = (480, 480, 3)
+CALIBRATION_ROUNDS = 15
+
+
+class OpenCVEncoder:
+    name = "opencv"
+
+    SAMPLING = {
+        "420": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_420", None),
+        "422": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_422", None),
+        "444": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_444", None),
+    }
+
+    def __init__(self, subsampling="420", fast_dct=True):
+        self.params = []
+        sampling = self.SAMPLING.get(subsampling)
+        if sampling is not None:
+            self.params = [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, sampling]
+        self.fast_dct = False  # Not exposed by OpenCV
+
+    def encode(self, image, quality):
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality] + self.params)
+        return buffer.tobytes() if ok else None
+
+
+class TurboJPEGEncoder:
+    name = "turbojpeg"
+
+    def __init__(self, subsampling="420", fast_dct=True):
+        import turbojpeg
+        self.jpeg = turbojpeg.TurboJPEG()  # Raises if the libjpeg-turbo library isn't found
+        self.subsample = {"420": turbojpeg.TJSAMP_420, "422": turbojpeg.TJSAMP_422,
+                          "444": turbojpeg.TJSAMP_444}.get(subsampling, turbojpeg.TJSAMP_420)
+        self.flags = turbojpeg.TJFLAG_FASTDCT if fast_dct else 0
+        self.fast_dct = fast_dct
+
+    def encode(self, image, quality):
+        return self.jpeg.encode(image, quality=quality, jpeg_subsample=self.subsample, flags=self.flags)
+
+
+class SimpleJPEGEncoder:
+    name = "simplejpeg"
+
+    def __init__(self, subsampling="420", fast_dct=True):
+        import simplejpeg
+        self.simplejpeg = simplejpeg
+        self.subsampling = subsampling if subsampling in ("420", "422", "444") else "420"
+        self.fast_dct = fast_dct
+
+    def encode(self, image, quality):
+        return self.simplejpeg.encode_jpeg(np.ascontiguousarray(image), quality=quality, colorspace='BGR',
+                                           colorsubsampling=self.subsampling, fastdct=self.fast_dct)
+
+
+BACKENDS = {cls.name: cls for cls in (OpenCVEncoder, TurboJPEGEncoder, SimpleJPEGEncoder)}
+
+
+def available_encoders(subsampling="420", fast_dct=True):
+    """Instantiate every backend that imports and loads on this host."""
+    encoders = []
+    for name, cls in BACKENDS.items():
+        try:
+            encoders.append(cls(subsampling=subsampling, fast_dct=fast_dct))
+        except Exception as e:
+            logger.debug(f"JPEG backend {name} unavailable: {e}")
+    return encoders
+
+
+def calibration_frame(shape=CALIBRATION_SHAPE):
+    """Smooth noise: compresses roughly like a camera frame (pure noise doesn't)."""
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (7, 7), 0)
+
+
+def time_encoder(encoder, frame, quality, rounds=CALIBRATION_ROUNDS):
+    """Median encode time (ms) and size (bytes) of `frame`."""
+    encoder.encode(frame, quality)  # Warm-up
+    samples = []
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = encoder.encode(frame, quality)
+        samples.append((time.perf_counter() - start) * 1000.0)
+        size = len(data) if data else 0
+    return float(np.median(samples)), size
+
+
+class JpegEncoder:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.backend = None
+        self.calibration = {}
+
+    def _select(self):
+        subsampling, fast_dct = Config.JPEG_SUBSAMPLING, Config.JPEG_FAST_DCT
+        encoders = available_encoders(subsampling, fast_dct)
+        wanted = Config.JPEG_ENCODER
+        if wanted != "auto":
+            chosen = next((e for e in encoders if e.name == wanted), None)
+            if chosen is None:
+                logger.warning(f"🖼️ [JPEG] Backend '{wanted}' unavailable, picking the fastest instead")
+            else:
+                return chosen
+
+        frame = calibration_frame()
+        for encoder in encoders:
+            ms, size = time_encoder(encoder, frame, Config.STREAM_JPEG_QUALITY)
+            self.calibration[encoder.name] = {"encode_ms": round(ms, 3), "bytes": size}
+        chosen = min(encoders, key=lambda e: self.calibration[e.name]["encode_ms"])
+        logger.info(f"🖼️ [JPEG] Using {chosen.name} ({self.calibration[chosen.name]['encode_ms']:.2f} ms "
+                    f"per 480x480 frame; candidates: {self.calibration})")
+        return chosen
+
+    def get_backend(self):
+        if self.backend is None:
+            with self.lock:
+                if self.backend is None:
+                    self.backend = self._select()
+        return self.backend
+
+    def encode(self, image, quality):
+        """JPEG bytes of a BGR image, or None on failure."""
+        try:
+            return self.get_backend().encode(image, quality)
+        except Exception as e:
+            logger.error(f"🖼️ [JPEG] {self.backend.name if self.backend else '?'} encode failed: {e}")
+            return OpenCVEncoder(Config.JPEG_SUBSAMPLING).encode(image, quality)
+
+    def get_status(self):
+        backend = self.backend
+        return {
+            "backend": backend.name if backend else None,
+            "fast_dct": backend.fast_dct if backend else None,
+            "subsampling": Config.JPEG_SUBSAMPLING,
+            "available": [e.name for e in available_encoders()],
+            "calibration": self.calibration,
+        }
+
+
+jpeg_encoder = JpegEncoder()
@@ -0,0 +1,211 @@
+"""
+Overload Load-Shedding Controller
+When the kiosk CPU is saturated every camera loop falls behind at once. The camera loops
+report their inference latency and the age of each frame when they picked it up here;
+the controller degrades in steps and recovers the same way:
+
+    0  normal
+    1  preview_fps      stream preview capped to SHED_PREVIEW_FPS
+    2  no_annotation    preview shows the raw frame (no boxes/text)
+    3  low_resolution   clearance inference at imgsz=SHED_INFERENCE_IMGSZ
+    4  clearance_fps    clearance loops sleep 1/SHED_CLEARANCE_FPS between frames
+
+The BP result path is never degraded: BP inference and status keep full resolution and
+rate at every level (only its preview is affected by 1-2). BP latency still counts
+towards the pressure, so a struggling BP loop sheds clearance work.
+
+Backlog = how many camera frames old a frame was when its loop received it, beyond the
+one frame a 'latest' reader can always be behind. Frames a loop skips while sleeping or
+running inference (including the longer clearance sleep of level 4) are not backlog: the
+loop reads the freshest frame after them, so only real queueing (a starved thread
+waking up late) counts.
+
+Pressure = worst of (inference EWMA / budget, backlog EWMA / max backlog) over the loops
+that reported in the last 2 s. One step up after SHED_ESCALATE_S above 1.0, one step
+down after SHED_RECOVER_S below 0.7. When every loop has been idle the level resets to
+normal on the next report. Transitions are logged and counted.
+"""
+
+import threading
+import time
+import logging
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("normal", "preview_fps", "no_annotation", "low_resolution", "clearance_fps")
+PRIORITY_PIPELINES = ("bp",)
+EWMA_ALPHA = 0.2
+STALE_S = 2.0
+RECOVER_BELOW = 0.7
+CAMERA_FRAME_MS = 1000.0 / 30  # Camera loops subscribe at 30 FPS
+
+
+class _PipelineLoad:
+    __slots__ = ("inference_ms", "backlog", "last_report", "last_preview")
+
+    def __init__(self):
+        self.inference_ms = None
+        self.backlog = 0.0
+        self.last_report = 0.0
+        self.last_preview = 0.0
+
+
+class LoadShedder:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.lock = threading.Lock()
+        self.pipelines = {}
+        self.level = 0
+        self.pressure = 0.0
+        self.over_since = None
+        self.under_since = None
+        self.changed_at = time.monotonic()
+        self.escalations = 0
+        self.recoveries = 0
+        self.entered = [0] * len(LEVELS)
+        self.time_at_level = [0.0] * len(LEVELS)
+        self.history = []  # Recent transitions for /api/system/load
+
+    @staticmethod
+    def backlog_frames(frame_age_ms):
+        """Frame age at read -> camera frames of queueing (0 up to one frame period)."""
+        return max(0.0, frame_age_ms - CAMERA_FRAME_MS) / CAMERA_FRAME_MS
+
+    def report(self, pipeline, inference_ms, frame_age_ms=0.0):
+        """Call once per processed frame from a camera loop (frame_age_ms: received - captured)."""
+        if not Config.SHED_ENABLED:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if self.level > 0 and all(now - l.last_report > STALE_S for l in self.pipelines.values()):
+                self._set_level(0, now)  # New session after idle: start from normal
+            load = self.pipelines.get(pipeline)
+            if load is None:
+                load = self.pipelines[pipeline] = _PipelineLoad()
+            if inference_ms is not None:
+                load.inference_ms = inference_ms if load.inference_ms is None else \
+                    load.inference_ms + EWMA_ALPHA * (inference_ms - load.inference_ms)
+            load.backlog += EWMA_ALPHA * (self.backlog_frames(frame_age_ms) - load.backlog)
+            load.last_report = now
+            self._update(now)
+
+    def _pressure(self, now):
+        worst = 0.0
+        for load in self.pipelines.values():
+            if now - load.last_report > STALE_S:
+                continue
+            if load.inference_ms is not None:
+                worst = max(worst, load.inference_ms / Config.SHED_INFERENCE_BUDGET_MS)
+            worst = max(worst, load.backlog / Config.SHED_MAX_BACKLOG)
+        return worst
+
+    def _update(self, now):
+        self.pressure = self._pressure(now)
+        if self.pressure > 1.0:
+            self.under_since = None
+            self.over_since = self.over_since or now
+            if now - self.over_since >= Config.SHED_ESCALATE_S and self.level < len(LEVELS) - 1:
+                self._set_level(self.level + 1, now)
+                self.over_since = now
+        elif self.pressure < RECOVER_BELOW:
+            self.over_since = None
+            self.under_since = self.under_since or now
+            if now - self.under_since >= Config.SHED_RECOVER_S and self.level > 0:
+                self._set_level(self.level - 1, now)
+                self.under_since = now
+        else:
+            self.over_since = None
+            self.under_since = None
+
+    def _set_level(self, level, now):
+        previous = self.level
+        self.time_at_level[previous] += now - self.changed_at
+        self.changed_at = now
+        self.level = level
+        self.entered[level] += 1
+        if level > previous:
+            self.escalations += 1
+            logger.warning(f"🔻 [LoadShed] {LEVELS[previous]} -> {LEVELS[level]} (pressure {self.pressure:.2f})")
+        else:
+            self.recoveries += 1
+            logger.info(f"🔺 [LoadShed] {LEVELS[previous]} -> {LEVELS[level]} (pressure {self.pressure:.2f})")
+        self.history.append({"time": time.time(), "from": LEVELS[previous], "to": LEVELS[level],
+                             "pressure": round(self.pressure, 2)})
+        del self.history[:-20]
+
+    # ---- Decisions for the camera loops ----
+
+    def publish_preview(self, pipeline):
+        """Whether this frame should go to the preview stream (level >= 1 caps the FPS)."""
+        if self.level < 1:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            load = self.pipelines.get(pipeline)
+            if load is None:
+                return True
+            if now - load.last_preview < 1.0 / Config.SHED_PREVIEW_FPS:
+                return False
+            load.last_preview = now
+            return True
+
+    def annotate(self):
+        """False from level 2: publish the raw frame instead of drawing boxes/text."""
+        return self.level < 2
+
+    def inference_kwargs(self, pipeline):
+        """Extra model kwargs (reduced imgsz from level 3); never for the BP result path."""
+        if self.level >= 3 and pipeline not in PRIORITY_PIPELINES:
+            return {"imgsz": Config.SHED_INFERENCE_IMGSZ}
+        return {}
+
+    def loop_delay(self, pipeline, default):
+        """Sleep between frames (clearance slowed to 1/SHED_CLEARANCE_FPS from level 4)."""
+        if self.level >= 4 and pipeline not in PRIORITY_PIPELINES:
+            return max(default, 1.0 / Config.SHED_CLEARANCE_FPS)
+        return default
+
+    def get_status(self):
+        now = time.monotonic()
+        with self.lock:
+            time_at_level = list(self.time_at_level)
+            time_at_level[self.level] += now - self.changed_at
+            return {
+                "enabled": Config.SHED_ENABLED,
+                "level": self.level,
+                "state": LEVELS[self.level],
+                "pressure": round(self.pressure, 2),
+                "escalations": self.escalations,
+                "recoveries": self.recoveries,
+                "entered": dict(zip(LEVELS, self.entered)),
+                "seconds_at_level": {name: round(s, 1) for name, s in zip(LEVELS, time_at_level)},
+                "pipelines": {
+                    name: {
+                        "inference_ms": round(load.inference_ms, 1) if load.inference_ms is not None else None,
+                        "backlog": round(load.backlog, 2),
+                        "active": now - load.last_report <= STALE_S,
+                    }
+                    for name, load in self.pipelines.items()
+                },
+                "budget": {
+                    "inference_ms": Config.SHED_INFERENCE_BUDGET_MS,
+                    "max_backlog": Config.SHED_MAX_BACKLOG,
+                },
+                "history": list(self.history),
+            }
+
+
+load_shedder = LoadShedder()
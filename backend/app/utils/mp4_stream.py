@@ -0,0 +1,367 @@
+"""
+Fragmented-MP4 (H.264) Stream
+Low-bandwidth alternative to the MJPEG feeds for remote monitoring: the same frames the
+MJPEG stream carries, encoded once by an ffmpeg/libx264 process and fanned out to every
+viewer as fragmented MP4 (plays in a plain <video src="..."> tag).
+
+- One encoder per stream, started by the first viewer and stopped STREAM_MP4_IDLE_S after
+  the last one leaves
+- An fMP4 viewer counts as a watcher of the source stream, so headless producers publish
+  for it; the first viewer waits (FIRST_FRAME_TIMEOUT_S) for a fresh frame, never a stale one
+- A feeder thread hands ffmpeg the newest frame at a constant STREAM_MP4_FPS (repeats are
+  almost free in H.264), scaled to STREAM_MP4_WIDTH. The encoder size is fixed by the first
+  frame; frames of another shape (e.g. the 960-wide dual clearance view) are letterboxed
+- ffmpeg writes ftyp+moov once, then one moof+mdat fragment per GOP (1 s, starting with a
+  keyframe); late joiners get the init segment and continue from the next fragment
+- Encoding runs in a separate process, so it does not compete for the GIL
+- get_status() reports encoder bitrate and CPU next to the MJPEG stream's bitrate
+
+Needs an ffmpeg binary with libx264 (FFMPEG_PATH).
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.utils.stream_hub import stream_hub, _Viewer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+INIT_BOXES = (b"ftyp", b"moov")
+READ_CHUNK = 64 * 1024
+FIRST_FRAME_TIMEOUT_S = 3.0
+
+
+def ffmpeg_command(width, height, fps, bitrate, ffmpeg=None):
+    """raw BGR frames on stdin -> H.264 fragmented MP4 on stdout."""
+    return [
+        ffmpeg or Config.FFMPEG_PATH, "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-an", "-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency",
+        "-pix_fmt", "yuv420p", "-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate,
+        "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0",
+        "-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof", "-",
+    ]
+
+
+def split_boxes(buffer):
+    """Split complete top-level MP4 boxes off `buffer`. Returns ([(type, bytes)], rest)."""
+    boxes = []
+    offset = 0
+    while len(buffer) - offset >= 8:
+        size = int.from_bytes(buffer[offset:offset + 4], "big")
+        box_type = bytes(buffer[offset + 4:offset + 8])
+        if size == 1:  # 64-bit size follows the type
+            if len(buffer) - offset < 16:
+                break
+            size = int.from_bytes(buffer[offset + 8:offset + 16], "big")
+        if size < 8 or len(buffer) - offset < size:
+            break
+        boxes.append((box_type, bytes(buffer[offset:offset + size])))
+        offset += size
+    return boxes, buffer[offset:]
+
+
+def output_size(frame_shape, width):
+    """Even (w, h) at `width` px wide, keeping the aspect ratio (yuv420p needs even sizes)."""
+    h, w = frame_shape[:2]
+    width = min(width, w) // 2 * 2
+    height = max(2, round(h * width / w) // 2 * 2)
+    return width, height
+
+
+def letterbox(frame, size, canvas):
+    """Fit `frame` into `canvas` (size (w, h)) keeping its aspect ratio, black bars around it."""
+    w, h = size
+    fh, fw = frame.shape[:2]
+    scale = min(w / fw, h / fh)
+    sw, sh = max(1, round(fw * scale)), max(1, round(fh * scale))
+    x, y = (w - sw) // 2, (h - sh) // 2
+    canvas[:] = 0
+    canvas[y:y + sh, x:x + sw] = cv2.resize(frame, (sw, sh), interpolation=cv2.INTER_AREA)
+    return canvas
+
+
+class Mp4Stream:
+    def __init__(self, source, max_viewers=4):
+        self.source = source            # MjpegStream providing the frames
+        self.name = source.name
+        self.max_viewers = max_viewers
+        self.fps = Config.STREAM_MP4_FPS
+        self.bitrate = Config.STREAM_MP4_BITRATE
+
+        self.cond = threading.Condition()
+        self.viewers = 0
+        self.proc = None
+        self.size = None
+        self.generation = 0     # Bumped per encoder start; viewers of an old encoder leave
+        self.init_segment = None
+        self.fragment = None    # (seq, bytes) of the newest moof+mdat
+        self.fragment_seq = 0
+        self.started_at = None
+        self.last_viewer_left = None
+
+        self.stats = {"starts": 0, "frames_fed": 0, "fragments": 0, "bytes_encoded": 0,
+                      "served": 0, "bytes_out": 0, "rejected": 0, "encoder_errors": 0}
+        self.encoder_cpu_s = 0.0
+        self.encoder_uptime_s = 0.0
+
+    @staticmethod
+    def available():
+        return shutil.which(Config.FFMPEG_PATH) is not None
+
+    # ---------- encoder ----------
+
+    def _start_encoder(self, frame):
+        """Start ffmpeg sized for `frame`. Called with self.cond held."""
+        self.size = output_size(frame.shape, Config.STREAM_MP4_WIDTH)
+        try:
+            proc = subprocess.Popen(ffmpeg_command(*self.size, self.fps, self.bitrate),
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            self.stats["encoder_errors"] += 1
+            logger.error(f"🎞️ [MP4:{self.name}] Could not start ffmpeg: {e}")
+            return False
+        self.proc = proc
+        self.generation += 1
+        self.init_segment = None
+        self.fragment = None
+        self.started_at = time.monotonic()
+        self.stats["starts"] += 1
+        generation = self.generation
+        threading.Thread(target=self._feed_loop, args=(proc, generation), name=f"mp4-feed-{self.name}", daemon=True).start()
+        threading.Thread(target=self._read_loop, args=(proc, generation), name=f"mp4-read-{self.name}", daemon=True).start()
+        logger.info(f"🎞️ [MP4:{self.name}] Encoder started ({self.size[0]}x{self.size[1]} @ {self.fps} FPS, {self.bitrate})")
+        return True
+
+    def _feed_loop(self, proc, generation):
+        period = 1.0 / self.fps
+        next_t = time.perf_counter()
+        canvas = np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+        try:
+            while True:
+                with self.cond:
+                    if self.generation != generation:
+                        break
+                    if self.viewers == 0 and self.last_viewer_left is not None and \
+                            time.monotonic() - self.last_viewer_left > Config.STREAM_MP4_IDLE_S:
+                        self._retire(generation)  # A new viewer now starts a fresh encoder
+                        break
+                _, frame = self.source.peek_frame()
+                if frame is not None:
+                    if output_size(frame.shape, self.size[0]) != self.size:
+                        frame = letterbox(frame, self.size, canvas)  # Shape changed since the encoder started
+                    elif (frame.shape[1], frame.shape[0]) != self.size:
+                        frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                    proc.stdin.write(frame.tobytes())
+                    with self.cond:
+                        self.stats["frames_fed"] += 1
+                next_t += period
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+        finally:
+            try:
+                proc.stdin.close()  # ffmpeg flushes and exits; the reader sees EOF
+            except OSError:
+                pass
+
+    def _read_loop(self, proc, generation):
+        buffer = b""
+        pending = b""  # moof waiting for its mdat
+        while True:
+            chunk = proc.stdout.read1(READ_CHUNK) if hasattr(proc.stdout, "read1") else proc.stdout.read(READ_CHUNK)
+            if not chunk:
+                break
+            boxes, buffer = split_boxes(buffer + chunk)
+            with self.cond:
+                if self.generation != generation:
+                    continue  # Retired encoder flushing its tail: drain, don't publish
+                for box_type, data in boxes:
+                    self.stats["bytes_encoded"] += len(data)
+                    if box_type in INIT_BOXES:
+                        self.init_segment = (self.init_segment or b"") + data
+                    elif box_type == b"mdat":
+                        self.fragment_seq += 1
+                        self.fragment = (self.fragment_seq, pending + data)
+                        self.stats["fragments"] += 1
+                        pending = b""
+                    else:
+                        pending += data  # moof (and any styp/sidx) precede the mdat
+                self.cond.notify_all()
+        self._sample_cpu(proc)
+        proc.wait()
+        with self.cond:
+            if self.generation == generation:  # Encoder died on its own
+                self.stats["encoder_errors"] += 1
+                self._retire(generation)
+        logger.info(f"🎞️ [MP4:{self.name}] Encoder stopped (exit {proc.returncode})")
+
+    def _retire(self, generation):
+        """Detach the current encoder and end its viewers. Called with self.cond held."""
+        if self.generation == generation:
+            self.encoder_uptime_s += time.monotonic() - self.started_at
+            self.proc = None
+            self.generation += 1
+            self.cond.notify_all()
+
+    def _sample_cpu(self, proc):
+        if psutil is None:
+            return
+        try:
+            times = psutil.Process(proc.pid).cpu_times()
+            self.encoder_cpu_s += times.user + times.system
+        except Exception:
+            pass
+
+    # ---------- viewers ----------
+
+    def open_viewer(self, keep_alive=None):
+        """Reserve a viewer slot and make sure the encoder runs. None if full / no fresh frame / no ffmpeg."""
+        with self.cond:
+            if self.viewers >= self.max_viewers:
+                self.stats["rejected"] += 1
+                return None
+            self.viewers += 1
+            self.last_viewer_left = None
+            running = self.proc is not None
+        self.source.add_watcher(1)  # Headless producers start publishing for us
+
+        if not running:
+            # The source may hold nothing or a frame from an earlier session: wait for a new one
+            seq, _ = self.source.peek_frame()
+            _, frame = self.source.wait_frame(seq, FIRST_FRAME_TIMEOUT_S)
+            with self.cond:
+                if self.proc is None and (frame is None or not self._start_encoder(frame)):
+                    self._release_viewer_locked()
+                    frame = None
+            if frame is None:
+                self.source.add_watcher(-1)
+                return None
+        return _Viewer(self, self._chunks(self.generation, keep_alive))
+
+    def _release_viewer_locked(self):
+        self.viewers -= 1
+        if self.viewers == 0:
+            self.last_viewer_left = time.monotonic()
+
+    def _release_viewer(self):
+        with self.cond:
+            self._release_viewer_locked()
+        self.source.add_watcher(-1)
+
+    def _chunks(self, generation, keep_alive, timeout=1.0):
+        with self.cond:
+            last_seq = self.fragment_seq  # Start at the next fragment (begins with a keyframe)
+            deadline = time.monotonic() + 5.0
+            while self.init_segment is None or self.fragment_seq <= last_seq:
+                if self.generation != generation or time.monotonic() > deadline:
+                    return
+                self.cond.wait(timeout)
+            init = self.init_segment
+        yield init
+
+        while True:
+            if keep_alive is not None and not keep_alive():
+                return
+            with self.cond:
+                while self.fragment_seq <= last_seq and self.generation == generation:
+                    if not self.cond.wait(timeout) and keep_alive is not None and not keep_alive():
+                        return
+                if self.generation != generation:
+                    return
+                seq, data = self.fragment
+                # A viewer that fell more than one fragment behind skips ahead (next one is a keyframe too)
+                last_seq = seq
+                self.stats["served"] += 1
+                self.stats["bytes_out"] += len(data)
+            yield data
+
+    def get_status(self):
+        with self.cond:
+            stats = dict(self.stats)
+            running = self.proc is not None
+            uptime = self.encoder_uptime_s + (time.monotonic() - self.started_at if running else 0.0)
+            proc = self.proc
+            stats.update({
+                "running": running,
+                "viewers": self.viewers,
+                "size": list(self.size) if self.size else None,
+                "fps": self.fps,
+                "bitrate_target": self.bitrate,
+            })
+        cpu = self.encoder_cpu_s
+        if proc is not None and psutil is not None:
+            try:
+                times = psutil.Process(proc.pid).cpu_times()
+                cpu += times.user + times.system
+            except Exception:
+                pass
+        stats["encoded_kbps"] = round(stats["bytes_encoded"] * 8 / uptime / 1000.0, 1) if uptime > 0 else None
+        stats["encoder_cpu_percent"] = round(cpu / uptime * 100.0, 1) if uptime > 0 and psutil is not None else None
+        # What one MJPEG viewer of the same stream costs at the same frame rate, for comparison
+        mjpeg = self.source.get_status()
+        stats["mjpeg_kbps_at_same_fps"] = round(mjpeg["bytes_out"] / mjpeg["served"] * 8 * self.fps / 1000.0, 1) \
+            if mjpeg["served"] else None
+        return stats
+
+
+class Mp4StreamHub:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.streams = {}
+
+    def stream(self, name):
+        """fMP4 stream fed from stream_hub.stream(name)."""
+        with self.lock:
+            stream = self.streams.get(name)
+            if stream is None:
+                stream = Mp4Stream(stream_hub.stream(name), max_viewers=Config.STREAM_MAX_VIEWERS)
+                self.streams[name] = stream
+            return stream
+
+    def get_status(self):
+        with self.lock:
+            streams = dict(self.streams)
+        return {
+            "enabled": Config.STREAM_MP4_ENABLED,
+            "ffmpeg": Mp4Stream.available(),
+            "streams": {name: stream.get_status() for name, stream in streams.items()},
+        }
+
+
+mp4_hub = Mp4StreamHub()
+
+
+def open_mp4_viewer(name, keep_alive=None):
+    """(viewer, None) or (None, (error message, HTTP status)) for the fMP4 routes."""
+    if not Config.STREAM_MP4_ENABLED:
+        return None, ("MP4 streaming disabled", 404)
+    if not Mp4Stream.available():
+        return None, ("ffmpeg not available", 503)
+    viewer = mp4_hub.stream(name).open_viewer(keep_alive=keep_alive)
+    if viewer is None:
+        return None, ("Stream not available (no frames yet or too many viewers)", 503)
+    return viewer, None
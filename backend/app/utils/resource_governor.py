@@ -0,0 +1,220 @@
+"""
+CPU Resource Governor
+Ultralytics/torch size their thread pools to every core. With two models running at once
+the serial listeners and Flask request threads get starved (status polls and LCD updates
+stutter). The governor puts inference on a budget:
+
+- Torch intra-op threads per model (INFERENCE_TORCH_THREADS, e.g. "bp=2,weight=1"), set in
+  the calling thread before each model call; default splits the inference cores between
+  two concurrent models
+- CPU_RESERVED_CORES cores are kept out of the inference budget for serial + HTTP
+- CPU_PIN_INFERENCE=1 additionally pins inference threads (and worker processes) to the
+  remaining cores, so the reserved ones stay free
+- Per-subsystem CPU usage, by thread name (needs psutil; process total otherwise)
+
+Exposed at GET /api/system/cpu.
+"""
+
+import os
+import sys
+import time
+import threading
+import logging
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Thread-name prefix -> subsystem (threads are named where they are started)
+SUBSYSTEMS = (
+    ("bp-", "bp"),
+    ("clearance-", "clearance"),
+    ("wearables-", "wearables"),
+    ("camera-", "camera"),
+    ("serial-", "serial"),
+    ("batcher-", "inference"),
+    ("inference-", "inference"),
+    ("model-warmup", "inference"),
+    ("capture-writer", "capture"),
+    ("MainThread", "http"),
+)
+
+
+def subsystem_of(thread_name):
+    for prefix, subsystem in SUBSYSTEMS:
+        if thread_name.startswith(prefix):
+            return subsystem
+    if "process_request_thread" in thread_name:  # werkzeug request handlers
+        return "http"
+    return "other"
+
+
+def parse_thread_budget(spec):
+    """"bp=2,weight=1" -> {"bp": 2, "weight": 1} (model file stem -> torch threads)."""
+    budget = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit():
+            budget[name.strip()] = max(1, int(value))
+    return budget
+
+
+def pin_current_thread(cores):
+    """Restrict the calling thread to `cores`. Returns False where unsupported."""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)  # 0 = calling thread on Linux
+            return True
+        if sys.platform == "win32":
+            import ctypes
+            mask = sum(1 << c for c in cores)
+            kernel32 = ctypes.windll.kernel32
+            return kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask) != 0
+    except Exception as e:
+        logger.warning(f"⚙️ [CPU] Could not pin thread to cores {cores}: {e}")
+    return False
+
+
+def pin_current_process(cores):
+    """Restrict the whole process (inference worker) to `cores`."""
+    try:
+        if psutil is not None:
+            psutil.Process().cpu_affinity(list(cores))
+            return True
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(os.getpid(), cores)
+            return True
+    except Exception as e:
+        logger.warning(f"⚙️ [CPU] Could not pin process to cores {cores}: {e}")
+    return False
+
+
+class GovernedModel:
+    """Callable like a YOLO model; applies the model's thread budget/pinning per calling thread."""
+
+    def __init__(self, model, name, governor):
+        self.model = model
+        self.name = name
+        self.governor = governor
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def __call__(self, *args, **kwargs):
+        self.governor.apply(self.name)
+        return self.model(*args, **kwargs)
+
+
+class ResourceGovernor:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.cores = os.cpu_count() or 1
+        self.reserved = min(max(0, Config.CPU_RESERVED_CORES), self.cores - 1)
+        self.inference_cores = list(range(self.reserved, self.cores))
+        self.pin = Config.CPU_PIN_INFERENCE
+        self.budget = parse_thread_budget(Config.INFERENCE_TORCH_THREADS)
+        # Two models usually run at once (feet/body + BP): split the inference cores
+        self.default_threads = max(1, len(self.inference_cores) // 2)
+        self.applied = {}  # thread name -> (model, torch threads)
+        self.last_sample = None
+
+    def threads_for(self, name):
+        return self.budget.get(name, self.default_threads)
+
+    def govern(self, model, path):
+        """Wrap an in-process model so its calls run under the budget."""
+        if not Config.CPU_GOVERNOR:
+            return model
+        name = os.path.splitext(os.path.basename(path))[0]
+        logger.info(f"⚙️ [CPU] {name}: {self.threads_for(name)} torch thread(s)"
+                    + (f", pinned to cores {self.inference_cores}" if self.pin else ""))
+        return GovernedModel(model, name, self)
+
+    def apply(self, name):
+        """Set torch threads (and pinning) for model `name` in the calling thread."""
+        threads = self.threads_for(name)
+        if getattr(self.local, "threads", None) == threads:
+            return
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            return
+        if self.pin and not getattr(self.local, "pinned", False):
+            self.local.pinned = pin_current_thread(self.inference_cores)
+        self.local.threads = threads
+        with self.lock:
+            self.applied[threading.current_thread().name] = (name, threads)
+
+    def worker_setup(self):
+        """Called at the start of an inference worker process."""
+        if Config.CPU_GOVERNOR and self.pin:
+            pin_current_process(self.inference_cores)
+
+    def _sample(self):
+        """CPU seconds per subsystem, plus the process total."""
+        now = time.monotonic()
+        if psutil is None:
+            return now, {}, time.process_time()
+
+        names = {t.native_id: t.name for t in threading.enumerate()}
+        usage = {}
+        total = 0.0
+        for t in psutil.Process().threads():
+            cpu = t.user_time + t.system_time
+            total += cpu
+            name = names.get(t.id)
+            # Threads Python doesn't know are torch/OpenMP, OpenCV and driver pools
+            subsystem = subsystem_of(name) if name else "native"
+            usage[subsystem] = usage.get(subsystem, 0.0) + cpu
+        return now, usage, total
+
+    def get_status(self):
+        now, usage, total = self._sample()
+        with self.lock:
+            previous, self.last_sample = self.last_sample, (now, usage, total)
+            applied = dict(self.applied)
+
+        status = {
+            "enabled": Config.CPU_GOVERNOR,
+            "cores": self.cores,
+            "reserved_cores": list(range(self.reserved)),
+            "inference_cores": self.inference_cores,
+            "pinned": self.pin,
+            "torch_threads": {"default": self.default_threads, **self.budget},
+            "applied": {thread: {"model": m, "torch_threads": n} for thread, (m, n) in applied.items()},
+            "per_thread_stats": psutil is not None,
+            "cpu_seconds": {k: round(v, 2) for k, v in sorted(usage.items())},
+            "cpu_seconds_total": round(total, 2),
+        }
+        # Percent of one core since the previous poll
+        if previous is not None and now - previous[0] > 0.1:
+            elapsed = now - previous[0]
+            status["interval_s"] = round(elapsed, 2)
+            status["cpu_percent"] = {
+                k: round(max(0.0, v - previous[1].get(k, 0.0)) / elapsed * 100.0, 1)
+                for k, v in sorted(usage.items())
+            }
+            status["cpu_percent_total"] = round(max(0.0, total - previous[2]) / elapsed * 100.0, 1)
+        return status
+
+
+resource_governor = ResourceGovernor()
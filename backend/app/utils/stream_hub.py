@@ -0,0 +1,360 @@
+"""
+MJPEG Stream Hub
+Encodes each published frame at most once and fans the JPEG bytes out to every viewer.
+
+Before this, /api/bp/video_feed re-encoded bp_sensor.latest_frame in a tight loop per
+viewer (no sleep while a frame existed), and the clearance stream re-encoded at 20 FPS
+per client even when the frame had not changed.
+
+- Producers call stream.publish(frame, trace, tracer) once per new frame (cheap: no encoding)
+- Viewers block on a condition variable until a newer sequence number arrives
+- The first viewer that needs a sequence number encodes it; the rest reuse the bytes
+- Frames nobody asked for are never encoded (no viewers = no encode cost)
+- Concurrent viewers per stream are capped (open_viewer() returns None when full)
+- Viewers may ask for a smaller width / lower quality (or adaptive=True to follow their
+  drain rate); each (width, quality) variant is also encoded once per frame and shared
+- watched() tells producers whether anyone is looking, so they can skip drawing entirely
+- Encoding goes through jpeg_encoder (fastest available backend on the host)
+
+Published frames must not be modified afterwards (publish a frame the loop no longer draws on).
+"""
+
+import threading
+import time
+import logging
+
+import cv2
+
+from app.config import Config
+from app.utils.frame_trace import LatencyHistogram
+from app.utils.jpeg_encoder import jpeg_encoder
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+# Preview variants are snapped to these steps so clients asking for similar sizes share one encode
+VARIANT_WIDTHS = (240, 320, 480, 640)
+QUALITY_STEP = 5
+# Adaptive clients walk down this ladder when they drain frames too slowly (None = stream default)
+ADAPTIVE_LADDER = [(None, None), (640, 80), (480, 70), (320, 60), (240, 50)]
+
+
+def snap_width(width):
+    """Smallest VARIANT_WIDTHS step >= width; None (full size) for no/large widths."""
+    if not width:
+        return None
+    for step in VARIANT_WIDTHS:
+        if width <= step:
+            return step
+    return None
+
+
+def snap_quality(quality):
+    if not quality:
+        return None
+    return int(min(95, max(30, round(quality / QUALITY_STEP) * QUALITY_STEP)))
+
+
+def viewer_options(args):
+    """open_viewer() keyword arguments from request args: ?width=480&quality=70&adaptive=1"""
+    return {
+        "width": args.get('width', type=int),
+        "quality": args.get('quality', type=int),
+        "adaptive": args.get('adaptive', '0') in ('1', 'true', 'yes'),
+    }
+
+
+class MjpegStream:
+    def __init__(self, name, max_viewers=4, jpeg_quality=95):
+        self.name = name
+        self.max_viewers = max_viewers
+        self.jpeg_quality = jpeg_quality
+
+        self.cond = threading.Condition()
+        self.encode_lock = threading.Lock()   # Guards variant_locks
+        self.variant_locks = {}
+        self.seq = 0
+        self.frame = None
+        self.trace = None
+        self.tracer = None     # FrameTracer of the current frame: records 'stream' visibility
+        self.variants = {}     # (width, quality) -> (seq, bytes) of the last encode
+        self.variant_encodes = {}
+        self.last_encoded_seq = 0
+        self.viewers = 0
+        self.last_pull = 0.0    # monotonic time of the last latest_jpeg() (polling clients)
+        self.epoch = 0          # Bumped by end() so connected viewers leave
+        self.watchers = 0       # Other consumers of the raw frames (fMP4 viewers)
+
+        self.encode_hist = LatencyHistogram()
+        self.stats = {"published": 0, "frames_encoded": 0, "encoded": 0, "served": 0, "bytes_out": 0,
+                      "rejected": 0, "downgrades": 0, "upgrades": 0}
+
+    # ---------- producer side ----------
+
+    def publish(self, frame, trace=None, tracer=None):
+        with self.cond:
+            self.seq += 1
+            self.frame = frame
+            self.trace = trace
+            self.tracer = tracer
+            self.stats["published"] += 1
+            self.cond.notify_all()
+
+    def end(self):
+        """Wake every viewer and make their generators return (session over)."""
+        with self.cond:
+            self.epoch += 1
+            self.cond.notify_all()
+
+    # ---------- encoding ----------
+
+    def _encode(self, seq, frame, width=None, quality=None):
+        """
+        Encode `frame` (sequence `seq`) as the (width, quality) variant unless another viewer
+        already did. Returns (seq, bytes) or None.
+        """
+        if width is not None and frame.shape[1] <= width:
+            width = None  # Already that small: share the full-size encode
+        key = (width, quality or self.jpeg_quality)
+        with self.encode_lock:
+            lock = self.variant_locks.setdefault(key, threading.Lock())
+        with lock:
+            cached = self.variants.get(key)
+            if cached is not None and cached[0] >= seq:
+                return cached
+            start = time.perf_counter()
+            image = frame
+            if width is not None and frame.shape[1] > width:
+                height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+                image = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            data = jpeg_encoder.encode(image, key[1])
+            if data is None:
+                return cached
+            self.encode_hist.add((time.perf_counter() - start) * 1000.0)
+            encoded = (seq, data)
+            self.variants[key] = encoded
+            with self.cond:
+                self.stats["encoded"] += 1
+                self.variant_encodes[key] = self.variant_encodes.get(key, 0) + 1
+                if seq > self.last_encoded_seq:
+                    self.last_encoded_seq = seq
+                    self.stats["frames_encoded"] += 1
+            return encoded
+
+    def latest_jpeg(self, width=None, quality=None):
+        """JPEG bytes of the newest frame (encoded once, shared with the stream)."""
+        with self.cond:
+            self.last_pull = time.monotonic()
+            seq, frame, trace, tracer = self.seq, self.frame, self.trace, self.tracer
+        if frame is None:
+            return None
+        encoded = self._encode(seq, frame, snap_width(width), snap_quality(quality))
+        if encoded is None:
+            return None
+        if tracer is not None:
+            tracer.visible(trace, "stream")
+        return encoded[1]
+
+    def peek_frame(self):
+        """(seq, frame) of the newest raw frame, for other encoders (counts as a poll for watched())."""
+        with self.cond:
+            self.last_pull = time.monotonic()
+            return self.seq, self.frame
+
+    def wait_frame(self, after_seq, timeout):
+        """(seq, frame) of the first frame newer than `after_seq`, or (seq, None) after `timeout` s."""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.seq <= after_seq or self.frame is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self.seq, None
+                self.cond.wait(remaining)
+            return self.seq, self.frame
+
+    def add_watcher(self, delta):
+        """Register (+1) / unregister (-1) a raw-frame consumer, so producers keep publishing."""
+        with self.cond:
+            self.watchers = max(0, self.watchers + delta)
+
+    def watched(self, poll_grace=2.0):
+        """True while a viewer / watcher is connected or latest_jpeg() was polled recently."""
+        return self.viewers > 0 or self.watchers > 0 or time.monotonic() - self.last_pull < poll_grace
+
+    # ---------- viewer side ----------
+
+    def open_viewer(self, keep_alive=None, width=None, quality=None, adaptive=False):
+        """
+        Reserve a viewer slot. Returns an iterator of multipart chunks, or None if full.
+        keep_alive() is checked whenever no frame arrives for a second; False ends the stream.
+
+        width/quality pick a fixed preview variant (snapped to shared steps); adaptive=True
+        starts there and moves along ADAPTIVE_LADDER as the client drains frames slower/faster.
+        """
+        with self.cond:
+            if self.viewers >= self.max_viewers:
+                self.stats["rejected"] += 1
+                logger.warning(f"📺 [Stream:{self.name}] Viewer limit ({self.max_viewers}) reached")
+                return None
+            self.viewers += 1
+            epoch = self.epoch
+        variant = (snap_width(width), snap_quality(quality))
+        return _Viewer(self, self._frames(epoch, keep_alive, variant, adaptive))
+
+    def _release_viewer(self):
+        with self.cond:
+            self.viewers -= 1
+
+    def _frames(self, epoch, keep_alive, variant, adaptive, timeout=1.0):
+        last_seq = 0
+        level = _AdaptiveLevel(self, variant) if adaptive else None
+        while True:
+            with self.cond:
+                while self.seq <= last_seq and self.epoch == epoch:
+                    if not self.cond.wait(timeout) and keep_alive is not None and not keep_alive():
+                        return
+                if self.epoch != epoch:
+                    return
+                seq, frame, trace, tracer = self.seq, self.frame, self.trace, self.tracer
+            if frame is None:
+                last_seq = seq
+                continue
+
+            width, quality = level.variant if level is not None else variant
+            encoded = self._encode(seq, frame, width, quality)
+            if encoded is None:
+                last_seq = seq
+                continue
+            last_seq = encoded[0]
+            if tracer is not None:
+                tracer.visible(trace, "stream")
+            with self.cond:
+                self.stats["served"] += 1
+                self.stats["bytes_out"] += len(encoded[1])
+            sent = time.perf_counter()
+            yield BOUNDARY + encoded[1] + b'\r\n'
+            # The server resumes us once the chunk is written: a slow resume means a slow client
+            if level is not None:
+                level.observe(time.perf_counter() - sent)
+
+    def get_status(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats["viewers"] = self.viewers
+            stats["max_viewers"] = self.max_viewers
+            stats["seq"] = self.seq
+            stats["variants"] = {f"{w or 'full'}@q{q}": n for (w, q), n in self.variant_encodes.items()}
+        # Frames published while nobody was watching (or superseded before a viewer got to them)
+        stats["skipped"] = stats["published"] - stats["frames_encoded"]
+        stats["fanout"] = round(stats["served"] / stats["encoded"], 2) if stats["encoded"] else None
+        stats["encode_ms"] = self.encode_hist.snapshot()
+        return stats
+
+
+class _AdaptiveLevel:
+    """Per-viewer position on ADAPTIVE_LADDER, driven by how long each chunk takes to drain."""
+    SLOW_S = 0.15       # A chunk that takes this long to drain means the link is saturated
+    FAST_S = 0.03
+    SLOW_FRAMES = 3     # Consecutive slow frames before stepping down
+    FAST_FRAMES = 30    # Consecutive fast frames before stepping back up
+
+    def __init__(self, stream, variant):
+        self.stream = stream
+        width, quality = variant
+        # Start at the requested variant's rung (or the top) and never go above it
+        self.top = 0
+        for i, (w, q) in enumerate(ADAPTIVE_LADDER):
+            if (width is None or (w is not None and w <= width)) and (quality is None or (q is not None and q <= quality)):
+                self.top = i
+                break
+        self.index = self.top
+        self.slow = 0
+        self.fast = 0
+
+    @property
+    def variant(self):
+        return ADAPTIVE_LADDER[self.index]
+
+    def observe(self, drain_s):
+        if drain_s > self.SLOW_S:
+            self.slow, self.fast = self.slow + 1, 0
+        elif drain_s < self.FAST_S:
+            self.slow, self.fast = 0, self.fast + 1
+        else:
+            self.slow = self.fast = 0
+
+        if self.slow >= self.SLOW_FRAMES and self.index < len(ADAPTIVE_LADDER) - 1:
+            self._move(1, "downgrades")
+        elif self.fast >= self.FAST_FRAMES and self.index > self.top:
+            self._move(-1, "upgrades")
+
+    def _move(self, step, stat):
+        self.index += step
+        self.slow = self.fast = 0
+        with self.stream.cond:
+            self.stream.stats[stat] += 1
+        width, quality = self.variant
+        logger.info(f"📺 [Stream:{self.stream.name}] Client {stat[:-1]} -> {width or 'full'} px, q{quality or self.stream.jpeg_quality}")
+
+
+class _Viewer:
+    """Response iterable that frees its viewer slot on close() (WSGI calls it on disconnect)."""
+
+    def __init__(self, stream, frames):
+        self.stream = stream
+        self.frames = frames
+        self.released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.frames)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        self.frames.close()
+        if not self.released:
+            self.released = True
+            self.stream._release_viewer()
+
+
+class StreamHub:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.streams = {}
+
+    def stream(self, name):
+        """Get or create the named stream."""
+        with self.lock:
+            stream = self.streams.get(name)
+            if stream is None:
+                stream = MjpegStream(name, max_viewers=Config.STREAM_MAX_VIEWERS,
+                                     jpeg_quality=Config.STREAM_JPEG_QUALITY)
+                self.streams[name] = stream
+            return stream
+
+    def get_status(self):
+        with self.lock:
+            streams = dict(self.streams)
+        status = {name: stream.get_status() for name, stream in streams.items()}
+        status["jpeg_encoder"] = jpeg_encoder.get_status()
+        return status
+
+
+stream_hub = StreamHub()
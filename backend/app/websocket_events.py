@@ -182,3 +182,16 @@ def broadcast_to_all(event_type, data):
     
     socketio.emit('data_update', event_data)
     logger.info(f"📡 Broadcast to all: {event_type}")
+
+
+def broadcast_clearance_event(event):
+    """
+    Broadcast a clearance stage decision ("cleared" / "violation")
+    Sent to all clients: the kiosk's Clearance page reacts instead of debouncing polls
+    """
+    global socketio
+    if not socketio:
+        return
+    
+    socketio.emit('clearance_event', event)
+    logger.info(f"📡 Broadcast: clearance_event {event.get('stage')} -> {event.get('event')}")
@@ -0,0 +1,156 @@
+"""
+Replay benchmark: legacy "unchanged for 2.0 s" rule vs. TemporalDigitVoter.
+
+Replays recorded BP sessions (vision harness) through both confirmation rules and
+reports median time-to-confirmation, misreads against the recorded truth, and
+timeouts. Each session's per-frame sys/dia strings and confidences come from
+<session>/readings.jsonl; sessions without it are replayed through the BP model first
+(needs ultralytics and bp.pt) and the readings saved for the next run.
+
+Both rules see frames the way _parse_digits does: single-row frames (inflation, or a
+result frame that lost its dia row) never confirm, the legacy rule ignores them, the
+voter keeps its evidence, and the 888 startup screen starts a new measurement. Time
+to confirmation is counted from the first two-row frame.
+
+Without sessions, synthetic result screens (flickering digits, dropped digits,
+uncalibrated confidences) are generated instead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bp_consensus sessions/bp_*
+    python -m benchmarks.bench_bp_consensus            # synthetic fallback
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.bp_consensus import TemporalDigitVoter
+from benchmarks import vision_harness
+
+FRAME_DT = 0.08     # ~12 FPS effective (50 ms sleep + inference)
+TIMEOUT = 15.0
+
+
+def synth_frame(rng, sys_true, dia_true, flicker, drop):
+    """One noisy frame of the result screen: (sys, dia, sys_conf, dia_conf)."""
+    out = []
+    for row in (sys_true, dia_true):
+        digits, confs = [], []
+        for ch in row:
+            if rng.random() < drop:
+                continue
+            if rng.random() < flicker:
+                digits.append(str(rng.choice([d for d in range(10) if str(d) != ch])))
+                confs.append(rng.uniform(0.25, 0.7))
+            else:
+                digits.append(ch)
+                confs.append(rng.uniform(0.45, 0.95))
+        out.append(("".join(digits), confs))
+    return out[0][0], out[1][0], out[0][1], out[1][1]
+
+
+def synthetic_sessions(rng, flicker, drop, count=300):
+    sessions = []
+    for _ in range(count):
+        sys_true = str(rng.randint(95, 170))
+        dia_true = str(rng.randint(55, 99))
+        frames = []
+        for i in range(int(TIMEOUT / FRAME_DT)):
+            s, d, sc, dc = synth_frame(rng, sys_true, dia_true, flicker, drop)
+            frames.append((i * FRAME_DT, bool(s and d), s, d, sc, dc))
+        sessions.append(((sys_true, dia_true), frames))
+    return sessions
+
+
+def recorded_session(session_dir):
+    """((sys, dia) truth or None, frames) from a vision harness BP session."""
+    meta, frame_times, truth = vision_harness.load_session(session_dir)
+    if meta["kind"] != "bp":
+        return None
+    readings = vision_harness.load_readings(session_dir)
+    if readings is None:
+        print(f"  {session_dir}: no {vision_harness.READINGS_NAME}, replaying through the BP model")
+        readings = []
+        vision_harness.replay_bp(session_dir, frame_times, truth, readings)
+        vision_harness.save_readings(session_dir, readings)
+    frames = [(r["t"], r["two_rows"], r["sys"], r["dia"], r["sys_conf"], r["dia_conf"]) for r in readings]
+    return ((truth["sys"], truth["dia"]) if truth else None), frames
+
+
+def is_startup(s):
+    return len(s) >= 2 and set(s) == {"8"}
+
+
+def run_legacy(frames):
+    last, start, first = None, 0.0, None
+    for t, two_rows, s, d, _, _ in frames:
+        if not two_rows:
+            continue
+        first = t if first is None else first
+        if (s, d) != last:
+            last, start = (s, d), t
+            continue
+        if t - start >= 2.0:
+            return t - first, s, d
+    return None, None, None
+
+
+def run_voter(frames):
+    voter = TemporalDigitVoter()
+    first = None
+    for t, two_rows, s, d, sc, dc in frames:
+        if is_startup(s) or is_startup(d):
+            voter.reset()
+            continue
+        if not two_rows:
+            continue
+        first = t if first is None else first
+        voter.update(s, d, sc, dc, now=t)
+        res = voter.result()
+        if res["confirmed"]:
+            return t - first, res["sys"], res["dia"]
+    return None, None, None
+
+
+def evaluate(name, runner, sessions):
+    times, misreads, timeouts = [], 0, 0
+    for truth, frames in sessions:
+        t, s, d = runner(frames)
+        if t is None:
+            timeouts += 1
+            continue
+        times.append(t)
+        if truth is not None and (s, d) != truth:
+            misreads += 1
+    median = statistics.median(times) if times else float('nan')
+    print(f"  {name:<8} median {median:5.2f}s | misreads {misreads:3d} | timeouts {timeouts:3d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sessions", nargs="*", help="vision harness BP session folders")
+    args = parser.parse_args()
+
+    if args.sessions:
+        sessions = [s for s in map(recorded_session, args.sessions) if s is not None]
+        if not sessions:
+            sys.exit("No BP sessions among the given folders")
+        print(f"recorded sessions ({len(sessions)}, {sum(truth is not None for truth, _ in sessions)} with truth)")
+        evaluate("legacy", run_legacy, sessions)
+        evaluate("voter", run_voter, sessions)
+        return
+
+    print("No sessions given: synthetic result screens\n")
+    rng = random.Random(0)
+    for flicker, drop in ((0.005, 0.0), (0.02, 0.0), (0.08, 0.02), (0.15, 0.05)):
+        sessions = synthetic_sessions(rng, flicker, drop)
+        print(f"flicker={flicker:.3f} drop={drop:.2f} ({len(sessions)} sessions)")
+        evaluate("legacy", run_legacy, sessions)
+        evaluate("voter", run_voter, sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: legacy dict-based NMS/row split vs. the NumPy DigitAssembler.
+
+Generates synthetic BP monitor detections (two rows of 2-3 digits, plus duplicate
+boxes the way YOLO emits them at conf=0.25) and times both paths.
+
+Usage (from backend/):
+    python -m benchmarks.bench_digit_assembly
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.digit_assembly import DigitAssembler
+
+
+def make_detections(rng, n_total, tilt=0.05, scale=1.0):
+    """Two display rows (systolic 3 digits, diastolic 2 digits) + noisy duplicates up to n_total."""
+    digit_w, digit_h = 40 * scale, 70 * scale
+    base = []
+    for row, count, y in ((0, 3, 150), (1, 2, 260)):
+        for k in range(count):
+            x = 120 + k * 50 * scale
+            cy = y * scale + tilt * x
+            base.append((x, cy))
+    base = np.array(base)
+
+    picks = rng.integers(0, len(base), size=max(n_total - len(base), 0))
+    centers = np.vstack([base, base[picks] + rng.normal(0, 3, size=(len(picks), 2))])
+    boxes = np.column_stack([
+        centers[:, 0] - digit_w / 2, centers[:, 1] - digit_h / 2,
+        centers[:, 0] + digit_w / 2, centers[:, 1] + digit_h / 2,
+    ])
+    scores = rng.uniform(0.25, 0.95, size=len(boxes))
+    digits = rng.integers(0, 10, size=len(boxes))
+    return boxes, scores, digits
+
+
+def legacy_assemble(boxes, scores, digits):
+    """The previous _run_detection/_parse_digits logic, kept here for comparison."""
+    raw = [{"label": str(int(d)), "conf": float(s), "box": [int(v) for v in b]}
+           for b, s, d in zip(boxes, scores, digits)]
+    raw.sort(key=lambda x: x['conf'], reverse=True)
+
+    def iou(a, b):
+        xA, yA = max(a[0], b[0]), max(a[1], b[1])
+        xB, yB = min(a[2], b[2]), min(a[3], b[3])
+        inter = max(0, xB - xA) * max(0, yB - yA)
+        area_a = (a[2] - a[0]) * (a[3] - a[1])
+        area_b = (b[2] - b[0]) * (b[3] - b[1])
+        return inter / float(area_a + area_b - inter)
+
+    kept = []
+    for det in raw:
+        if not any(iou(det['box'], k['box']) > 0.4 for k in kept):
+            kept.append(det)
+
+    digits_out = [{"val": d['label'], "cx": (d['box'][0] + d['box'][2]) / 2,
+                   "cy": (d['box'][1] + d['box'][3]) / 2} for d in kept]
+    min_y = min(d['cy'] for d in digits_out)
+    max_y = max(d['cy'] for d in digits_out)
+    if max_y - min_y < 50:
+        digits_out.sort(key=lambda k: k['cx'])
+        return "".join(d['val'] for d in digits_out), ""
+    mid_y = (min_y + max_y) / 2
+    top = sorted([d for d in digits_out if d['cy'] < mid_y], key=lambda k: k['cx'])
+    bottom = sorted([d for d in digits_out if d['cy'] >= mid_y], key=lambda k: k['cx'])
+    return "".join(d['val'] for d in top), "".join(d['val'] for d in bottom)
+
+
+def bench(fn, cases, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            fn(*case)
+    return (time.perf_counter() - start) / (repeat * len(cases)) * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    assembler = DigitAssembler()
+    print(f"{'detections':>10} | {'legacy (us)':>12} | {'numpy (us)':>11} | speedup")
+    print("-" * 52)
+    for n in (5, 10, 20, 40, 80):
+        cases = [make_detections(rng, n) for _ in range(50)]
+        legacy_us = bench(legacy_assemble, cases, 20)
+        numpy_us = bench(assembler.assemble, cases, 20)
+        print(f"{n:>10} | {legacy_us:>12.1f} | {numpy_us:>11.1f} | {legacy_us / numpy_us:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
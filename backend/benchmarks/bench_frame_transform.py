@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: step-by-step frame geometry + copies vs. the single-pass FrameTransform.
+
+For the BP loop (rotate -> square crop -> zoom -> clean/annotated copies) and the
+clearance feet loop (rotate -> zoom -> square crop -> resize 480), reports per frame:
+    time        mean wall time
+    alloc_kb    transient memory (tracemalloc peak above the pre-frame level; NumPy and
+                OpenCV output arrays are allocated through NumPy and show up here)
+    max_diff    largest pixel difference between the two outputs
+
+Usage (from backend/):
+    python -m benchmarks.bench_frame_transform [--frames 300] [--width 640 --height 480]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.frame_transform import FrameTransform, BufferRing
+
+
+def legacy_bp(frame, rotation=0, square_crop=True, zoom=1.4):
+    """The previous BPSensorController._apply_zoom plus the two per-frame copies."""
+    if rotation == 90:
+        frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+    elif rotation == 180:
+        frame = cv2.rotate(frame, cv2.ROTATE_180)
+    elif rotation == 270:
+        frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    h, w = frame.shape[:2]
+    if square_crop:
+        size = min(h, w)
+        x1, y1 = (w - size) // 2, (h - size) // 2
+        frame = frame[y1:y1 + size, x1:x1 + size]
+        h, w = frame.shape[:2]
+    if zoom > 1.0:
+        new_w, new_h = int(w / zoom), int(h / zoom)
+        x1, y1 = (w - new_w) // 2, (h - new_h) // 2
+        frame = cv2.resize(frame[y1:y1 + new_h, x1:x1 + new_w], (w, h))
+    clean = frame.copy()
+    annotated = frame.copy()
+    return clean, annotated
+
+
+def legacy_feet(frame):
+    """The previous ClearanceManager._prepare_frame for the feet stage."""
+    frame = cv2.rotate(frame, cv2.ROTATE_180)
+    h, w = frame.shape[:2]
+    new_w, new_h = int(w / 1.4), int(h / 1.4)
+    x1, y1 = (w - new_w) // 2, (h - new_h) // 2
+    frame = cv2.resize(frame[y1:y1 + new_h, x1:x1 + new_w], (w, h))
+    size = min(h, w)
+    x1, y1 = (w - size) // 2, (h - size) // 2
+    return cv2.resize(frame[y1:y1 + size, x1:x1 + size], (480, 480))
+
+
+def measure(fn, frames):
+    fn(frames[0])  # Warm-up: first call builds matrices / allocates ring buffers
+    tracemalloc.start()
+    alloc = []
+    start = time.perf_counter()
+    for frame in frames:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(frame)
+        alloc.append(tracemalloc.get_traced_memory()[1] - before)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return elapsed / len(frames) * 1000.0, float(np.mean(alloc)) / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pool = [cv2.GaussianBlur(rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8), (5, 5), 0)
+            for _ in range(8)]
+    frames = [pool[i % len(pool)] for i in range(args.frames)]
+
+    bp_transform = FrameTransform(zoom=1.4)
+    overlay = BufferRing()
+
+    def new_bp(frame):
+        clean = bp_transform.apply(frame)
+        return clean, overlay.copy(clean)
+
+    feet_transform = FrameTransform(rotation=180, zoom=1.4, zoom_first=True, output_size=480)
+
+    cases = [
+        ("bp (zoom 1.4 + copies)", legacy_bp, new_bp, lambda a, b: (a[0], b[0])),
+        ("clearance feet", legacy_feet, feet_transform.apply, lambda a, b: (a, b)),
+    ]
+
+    print(f"{args.frames} frames of {args.width}x{args.height}\n")
+    print(f"{'pipeline':<24} | {'legacy ms':>9} | {'new ms':>7} | {'legacy KB':>9} | {'new KB':>7} | {'max_diff':>8}")
+    print("-" * 80)
+    for name, legacy_fn, new_fn, pick in cases:
+        legacy_ms, legacy_kb = measure(legacy_fn, frames)
+        new_ms, new_kb = measure(new_fn, frames)
+        a, b = pick(legacy_fn(frames[0]), new_fn(frames[0]))
+        diff = int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+        print(f"{name:<24} | {legacy_ms:>9.3f} | {new_ms:>7.3f} | {legacy_kb:>9.1f} | {new_kb:>7.1f} | {diff:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: single-image YOLO calls vs. one batched forward pass, batch sizes 1-4.
+
+For each model, N frames are run either as N separate model(frame) calls or as one
+model([frames]) call. Reported per batch size:
+    single ms / batch ms    wall time for all N frames
+    single fps / batch fps  frames per second
+    latency +ms             extra time the first frame waits for its result when batched
+                            (batch time - one single call), not counting the batch window
+
+Then the BatchedModel scheduler is run with N concurrent "camera" threads to show the
+batch sizes it actually forms and the queue wait it adds.
+
+Needs ultralytics and the model files in ai_camera/models. Usage (from backend/):
+    python -m benchmarks.bench_inference_batching [--iters 20] [--window 15] [--seconds 10]
+
+--synthetic runs only the scheduler part against a stand-in model whose forward pass
+takes BASE + PER * n ms for n frames, one pass at a time (a CPU already saturated by
+one forward). It measures the scheduler's own cost without ultralytics:
+    python -m benchmarks.bench_inference_batching --synthetic 40 12
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.sensors.inference_batcher import BatchedModel
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ai_camera', 'models')
+MODELS = {"feet": "weight.pt", "body": "wearables.pt", "bp": "bp.pt"}
+
+
+def timed(fn, iters):
+    samples = []
+    for _ in range(iters):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(samples))
+
+
+class SyntheticModel:
+    """Stand-in for a YOLO model: fixed + per-frame cost, one forward pass at a time."""
+
+    def __init__(self, base_ms, per_frame_ms):
+        self.base = base_ms / 1000.0
+        self.per_frame = per_frame_ms / 1000.0
+        self.lock = threading.Lock()
+
+    def __call__(self, frames, **kwargs):
+        frames = frames if isinstance(frames, list) else [frames]
+        with self.lock:
+            time.sleep(self.base + self.per_frame * len(frames))
+        return [None] * len(frames)
+
+
+def bench_sizes(name, model, frames, iters):
+    model(frames[0], verbose=False)  # Warm-up
+    model(frames[:4], verbose=False)
+    single_ms = timed(lambda: model(frames[0], verbose=False), iters)
+    for n in range(1, 5):
+        sequential = timed(lambda: [model(f, verbose=False) for f in frames[:n]], iters)
+        batched = timed(lambda: model(frames[:n], verbose=False), iters)
+        print(f"{name:<6} | {n:>5} | {sequential:>9.1f} | {batched:>8.1f} | "
+              f"{n * 1000.0 / sequential:>10.1f} | {n * 1000.0 / batched:>9.1f} | {batched - single_ms:>+10.1f}")
+
+
+def run_cameras(model, frames, cameras, seconds):
+    """N threads calling `model` back to back; returns (fps, median call ms)."""
+    stop = threading.Event()
+    latencies = []
+
+    def camera(i):
+        while not stop.is_set():
+            start = time.perf_counter()
+            model(frames[i % len(frames)], verbose=False)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    threads = [threading.Thread(target=camera, args=(i,), daemon=True) for i in range(cameras)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join(timeout=10)
+    return len(latencies) / seconds, float(np.median(latencies))
+
+
+def bench_direct(name, model, frames, cameras, seconds):
+    fps, call_ms = run_cameras(model, frames, cameras, seconds)
+    print(f"{name:<6} | {cameras:>7} | {fps:>6.1f} | {call_ms:>8.1f} | {'-':>6} | {'-':>10} | {'-':>8} | {'-':>11}")
+
+
+def bench_scheduler(name, model, frames, cameras, window_ms, seconds):
+    batched = BatchedModel(model, name, window_ms=window_ms, max_batch=4)
+    fps, call_ms = run_cameras(batched, frames, cameras, seconds)
+    status = batched.get_status()
+    print(f"{name:<6} | {cameras:>7} | {fps:>6.1f} | {call_ms:>8.1f} | "
+          f"{status['direct_calls']:>6} | {status['mean_batch']!s:>10} | {status['queue_wait_ms']['p50_ms']!s:>8} | "
+          f"{status['forward_ms']['p50_ms']!s:>11}")
+
+
+def print_scheduler_header(window_ms, seconds):
+    print(f"\nBatchedModel, window {window_ms:.0f} ms, {seconds:.0f}s per run\n")
+    print(f"{'model':<6} | {'cameras':>7} | {'fps':>6} | {'call p50':>8} | {'direct':>6} | {'mean batch':>10} | "
+          f"{'wait p50':>8} | {'forward p50':>11}")
+    print("-" * 84)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--window", type=float, default=15.0, help="batch window (ms) for the scheduler run")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each scheduler run")
+    parser.add_argument("--synthetic", type=float, nargs=2, metavar=("BASE", "PER"),
+                        help="scheduler only, stand-in model costing BASE + PER * n ms")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (480, 480, 3), dtype=np.uint8) for _ in range(4)]
+
+    if args.synthetic:
+        print_scheduler_header(args.window, args.seconds)
+        for cameras in range(1, 5):
+            bench_direct("plain", SyntheticModel(*args.synthetic), frames, cameras, args.seconds)
+            bench_scheduler("synth", SyntheticModel(*args.synthetic), frames, cameras, args.window, args.seconds)
+        return
+
+    from app.sensors.inference_workers import _load_model
+
+    paths = {name: os.path.join(MODELS_DIR, f) for name, f in MODELS.items()}
+    paths = {name: p for name, p in paths.items() if os.path.exists(p)}
+    if not paths:
+        sys.exit(f"No models found in {MODELS_DIR}")
+
+    models = {name: _load_model(p) for name, p in paths.items()}
+
+    print(f"{'model':<6} | {'batch':>5} | {'single ms':>9} | {'batch ms':>8} | {'single fps':>10} | "
+          f"{'batch fps':>9} | {'latency +ms':>10}")
+    print("-" * 80)
+    for name, model in models.items():
+        bench_sizes(name, model, frames, args.iters)
+
+    print_scheduler_header(args.window, args.seconds)
+    for name, model in models.items():
+        for cameras in range(1, 5):
+            bench_direct("plain", model, frames, cameras, args.seconds)
+            bench_scheduler(name, model, frames, cameras, args.window, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: in-process YOLO vs. the multi-process InferencePool under kiosk-like load.
+
+Runs one thread per camera loop (feet, body, bp) calling its model on 480x480 frames as
+fast as it can, while an "API" probe thread does a small amount of Python work every
+10 ms (standing in for Flask handlers / serial listeners) and records how late it runs.
+
+Reported per mode:
+    fps per model and total     inference throughput
+    api_lag p50/p99 (ms)        extra delay of the probe (GIL / CPU contention)
+
+Needs ultralytics and the model files in ai_camera/models. Usage (from backend/):
+    python -m benchmarks.bench_inference_workers [--seconds 20] [--workers 2] [--threads 2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.sensors.inference_workers import inference_pool, RemoteModel, _load_model
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ai_camera', 'models')
+MODELS = {"feet": "weight.pt", "body": "wearables.pt", "bp": "bp.pt"}
+
+
+def api_probe(stop, lags, period=0.010):
+    """Wake every `period`, do ~0.2 ms of Python work, record how late the wake-up was."""
+    next_t = time.perf_counter() + period
+    while not stop.is_set():
+        time.sleep(max(0.0, next_t - time.perf_counter()))
+        lags.append((time.perf_counter() - next_t) * 1000.0)
+        sum(i * i for i in range(2000))
+        next_t += period
+
+
+def camera_loop(model, stop, counts, name):
+    rng = np.random.default_rng(hash(name) % 2**32)
+    frames = [rng.integers(0, 255, (480, 480, 3), dtype=np.uint8) for _ in range(4)]
+    i = 0
+    while not stop.is_set():
+        model(frames[i % 4], verbose=False)
+        counts[name] += 1
+        i += 1
+
+
+def run_mode(label, models, seconds):
+    for model in models.values():  # Warm-up outside the timed window
+        model(np.zeros((480, 480, 3), np.uint8), verbose=False)
+
+    stop = threading.Event()
+    counts = {name: 0 for name in models}
+    lags = []
+    threads = [threading.Thread(target=camera_loop, args=(m, stop, counts, n), daemon=True) for n, m in models.items()]
+    threads.append(threading.Thread(target=api_probe, args=(stop, lags), daemon=True))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join(timeout=10)
+
+    fps = {name: count / seconds for name, count in counts.items()}
+    lags = np.asarray(lags) if lags else np.zeros(1)
+    print(f"{label:<22} | " + " | ".join(f"{fps[n]:>6.1f}" for n in models) +
+          f" | {sum(fps.values()):>6.1f} | {np.percentile(lags, 50):>7.2f} | {np.percentile(lags, 99):>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=2, help="torch threads per worker")
+    args = parser.parse_args()
+
+    paths = {name: os.path.join(MODELS_DIR, f) for name, f in MODELS.items()}
+    paths = {name: p for name, p in paths.items() if os.path.exists(p)}
+    if not paths:
+        sys.exit(f"No models found in {MODELS_DIR}")
+
+    print(f"{args.seconds:.0f}s per mode, models: {', '.join(paths)}\n")
+    print(f"{'mode':<22} | " + " | ".join(f"{n:>6}" for n in paths) + f" | {'total':>6} | {'lag p50':>7} | {'lag p99':>7}")
+    print("-" * (50 + 9 * len(paths)))
+
+    run_mode("in-process", {n: _load_model(p) for n, p in paths.items()}, args.seconds)
+
+    inference_pool.start(workers=args.workers, torch_threads=args.threads)
+    run_mode(f"pool {args.workers}x{args.threads} threads",
+             {n: RemoteModel(inference_pool, p) for n, p in paths.items()}, args.seconds)
+    print(f"\npool: {inference_pool.get_status()}")
+    inference_pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: JPEG encode time and size per backend and option, at the stream frame sizes.
+
+For 480x480 (clearance) and 640x480 (raw camera) frames, every available backend from
+app/utils/jpeg_encoder.py is run with 4:2:0 / 4:4:4 chroma subsampling and with the fast
+DCT on/off (where supported). Reported per row:
+    encode ms   median wall time per frame
+    KB          JPEG size per frame
+    Mbit/s      bandwidth per viewer at --fps
+
+Frames are smoothed noise by default; pass --image to use a real camera snapshot. Missing
+backends (pip install PyTurboJPEG / simplejpeg) are listed and skipped. Usage (from backend/):
+    python -m benchmarks.bench_jpeg_encoders [--rounds 100] [--quality 95 80] [--image snap.jpg]
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.jpeg_encoder import BACKENDS, calibration_frame, time_encoder
+
+SIZES = [(480, 480), (640, 480)]
+
+
+def frame_for(size, image):
+    width, height = size
+    if image is None:
+        return calibration_frame((height, width, 3))
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--quality", type=int, nargs="+", default=[95, 80])
+    parser.add_argument("--fps", type=float, default=20.0)
+    parser.add_argument("--image", help="camera snapshot to encode instead of synthetic frames")
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image) if args.image else None
+    if args.image and image is None:
+        sys.exit(f"Could not read {args.image}")
+
+    encoders = []
+    for name, cls in BACKENDS.items():
+        for subsampling in ("420", "444"):
+            for fast_dct in (False, True):
+                try:
+                    encoder = cls(subsampling=subsampling, fast_dct=fast_dct)
+                except Exception as e:
+                    if subsampling == "420" and not fast_dct:
+                        print(f"skipping {name}: {e}")
+                    break
+                if fast_dct and not encoder.fast_dct:
+                    continue  # Backend has no fast DCT option
+                encoders.append((f"{name} {subsampling}{' fastdct' if fast_dct else ''}", encoder))
+
+    print(f"\n{'size':<8} | {'q':>3} | {'backend':<24} | {'encode ms':>9} | {'KB':>7} | {'Mbit/s':>7}")
+    print("-" * 72)
+    for size in SIZES:
+        frame = frame_for(size, image)
+        for quality in args.quality:
+            rows = []
+            for label, encoder in encoders:
+                ms, nbytes = time_encoder(encoder, frame, quality, rounds=args.rounds)
+                rows.append((ms, label, nbytes))
+            for ms, label, nbytes in sorted(rows):
+                print(f"{size[0]}x{size[1]:<4} | {quality:>3} | {label:<24} | {ms:>9.3f} | "
+                      f"{nbytes / 1024.0:>7.1f} | {nbytes * 8 * args.fps / 1e6:>7.2f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: bandwidth and CPU of the H.264 fMP4 stream vs. MJPEG for the same frames.
+
+Synthetic camera frames (smoothed background, sensor noise, a moving object) are encoded
+at --fps for --seconds of video:
+    mjpeg q95 / q70     jpeg_encoder (stream default quality / a reduced preview quality)
+    fmp4 <bitrate>      the ffmpeg/libx264 command used by app/utils/mp4_stream.py
+
+Reported per row:
+    kbit/s      bandwidth per viewer
+    cpu %       encoder CPU as a share of one core at that frame rate
+                (MJPEG: this process; fMP4: the ffmpeg child process)
+
+Needs ffmpeg with libx264 on PATH (or --ffmpeg). Usage (from backend/):
+    python -m benchmarks.bench_mp4_vs_mjpeg [--seconds 20] [--fps 10] [--size 480] [--bitrate 300k]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.jpeg_encoder import jpeg_encoder
+from app.utils.mp4_stream import ffmpeg_command
+
+
+def make_frames(count, size, seed=0):
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (size, size, 3), dtype=np.uint8), (31, 31), 0)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        x = int((np.sin(i / 15.0) * 0.35 + 0.5) * size)
+        cv2.circle(frame, (x, size // 2), size // 8, (40, 200, 40), -1)
+        noise = rng.integers(-6, 7, frame.shape, dtype=np.int16)
+        frames.append(np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def bench_mjpeg(frames, quality, fps, seconds):
+    total = 0
+    start = time.process_time()
+    for frame in frames:
+        total += len(jpeg_encoder.encode(frame, quality))
+    cpu = time.process_time() - start
+    return total * 8 / seconds / 1000.0, cpu / seconds * 100.0
+
+
+def child_cpu_seconds():
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def bench_mp4(frames, fps, seconds, bitrate, ffmpeg):
+    size = frames[0].shape[1], frames[0].shape[0]
+    cpu_before = child_cpu_seconds()
+    proc = subprocess.Popen(ffmpeg_command(*size, fps, bitrate, ffmpeg=ffmpeg),
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    out = []
+    reader = threading.Thread(target=lambda: out.append(proc.stdout.read()), daemon=True)
+    reader.start()
+    for frame in frames:
+        proc.stdin.write(frame.tobytes())
+    proc.stdin.close()
+    reader.join()
+    proc.wait()
+    cpu = child_cpu_seconds() - cpu_before  # Unix only; 0 on Windows
+    total = len(out[0]) if out else 0
+    return total * 8 / seconds / 1000.0, cpu / seconds * 100.0 if cpu else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--size", type=int, default=480)
+    parser.add_argument("--bitrate", nargs="+", default=["300k", "600k"])
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    args = parser.parse_args()
+
+    frames = make_frames(int(args.seconds * args.fps), args.size)
+    print(f"{len(frames)} frames of {args.size}x{args.size} = {args.seconds:.0f}s at {args.fps} FPS "
+          f"(JPEG backend: {jpeg_encoder.get_backend().name})\n")
+    print(f"{'stream':<14} | {'kbit/s':>8} | {'cpu %':>6}")
+    print("-" * 34)
+    for quality in (95, 70):
+        kbps, cpu = bench_mjpeg(frames, quality, args.fps, args.seconds)
+        print(f"{f'mjpeg q{quality}':<14} | {kbps:>8.0f} | {cpu:>6.1f}")
+    for bitrate in args.bitrate:
+        try:
+            kbps, cpu = bench_mp4(frames, args.fps, args.seconds, bitrate, args.ffmpeg)
+        except OSError as e:
+            print(f"fmp4 {bitrate}: ffmpeg not available ({e})")
+            continue
+        print(f"{f'fmp4 {bitrate}':<14} | {kbps:>8.0f} | {cpu if cpu is not None else float('nan'):>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
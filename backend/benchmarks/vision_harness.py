@@ -0,0 +1,416 @@
+"""
+Recorded-Session Vision Harness
+Record camera sessions to disk and replay them offline through the BP and clearance models.
+
+A session is a folder:
+    <session>/video.avi      raw camera frames (MJPG, before any rotate/crop/zoom)
+    <session>/events.jsonl   one JSON object per line:
+        {"event": "session", "kind": "bp" | "feet" | "body", "camera_index": 0, "fps": 30}
+        {"event": "frame", "i": 0, "t": 0.000}
+        {"event": "truth", "sys": "120", "dia": "80"}                      (bp)
+        {"event": "truth", "is_compliant": true, "violations": []}         (feet/body)
+
+A BP replay can also save what the digit assembler read on every frame:
+    <session>/readings.jsonl  {"t": 12.34, "two_rows": true, "sys": "120", "dia": "80",
+                               "sys_conf": [...], "dia_conf": [...]}
+so result-confirmation rules can be compared on real sessions without the model
+(benchmarks/bench_bp_consensus.py).
+
+Replay pushes every frame through the same code the live loops use:
+    bp:        BPSensorController._apply_zoom -> _run_detection -> _parse_digits
+    feet/body: ClearanceManager._prepare_frame -> _detect -> k-of-n ComplianceVote
+               (time to the stable decision, and the frames the early exit skips)
+as fast as possible, with the controller clock driven by the recorded timestamps,
+so time-to-result is measured in session time while throughput is wall time.
+
+Usage (from backend/):
+    python -m benchmarks.vision_harness record sessions/bp_001 --kind bp --camera 0 --seconds 40 --truth 120/80
+    python -m benchmarks.vision_harness record sessions/feet_001 --kind feet --camera 2 --seconds 10 --truth compliant
+    python -m benchmarks.vision_harness replay sessions/bp_001 sessions/feet_001 [--json report.json] [--save-readings]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.config import Config
+
+Config.HARD_FRAMES_ENABLED = False  # Replays must not write harvested frames to disk
+
+VIDEO_NAME = "video.avi"
+EVENTS_NAME = "events.jsonl"
+READINGS_NAME = "readings.jsonl"
+
+
+# ==================== RECORDING ====================
+
+def parse_truth(kind, truth):
+    if truth is None:
+        return None
+    if kind == "bp":
+        sys_str, dia_str = truth.split("/")
+        return {"event": "truth", "sys": sys_str.strip(), "dia": dia_str.strip()}
+    compliant = truth.lower() in ("compliant", "clear", "yes", "true", "1")
+    violations = [] if compliant else [v for v in truth.split(",") if v and v.lower() != "violation"]
+    return {"event": "truth", "is_compliant": compliant, "violations": violations}
+
+
+def record(session_dir, kind, camera_index, seconds, truth=None, fps=30):
+    """Record raw frames + per-frame timestamps (and optional ground truth) to session_dir."""
+    os.makedirs(session_dir, exist_ok=True)
+    cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW if os.name == 'nt' else cv2.CAP_ANY)
+    if not cap.isOpened():
+        raise RuntimeError(f"Camera {camera_index} failed to open")
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
+    writer = None
+    count = 0
+    with open(os.path.join(session_dir, EVENTS_NAME), "w") as events:
+        events.write(json.dumps({"event": "session", "kind": kind, "camera_index": camera_index, "fps": fps}) + "\n")
+        start = time.perf_counter()
+        try:
+            while time.perf_counter() - start < seconds:
+                ret, frame = cap.read()
+                if not ret:
+                    time.sleep(0.01)
+                    continue
+                t = time.perf_counter() - start
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(os.path.join(session_dir, VIDEO_NAME),
+                                             cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+                writer.write(frame)
+                events.write(json.dumps({"event": "frame", "i": count, "t": round(t, 4)}) + "\n")
+                count += 1
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+
+        truth_event = parse_truth(kind, truth)
+        if truth_event:
+            events.write(json.dumps(truth_event) + "\n")
+
+    print(f"📼 Recorded {count} frames to {session_dir}")
+    return count
+
+
+def load_session(session_dir):
+    meta, frame_times, truth = None, [], None
+    with open(os.path.join(session_dir, EVENTS_NAME)) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            ev = json.loads(line)
+            if ev["event"] == "session":
+                meta = ev
+            elif ev["event"] == "frame":
+                frame_times.append(ev["t"])
+            elif ev["event"] == "truth":
+                truth = ev
+    if meta is None:
+        raise ValueError(f"{session_dir}: missing session header")
+    return meta, frame_times, truth
+
+
+def save_readings(session_dir, readings):
+    with open(os.path.join(session_dir, READINGS_NAME), "w") as f:
+        for reading in readings:
+            f.write(json.dumps(reading) + "\n")
+
+
+def load_readings(session_dir):
+    """Per-frame digit readings saved by a BP replay, or None if it was never replayed."""
+    path = os.path.join(session_dir, READINGS_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def iter_frames(session_dir, frame_times):
+    cap = cv2.VideoCapture(os.path.join(session_dir, VIDEO_NAME))
+    try:
+        for t in frame_times:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield t, frame
+    finally:
+        cap.release()
+
+
+# ==================== REPLAY ====================
+
+class StageTimer:
+    """Collects per-stage latencies in milliseconds."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds * 1000.0)
+
+    def summary(self):
+        out = {}
+        for stage, values in self.samples.items():
+            arr = np.asarray(values)
+            out[stage] = {
+                "count": int(arr.size),
+                "p50_ms": round(float(np.percentile(arr, 50)), 2),
+                "p90_ms": round(float(np.percentile(arr, 90)), 2),
+                "p99_ms": round(float(np.percentile(arr, 99)), 2),
+                "mean_ms": round(float(arr.mean()), 2),
+            }
+        return out
+
+
+class TimedModel:
+    """Wraps a YOLO model so the harness can time the forward pass separately."""
+
+    def __init__(self, model, timer, stage="inference"):
+        self.model = model
+        self.timer = timer
+        self.stage = stage
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.model(*args, **kwargs)
+        finally:
+            self.timer.add(self.stage, time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def load_bp_model():
+    from ultralytics import YOLO
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return YOLO(os.path.join(base_dir, 'ai_camera', 'models', 'bp.pt'))
+
+
+def reset_bp_session(bp_sensor):
+    """Per-measurement controller state, as a fresh live session starts with it."""
+    bp_sensor.mode = 'maintenance'
+    bp_sensor.start_command_sent = True
+    bp_sensor.has_inflated = False
+    bp_sensor.result_confirmed = False
+    bp_sensor.result_sent_to_lcd = False
+    bp_sensor.result_voter.reset()
+    bp_sensor.bp_history = []
+    bp_sensor.last_smooth_bp = 0
+    bp_sensor.stable_frames_count = 0
+    bp_sensor.trend_state = "Stable ⏸️"
+    bp_sensor.last_serial_update = 0
+    bp_sensor.last_consensus = None
+    bp_sensor.ignore_start_until = 0
+    bp_sensor.ignore_error_until = 0
+    bp_sensor.error_frame_count = 0
+    bp_sensor.error_handled = False
+    bp_sensor.hard_frames = None  # Replay never harvests training frames
+
+
+def replay_bp(session_dir, frame_times, truth, readings=None):
+    """readings: list that receives every frame's assembled digits (see READINGS_NAME)."""
+    from app.sensors.bp_sensor_controller import bp_sensor
+
+    timer = StageTimer()
+    commands = []
+    session_clock = {"t": 0.0}
+
+    # Offline: no serial traffic, session-time clock, keep running after a result
+    bp_sensor.send_command = lambda cmd, auto_connect=True: commands.append((session_clock["t"], cmd)) or True
+    bp_sensor.clock = lambda: session_clock["t"]
+    model = bp_sensor.bp_yolo or load_bp_model()
+    bp_sensor.bp_yolo = TimedModel(model, timer)
+    reset_bp_session(bp_sensor)
+
+    parse_digits = bp_sensor._parse_digits
+    if readings is not None:
+        def recording_parse(assembly, error_detected):
+            readings.append({"t": session_clock["t"], "two_rows": bool(assembly["two_rows"]),
+                             "sys": assembly["sys"], "dia": assembly["dia"],
+                             "sys_conf": [round(float(c), 4) for c in assembly["sys_conf"]],
+                             "dia_conf": [round(float(c), 4) for c in assembly["dia_conf"]]})
+            return parse_digits(assembly, error_detected)
+        bp_sensor._parse_digits = recording_parse
+
+    frames = 0
+    first_t = None
+    wall_start = time.perf_counter()
+    try:
+        for t, raw in iter_frames(session_dir, frame_times):
+            session_clock["t"] = t
+            first_t = t if first_t is None else first_t
+
+            start = time.perf_counter()
+            frame = bp_sensor._apply_zoom(raw)
+            timer.add("preprocess", time.perf_counter() - start)
+
+            start = time.perf_counter()
+            bp_sensor._run_detection(frame)
+            timer.add("detect_total", time.perf_counter() - start)
+            frames += 1
+    finally:
+        bp_sensor.bp_yolo = model  # Unwrap: the next session times with its own timer
+        if readings is not None:
+            del bp_sensor._parse_digits
+    wall = time.perf_counter() - wall_start
+
+    results = [(t, cmd.split(":", 1)[1]) for t, cmd in commands if cmd.startswith("RESULT:")]
+    report = {"frames": frames, "fps": round(frames / wall, 2) if wall > 0 else 0.0, "stages": timer.summary()}
+    if results:
+        t, reading = results[0]
+        report["time_to_result_s"] = round(t - (first_t or 0.0), 3)
+        report["reading"] = reading
+        if truth:
+            report["correct"] = reading == f"{truth['sys']}/{truth['dia']}"
+    else:
+        report["time_to_result_s"] = None
+        report["reading"] = None
+        report["correct"] = False if truth else None
+    return report
+
+
+def replay_clearance(session_dir, kind, frame_times, truth):
+    """
+    Frames go through _detect and then a k-of-n vote as in the live loop: presence from
+    the detection (body: or the motion gate), inference skipped once the stage is stably
+    clear (CLEARANCE_STOP_ON_CLEAR) or while the motion gate is closed.
+    """
+    from app.sensors.clearance_manager import clearance_manager
+    from app.utils.compliance_vote import ComplianceVote
+    from app.utils.motion_gate import MotionGate
+
+    timer = StageTimer()
+    clearance_manager._ensure_models_loaded()
+    model = clearance_manager.feet_model if kind == "feet" else clearance_manager.body_model
+    timed = TimedModel(model, timer)
+    prefix = "FEET" if kind == "feet" else "BODY"
+    vote = ComplianceVote(Config.CLEARANCE_VOTE_K, Config.CLEARANCE_VOTE_N)
+    gate = MotionGate(kind)
+
+    frames, inferred, matches = 0, 0, 0
+    first_t, result_t = None, None
+    events = []
+    wall_start = time.perf_counter()
+    for t, raw in iter_frames(session_dir, frame_times):
+        first_t = t if first_t is None else first_t
+        frames += 1
+
+        start = time.perf_counter()
+        frame = clearance_manager._prepare_frame(raw, kind)
+        timer.add("preprocess", time.perf_counter() - start)
+
+        if Config.CLEARANCE_STOP_ON_CLEAR and vote.state == "cleared":
+            continue
+        if not gate.check(frame):
+            continue
+
+        start = time.perf_counter()
+        result, is_compliant, _, violations = clearance_manager._detect(timed, frame, prefix)
+        timer.add("detect_total", time.perf_counter() - start)
+        inferred += 1
+
+        detected = result is not None and len(result.boxes) > 0
+        gate.present(detected)
+        present = detected or (kind == "body" and gate.occupied())
+        if vote.add(is_compliant, violations, present) and vote.state is not None:
+            events.append({"t": round(t - first_t, 3), "event": vote.state})
+
+        if truth is not None and is_compliant == truth["is_compliant"]:
+            matches += 1
+            if result_t is None:
+                result_t = t
+    wall = time.perf_counter() - wall_start
+
+    report = {"frames": frames, "fps": round(frames / wall, 2) if wall > 0 else 0.0, "stages": timer.summary(),
+              "inferred_frames": inferred, "events": events, "stable_state": vote.state}
+    if truth is not None:
+        expected = "cleared" if truth["is_compliant"] else "violation"
+        stable_t = next((e["t"] for e in events if e["event"] == expected), None)
+        report["time_to_result_s"] = round(result_t - first_t, 3) if result_t is not None else None
+        report["time_to_stable_s"] = stable_t
+        report["frame_accuracy"] = round(matches / inferred, 4) if inferred else 0.0
+        report["correct"] = bool(events) and events[0]["event"] == expected
+    return report
+
+
+def replay(session_dir, save=False):
+    """save: write the BP session's per-frame readings next to it (READINGS_NAME)."""
+    meta, frame_times, truth = load_session(session_dir)
+    kind = meta["kind"]
+    if kind == "bp":
+        readings = [] if save else None
+        report = replay_bp(session_dir, frame_times, truth, readings)
+        if save:
+            save_readings(session_dir, readings)
+    else:
+        report = replay_clearance(session_dir, kind, frame_times, truth)
+    report["session"] = session_dir
+    report["kind"] = kind
+    return report
+
+
+def print_report(report):
+    print(f"\n📊 {report['session']} ({report['kind']})")
+    print(f"   frames: {report['frames']}  throughput: {report['fps']} frames/s")
+    for stage, s in report["stages"].items():
+        print(f"   {stage:<13} p50 {s['p50_ms']:7.2f} ms | p90 {s['p90_ms']:7.2f} ms | p99 {s['p99_ms']:7.2f} ms")
+    if "time_to_result_s" in report:
+        print(f"   time-to-result: {report['time_to_result_s']} s (first matching frame)")
+    if "time_to_stable_s" in report:
+        print(f"   time-to-stable: {report['time_to_stable_s']} s (k-of-n vote)  "
+              f"events: {[(e['t'], e['event']) for e in report['events']]}")
+    if "inferred_frames" in report:
+        print(f"   inferred: {report['inferred_frames']}/{report['frames']} frames  "
+              f"(stop on clear: {Config.CLEARANCE_STOP_ON_CLEAR})")
+    if "reading" in report:
+        print(f"   reading: {report['reading']}  correct: {report.get('correct')}")
+    if "frame_accuracy" in report:
+        print(f"   frame accuracy: {report['frame_accuracy']:.1%}  first decision correct: {report['correct']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record / replay vision sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record a camera session")
+    rec.add_argument("session_dir")
+    rec.add_argument("--kind", choices=["bp", "feet", "body"], required=True)
+    rec.add_argument("--camera", type=int, required=True)
+    rec.add_argument("--seconds", type=float, default=30.0)
+    rec.add_argument("--truth", help="bp: '120/80'; feet/body: 'compliant' or 'shoes,cap'")
+
+    rep = sub.add_parser("replay", help="Replay sessions through the models")
+    rep.add_argument("sessions", nargs="+")
+    rep.add_argument("--json", help="Write the combined report to this file")
+    rep.add_argument("--save-readings", action="store_true",
+                     help=f"BP sessions: save per-frame digit readings to <session>/{READINGS_NAME}")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record(args.session_dir, args.kind, args.camera, args.seconds, args.truth)
+        return
+
+    reports = []
+    for session in args.sessions:
+        report = replay(session, save=args.save_readings)
+        print_report(report)
+        reports.append(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
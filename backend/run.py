@@ -52,19 +52,15 @@ def pre_initialize_ai_and_cameras():
     except Exception as e:
         print(f"   ⚠️ Pre-load failed: {e}")
     
-    # 2. Discover available cameras
+    # 2. Discover available cameras (parallel probes with a per-device timeout, cached)
     try:
-        import cv2
+        from app.sensors.camera_discovery import camera_discovery
         print("   📷 Discovering cameras...")
-        available_cameras = []
-        for i in range(5):  # Check indices 0-4
-            cap = cv2.VideoCapture(i, cv2.CAP_ANY)
-            if cap.isOpened():
-                ret, _ = cap.read()
-                if ret:
-                    available_cameras.append(i)
-                    print(f"      Found camera at index {i}")
-                cap.release()
+        result = camera_discovery.discover()
+        available_cameras = result["available"]
+        for device in result["devices"]:
+            if device["status"] == "ok":
+                print(f"      Found camera at index {device['index']} ({device['fps']} FPS, {device['resolutions']})")
         
         # Store in app config for frontend to query
         app.config['AVAILABLE_CAMERAS'] = available_cameras
@@ -81,6 +77,14 @@ if __name__ == '__main__':
     # Pre-initialize function is DISABLED per user request (moved to Clearance page)
     # pre_initialize_ai_and_cameras()
     
+    # Warm up BP + clearance models in the background (server starts immediately)
+    from app.sensors.model_warmup import model_warmup
+    model_warmup.start()
+    
+    # Probe cameras in parallel in the background; reuses camera_discovery.json until hardware changes
+    from app.sensors.camera_discovery import camera_discovery
+    camera_discovery.start()
+    
     print("\n📍 API available at: http://127.0.0.1:5000")
     print("🔌 WebSocket available at: ws://127.0.0.1:5000")
     print("📋 Real-time updates ENABLED")
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from app.utils.capture_pipeline import CapturePipeline, valid_class_name
+
+
+@pytest.mark.parametrize("name", ["../../x", "a/b", "..", "", "sys\\x", "bp 120", None])
+def test_rejects_unsafe_class_names(name):
+    assert not valid_class_name(name)
+
+
+@pytest.mark.parametrize("name", ["unknown", "digit_7", "bp-error", "Borderline2"])
+def test_accepts_plain_class_names(name):
+    assert valid_class_name(name)
+
+
+def test_submit_never_writes_outside_dataset_root(tmp_path):
+    root = tmp_path / "dataset"
+    pipeline = CapturePipeline(str(root))
+    frame = np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8)
+
+    assert pipeline.submit(frame, "../../escaped") == ("invalid", None)
+    status, filepath = pipeline.submit(frame, "digit_7")
+    pipeline.queue.join()
+
+    assert status == "queued"
+    assert filepath.startswith(str(root / "digit_7"))
+    assert not (tmp_path / "escaped").exists()
+    assert pipeline.get_stats()["invalid"] == 1
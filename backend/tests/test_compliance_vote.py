@@ -0,0 +1,45 @@
+from app.utils.compliance_vote import ComplianceVote
+
+
+def test_empty_scene_never_clears():
+    vote = ComplianceVote(k=4, n=6)
+    # Empty body camera: no boxes -> compliant, no violations, nobody present
+    changes = [vote.add(True, [], present=False) for _ in range(20)]
+    assert not any(changes)
+    assert vote.state is None
+
+
+def test_clears_after_k_of_n_present_frames():
+    vote = ComplianceVote(k=4, n=6)
+    results = [(True, []), (False, ['cap']), (True, []), (True, []), (True, [])]
+    changes = [vote.add(ok, violations, present=True) for ok, violations in results]
+    assert changes == [False, False, False, False, True]
+    assert vote.state == 'cleared'
+
+
+def test_single_frame_flicker_keeps_state():
+    vote = ComplianceVote(k=4, n=6)
+    for _ in range(6):
+        vote.add(True, [], present=True)
+    assert not vote.add(False, ['watch'])
+    assert vote.state == 'cleared'
+
+
+def test_violation_overrides_clear():
+    vote = ComplianceVote(k=4, n=6)
+    for _ in range(6):
+        vote.add(True, [], present=True)
+    changes = [vote.add(False, ['cap']) for _ in range(4)]
+    assert changes == [False, False, False, True]
+    assert vote.state == 'violation'
+
+
+def test_person_leaving_resets_state():
+    vote = ComplianceVote(k=4, n=6)
+    for _ in range(6):
+        vote.add(True, [], present=True)
+    for _ in range(5):
+        vote.add(True, [], present=False)
+    assert vote.state == 'cleared'
+    assert vote.add(True, [], present=False)
+    assert vote.state is None
@@ -0,0 +1,74 @@
+import numpy as np
+
+from app.utils.digit_assembly import DigitAssembler, cluster_rows, nms
+
+
+def row(y, xs, h=40, w=25, tilt=0.0):
+    """xyxy boxes of one display row; tilt = vertical shift per px of x."""
+    return [[x, y + tilt * x, x + w, y + tilt * x + h] for x in xs]
+
+
+def centers_heights(boxes):
+    b = np.asarray(boxes, dtype=np.float32)
+    return np.stack(((b[:, 0] + b[:, 2]) / 2, (b[:, 1] + b[:, 3]) / 2), axis=1), b[:, 3] - b[:, 1]
+
+
+def test_nms_drops_duplicates_keeps_highest_score():
+    boxes = np.array([[10, 10, 40, 50], [12, 11, 41, 52], [60, 10, 90, 50]], dtype=np.float32)
+    scores = np.array([0.6, 0.9, 0.8], dtype=np.float32)
+    assert nms(boxes, scores, 0.4).tolist() == [1, 2]
+
+
+def test_nms_empty_and_single():
+    assert len(nms(np.empty((0, 4)), np.empty(0))) == 0
+    assert nms(np.array([[0, 0, 1, 1]], dtype=np.float32), np.array([0.5])).tolist() == [0]
+
+
+def test_single_row_is_not_split():
+    centers, heights = centers_heights(row(100, [100, 130, 160]) + row(104, [190]))
+    assert cluster_rows(centers, heights).tolist() == [0, 0, 0, 0]
+
+
+def test_tilted_rows():
+    boxes = row(100, [100, 130, 160], tilt=0.2) + row(160, [130, 160], tilt=0.2)
+    centers, heights = centers_heights(boxes)
+    assert cluster_rows(centers, heights).tolist() == [0, 0, 0, 1, 1]
+
+
+def test_tilted_single_row_is_not_split():
+    centers, heights = centers_heights(row(100, [100, 130, 160, 190, 220], tilt=0.3))
+    assert cluster_rows(centers, heights).tolist() == [0, 0, 0, 0, 0]
+
+
+def test_tight_row_gap():
+    # Rows almost touching: centers one digit height apart
+    boxes = row(100, [100, 130, 160]) + row(141, [130, 160])
+    centers, heights = centers_heights(boxes)
+    assert cluster_rows(centers, heights).tolist() == [0, 0, 0, 1, 1]
+
+
+def test_assemble_two_rows_with_duplicate_boxes():
+    boxes = row(100, [100, 130, 160]) + row(160, [130, 160]) + [[131, 101, 156, 141]]
+    scores = [0.9, 0.9, 0.9, 0.9, 0.9, 0.4]
+    digits = [1, 2, 0, 8, 0, 7]  # Low-score duplicate of the '2' read as '7'
+    result = DigitAssembler().assemble(boxes, scores, digits)
+    assert result["two_rows"]
+    assert (result["sys"], result["dia"]) == ("120", "80")
+    assert 5 not in result["keep"].tolist()
+
+
+def test_assemble_three_rows_ignores_pulse():
+    boxes = row(100, [100, 130, 160]) + row(160, [130, 160]) + row(220, [130, 160])
+    digits = [1, 2, 0, 8, 0, 7, 2]
+    result = DigitAssembler().assemble(boxes, [0.9] * 7, digits)
+    assert (result["sys"], result["dia"]) == ("120", "80")
+    assert len(result["dia_conf"]) == 2
+    assert sorted(result["rows"].tolist()) == [0, 0, 0, 1, 1, 2, 2]
+
+
+def test_assemble_single_row_and_empty():
+    result = DigitAssembler().assemble(row(100, [100, 130, 160]), [0.9] * 3, [1, 4, 5])
+    assert not result["two_rows"]
+    assert (result["sys"], result["dia"]) == ("145", "")
+    empty = DigitAssembler().assemble(np.empty((0, 4)), [], [])
+    assert (empty["sys"], empty["dia"], empty["two_rows"]) == ("", "", False)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.sensors import inference_workers
+from app.sensors.inference_workers import InferencePool
+
+
+class _Array:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class _ShapeModel:
+    """Stub worker model: one box covering the whole frame it received."""
+
+    def __call__(self, frame, **kwargs):
+        h, w = frame.shape[:2]
+        result = type("Result", (), {})()
+        result.boxes = type("Boxes", (), {"data": _Array(np.array([[0, 0, w, h, 0.9, 1]], np.float32))})()
+        result.names = {1: "1"}
+        return [result]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # fork: the worker inherits the stubbed loader (no ultralytics needed)
+    monkeypatch.setattr(inference_workers, "_load_model", lambda path: _ShapeModel())
+    pool = object.__new__(InferencePool)
+    pool._initialized = False
+    pool.__init__()
+    pool.start(workers=1, torch_threads=1, slots=2, start_method="fork")
+    yield pool
+    pool.stop()
+
+
+def test_frame_larger_than_slot_is_downscaled_not_dropped(pool):
+    frame = np.zeros((720, 1280, 3), np.uint8)  # BP camera without square crop
+    sent, scale = pool._fit_slot(frame)
+    assert sent.nbytes <= pool.slot_bytes
+    assert sent.shape[1] / sent.shape[0] == pytest.approx(1280 / 720, rel=0.01)
+
+    future, _ = pool.submit("bp.pt", sent)
+    assert future is not None
+    data, _ = pool._scale_boxes(future.result(timeout=10), scale)
+    np.testing.assert_allclose(data[0, :4], [0, 0, 1280, 720], atol=1.0)
+    assert pool.get_status()["resized"] == 1
+
+
+def test_frame_within_slot_is_sent_as_is(pool):
+    frame = np.zeros((480, 480, 3), np.uint8)
+    sent, scale = pool._fit_slot(frame)
+    assert sent is frame and scale is None
+    future, _ = pool.submit("bp.pt", sent)
+    data, _ = pool._scale_boxes(future.result(timeout=10), scale)
+    np.testing.assert_allclose(data[0, :4], [0, 0, 480, 480])
@@ -0,0 +1,59 @@
+import types
+
+import pytest
+
+from app.config import Config
+from app.utils import load_shedder as shedder_module
+from app.utils.load_shedder import LEVELS, LoadShedder
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    fake_time = types.SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0])
+    monkeypatch.setattr(shedder_module, "time", fake_time)
+    monkeypatch.setattr(Config, "SHED_ENABLED", True)
+    return now
+
+
+@pytest.fixture
+def shedder(clock):
+    shedder = object.__new__(LoadShedder)  # Fresh controller, not the app singleton
+    shedder._initialized = False
+    shedder.__init__()
+    return shedder
+
+
+def run_clearance_loop(shedder, clock, inference_ms, seconds, frame_age_ms=20.0):
+    """One clearance loop: read the latest frame, infer, report, sleep loop_delay()."""
+    end = clock[0] + seconds
+    while clock[0] < end:
+        clock[0] += inference_ms / 1000.0
+        shedder.report("feet", inference_ms, frame_age_ms)
+        clock[0] += shedder.loop_delay("feet", 0.03)
+
+
+def test_overload_escalates_to_clearance_fps(shedder, clock):
+    run_clearance_loop(shedder, clock, inference_ms=400.0, seconds=30.0)
+    assert LEVELS[shedder.level] == "clearance_fps"
+
+
+def test_level_4_recovers_once_inference_is_normal(shedder, clock):
+    run_clearance_loop(shedder, clock, inference_ms=400.0, seconds=30.0)
+    assert shedder.level == 4
+    # Sleeping 0.2 s skips ~6 camera frames per iteration, but the frame read is fresh
+    run_clearance_loop(shedder, clock, inference_ms=60.0, seconds=4 * Config.SHED_RECOVER_S + 5.0)
+    assert shedder.level == 0
+    assert shedder.recoveries == 4
+
+
+def test_skipped_frames_are_not_backlog():
+    assert LoadShedder.backlog_frames(0.0) == 0.0
+    assert LoadShedder.backlog_frames(30.0) == 0.0  # Within one camera frame period
+    assert LoadShedder.backlog_frames(1000.0 / 30 * 5) == pytest.approx(4.0)
+
+
+def test_stale_frames_escalate(shedder, clock):
+    # Inference is fine but frames are 300 ms old when the loop wakes up: real queueing
+    run_clearance_loop(shedder, clock, inference_ms=60.0, seconds=5.0, frame_age_ms=300.0)
+    assert shedder.level >= 1
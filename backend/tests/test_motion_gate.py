@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.utils.motion_gate import MotionGate
+
+rng = np.random.default_rng(0)
+BACKGROUND = rng.integers(60, 120, (480, 480, 3), dtype=np.uint8)
+
+
+def scene(person=False):
+    frame = BACKGROUND.astype(np.int16) + rng.integers(-3, 4, BACKGROUND.shape)
+    if person:
+        frame[80:480, 150:330] = 200  # Someone standing still in the middle
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def learned_gate():
+    gate = MotionGate("body")
+    for _ in range(30):
+        gate.learn_empty(scene())
+    gate.reset()
+    return gate
+
+
+def test_person_present_at_reset_stays_occupied():
+    gate = learned_gate()
+    occupied = []
+    for _ in range(100):
+        gate.check(scene(person=True))
+        occupied.append(gate.occupied())
+    assert all(occupied)
+    # The session's motion model has absorbed the still person; the gate stays open anyway
+    assert gate.motion < 0.01
+    assert gate.check(scene(person=True))
+
+
+def test_empty_scene_is_not_occupied():
+    gate = learned_gate()
+    for _ in range(20):
+        gate.check(scene())
+        assert not gate.occupied()
+
+
+def test_reset_keeps_empty_background():
+    gate = learned_gate()
+    gate.reset()
+    gate.check(scene(person=True))
+    assert gate.occupied()
+    assert gate.get_status()["empty_frames"] == 30
+
+
+def test_without_empty_frames_falls_back_to_motion():
+    gate = MotionGate("body")
+    gate.check(scene())
+    gate.check(scene(person=True))  # Walks in after the reset
+    assert gate.occupied()
+    assert gate.get_status()["foreground"] is None
+
+
+def test_still_compliant_person_clears_body_vote():
+    from app.utils.compliance_vote import ComplianceVote
+
+    gate, vote = learned_gate(), ComplianceVote(k=4, n=6)
+    for _ in range(6):
+        gate.check(scene(person=True))
+        # Body stage: no boxes = compliant, presence comes from the gate
+        vote.add(True, [], present=gate.occupied())
+    assert vote.state == "cleared"